@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orderNow.settings")
+# Selects orderNow.asgi_urls, which routes read endpoints to async views
+os.environ.setdefault("ORDERNOW_SERVER", "asgi")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from orders.streams import with_order_streams  # noqa: E402, imported once apps are loaded
+
+application = with_order_streams(django_application)
@@ -0,0 +1,25 @@
+"""
+URL configuration used under ASGI
+
+Routes the read endpoints of the catalogue and of order history to native async views, every other
+URL is served by the sync views of `orderNow.urls`.
+"""
+
+from django.urls import re_path
+
+from orderNow.async_views import DETAIL_ACTIONS, LIST_ACTIONS, AsyncReadView
+from orderNow.urls import handler404, handler500
+from orderNow.urls import urlpatterns as sync_urlpatterns  # noqa: F401
+from orders.views import OrderViewSet
+from restaurants.views import MenuViewSet, RestaurantViewSet
+
+urlpatterns = [
+    re_path(r"^restaurants/$", AsyncReadView.as_view(RestaurantViewSet, LIST_ACTIONS)),
+    re_path(r"^restaurants/(?P<pk>[^/.]+)/$", AsyncReadView.as_view(RestaurantViewSet, DETAIL_ACTIONS)),
+    re_path(r"^restaurants/(?P<restaurant_id>[^/.]+)/menus/$", AsyncReadView.as_view(MenuViewSet, LIST_ACTIONS)),
+    re_path(
+        r"^restaurants/(?P<restaurant_id>[^/.]+)/menus/(?P<pk>[^/.]+)/$",
+        AsyncReadView.as_view(MenuViewSet, DETAIL_ACTIONS),
+    ),
+    re_path(r"^orders/$", AsyncReadView.as_view(OrderViewSet, LIST_ACTIONS)),
+] + sync_urlpatterns
@@ -0,0 +1,152 @@
+"""
+Async views module
+
+Native async implementations of the read actions of DRF viewsets, routed by `orderNow.asgi_urls`
+when the project runs under ASGI. Authentication, content negotiation and rendering run on the
+event loop. Django 3.2 has no async ORM, so the viewset action itself (permissions, queries and
+serialization) runs in a single call to `run_sync`, which by default uses the thread pool rather
+than the one thread Django shares between all sync views, so concurrent reads are not serialized.
+"""
+
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.http import HttpResponse
+from rest_framework import exceptions, permissions
+
+from orderNow import metrics
+
+LIST_ACTIONS = {"get": "list", "post": "create"}
+DETAIL_ACTIONS = {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Function to run blocking code, such as ORM queries, outside of the event loop
+
+    Unless `ASYNC_READS["THREAD_SENSITIVE"]` is set, it runs in the thread pool. Connections of
+    pool threads are closed after every call, like `request_finished` does for sync requests.
+
+    Args:
+        func: Callable to run
+        *args: Positional arguments of `func`
+        **kwargs: Keyword arguments of `func`
+
+    Returns:
+        Value returned by `func`
+    """
+
+    thread_sensitive = settings.ASYNC_READS["THREAD_SENSITIVE"]
+    sample = metrics.current_sample.get()
+
+    def call():
+        if not thread_sensitive:
+            close_old_connections()
+        try:
+            with ExitStack() as stack:
+                if sample is not None:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(sample.execute_wrapper))
+                return func(*args, **kwargs)
+        finally:
+            if not thread_sensitive:
+                close_old_connections()
+
+    return await sync_to_async(call, thread_sensitive=thread_sensitive)()
+
+
+class AsyncReadView:
+    """
+    Async view serving the safe methods of a viewset natively and delegating other methods to its sync view
+    """
+
+    def __init__(self, viewset, actions: dict):
+        self.viewset = viewset
+        self.actions = {method: action for method, action in actions.items() if hasattr(viewset, action)}
+        self.sync_view = viewset.as_view(self.actions)
+
+    @classmethod
+    def as_view(cls, viewset, actions: dict):
+        """
+        Function to build the async view of a viewset
+
+        Args:
+            viewset: DRF viewset class
+            actions (dict): Actions by http method, as given to `ViewSetMixin.as_view`
+
+        Returns:
+            Async view function
+        """
+
+        instance = cls(viewset, actions)
+
+        async def view(request, *args, **kwargs):
+            return await instance.dispatch(request, *args, **kwargs)
+
+        # Read by PerformanceMetricsMiddleware for the view and action labels
+        view.cls = viewset
+        view.actions = instance.actions
+        # Set directly as `csrf_exempt` would wrap the coroutine function in a sync function
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in permissions.SAFE_METHODS or request.method.lower() not in self.actions:
+            # Writes run in the thread shared by sync views, as Django would run the sync view
+            return await sync_to_async(self.sync_view, thread_sensitive=True)(request, *args, **kwargs)
+
+        # Same setup as the view function returned by `ViewSetMixin.as_view`
+        view = self.viewset(action_map=self.actions, args=args, kwargs=kwargs)
+        for method, action in self.actions.items():
+            setattr(view, method, getattr(view, action))
+        if hasattr(view, "get") and not hasattr(view, "head"):
+            view.head = view.get
+        drf_request = view.initialize_request(request, *args, **kwargs)
+        view.request = drf_request
+        view.headers = view.default_response_headers
+
+        try:
+            await self.authenticate(drf_request)
+            response = await run_sync(self.handle, view, drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        response.render()
+
+        # Rendered here, so Django does not hop to a thread to render the response
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    async def authenticate(self, request) -> None:
+        """
+        Function to authenticate a request with the first authenticator accepting it
+
+        Authenticators providing `authenticate_async` are awaited, others run in a thread.
+        """
+
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "authenticate_async"):
+                    user_auth_tuple = await authenticator.authenticate_async(request)
+                else:
+                    user_auth_tuple = await run_sync(authenticator.authenticate, request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    def handle(self, view, request, *args, **kwargs):
+        view.initial(request, *args, **kwargs)
+        handler = getattr(view, request.method.lower())
+        return handler(request, *args, **kwargs)
@@ -0,0 +1,139 @@
+"""
+Data migration helpers
+
+Utilities for data migrations on large tables. Rows are processed in primary key ranged batches,
+each batch is committed on its own and the last processed primary key is checkpointed, so an
+interrupted migration resumes where it stopped instead of starting over.
+
+Migrations using these helpers must set `atomic = False`, otherwise every batch runs inside the
+single transaction of the migration.
+"""
+
+import json
+import logging
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class FileCheckpoint:
+    """
+    Checkpoint storing the last processed primary key of a data migration in a file
+
+    The file is named after the database alias and name of the connection, so migrations of several
+    databases, like the shards, or of other databases behind the same alias keep separate progress.
+    """
+
+    def __init__(self, name: str, connection, directory=None):
+        database = re.sub(r"[^\w.-]+", "_", str(connection.settings_dict["NAME"])).strip("_")
+        key = f"{name}.{connection.alias}.{database}"
+        self.path = Path(directory or settings.DATA_MIGRATION_CHECKPOINT_DIR) / f"{key}.json"
+
+    def load(self):
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text())["last_pk"]
+
+    def save(self, last_pk) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps({"last_pk": last_pk}))
+        temporary_path.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def run_in_batches(
+    queryset, process, batch_size: int = 1000, checkpoint=None, sleep: float = 0, max_rows_per_second: float = None
+) -> int:
+    """
+    Function to process the rows of a queryset in primary key ranged batches
+
+    Args:
+        queryset: Rows to process
+        process: Callable receiving the queryset of a single batch, called inside the batch transaction
+        batch_size (int): Number of rows in a batch
+        checkpoint: Checkpoint to resume from and save progress to, `None` to always start over
+        sleep (float): Seconds to pause after every batch
+        max_rows_per_second (float): Upper bound on the processing rate, `None` for no limit
+
+    Returns:
+        int: Number of processed rows
+    """
+
+    queryset = queryset.order_by("pk")
+    last_pk = checkpoint.load() if checkpoint else None
+    if last_pk is not None:
+        logger.info("Resuming %s after pk %s", queryset.model._meta.label, last_pk)
+
+    processed = 0
+    while True:
+        started_at = time.monotonic()
+        pending = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(pending.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+
+        with transaction.atomic(using=queryset.db):
+            process(queryset.filter(pk__gte=pks[0], pk__lte=pks[-1]))
+
+        last_pk = pks[-1]
+        processed += len(pks)
+        if checkpoint:
+            checkpoint.save(last_pk)
+        logger.info("Processed %s rows of %s, up to pk %s", processed, queryset.model._meta.label, last_pk)
+
+        pause = sleep
+        if max_rows_per_second:
+            pause = max(pause, len(pks) / max_rows_per_second - (time.monotonic() - started_at))
+        if pause > 0:
+            time.sleep(pause)
+
+    if checkpoint:
+        checkpoint.clear()
+    return processed
+
+
+def batched_update(queryset, updates: dict, **kwargs) -> int:
+    """
+    Function to apply a set based update in batches
+
+    Args:
+        queryset: Rows to update
+        updates (dict): Values or expressions to update, as accepted by `QuerySet.update`
+        **kwargs: Options of `run_in_batches`
+
+    Returns:
+        int: Number of processed rows
+    """
+
+    return run_in_batches(queryset, lambda batch: batch.update(**updates), **kwargs)
+
+
+def batched_bulk_update(queryset, transform, fields: list, **kwargs) -> int:
+    """
+    Function to update rows computed in python in batches
+
+    Args:
+        queryset: Rows to update
+        transform: Callable modifying a single instance in place
+        fields (list): Fields modified by `transform`
+        **kwargs: Options of `run_in_batches`
+
+    Returns:
+        int: Number of processed rows
+    """
+
+    def process(batch):
+        instances = list(batch)
+        for instance in instances:
+            transform(instance)
+        batch.model._default_manager.using(batch.db).bulk_update(instances, fields)
+
+    return run_in_batches(queryset, process, **kwargs)
@@ -0,0 +1,100 @@
+"""
+Database routers module
+
+Reads of the viewset actions declared in `replica_actions` go to the replicas listed in
+`DATABASE_REPLICAS["ALIASES"]`, everything else, including every write and `select_for_update`,
+goes to the default database. Replicas lag behind the default database, so a user is pinned to it
+for `DATABASE_REPLICAS["PIN_SECONDS"]` after a successful write and reads their own writes. Pins
+are kept in the cache, which must be shared by all workers for pins to hold across them.
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import permissions
+
+PIN_CACHE_KEY = "db:pinned:{user_id}"
+
+reading_from_replica = ContextVar("reading_from_replica", default=False)
+
+
+def pin_to_primary(user_id: int) -> None:
+    """
+    Function to send the reads of a user to the default database until replicas caught up with their write
+
+    Args:
+        user_id (int): Id of the user
+    """
+
+    cache.set(PIN_CACHE_KEY.format(user_id=user_id), True, settings.DATABASE_REPLICAS["PIN_SECONDS"])
+
+
+def is_pinned_to_primary(user_id: int) -> bool:
+    return cache.get(PIN_CACHE_KEY.format(user_id=user_id), False)
+
+
+class ReplicaRouter:
+    """
+    Router sending reads to a replica while `reading_from_replica` is set
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = settings.DATABASE_REPLICAS["ALIASES"]
+        if aliases and reading_from_replica.get():
+            return random.choice(aliases)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Instances read from a replica are written to the default database, others to the database they were read from
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db not in (None, *settings.DATABASE_REPLICAS["ALIASES"]):
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS["ALIASES"]}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema of the default database by replication
+        return db not in settings.DATABASE_REPLICAS["ALIASES"]
+
+
+class ReplicaReadMixin:
+    """
+    Mixin for viewsets reading from replicas for the actions in `replica_actions`
+    """
+
+    replica_actions = ()
+
+    def reads_from_replica(self, request) -> bool:
+        """
+        Function to check if the queries of the request can read from a replica
+        """
+
+        return (
+            request.method in permissions.SAFE_METHODS
+            and self.action in self.replica_actions
+            and not (request.user.is_authenticated and is_pinned_to_primary(request.user.id))
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Authentication and permission checks read from the default database, only the action reads from a replica
+        if self.reads_from_replica(request):
+            reading_from_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        reading_from_replica.set(False)
+        if (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user.id)
+        return super().finalize_response(request, response, *args, **kwargs)
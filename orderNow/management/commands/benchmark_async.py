@@ -0,0 +1,119 @@
+"""
+Command to compare the concurrency of a worker under WSGI and ASGI
+"""
+
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.management.commands.replay_traffic import percentile
+from users.models import Users
+
+DEFAULT_PATHS = ["/restaurants/", "/orders/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the same read requests through the WSGI application, one request per worker thread, and the ASGI "
+        "application with its async read views, then report throughput and latency of a single worker process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, required=True, help="Id of the user to authenticate as.")
+        parser.add_argument("--path", action="append", help="Path to request, repeatable. Defaults to read endpoints.")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight against the ASGI worker.")
+        parser.add_argument("--threads", type=int, default=1, help="Threads of the WSGI worker.")
+
+    def handle(self, *args, **options):
+        try:
+            user = Users.objects.get(pk=options["user"])
+        except Users.DoesNotExist:
+            raise CommandError(f"User not found: {options['user']}")
+
+        token = str(RefreshToken.for_user(user).access_token)
+        paths = options["path"] or DEFAULT_PATHS
+        targets = [paths[i % len(paths)] for i in range(options["requests"])]
+
+        wsgi = self.run_wsgi(targets, token, options["threads"])
+        with override_settings(ROOT_URLCONF="orderNow.asgi_urls"):
+            asgi = asyncio.run(self.run_asgi(targets, token, options["concurrency"]))
+
+        self.stdout.write(f"{'server':<8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        self.stdout.write(self.format_row(f"wsgi x{options['threads']}", *wsgi))
+        self.stdout.write(self.format_row(f"asgi x{options['concurrency']}", *asgi))
+
+    def format_row(self, server: str, results: list, elapsed: float) -> str:
+        latencies = sorted(latency * 1000 for _, latency in results)
+        errors = sum(1 for status, _ in results if status >= 400)
+        return (
+            f"{server:<8} {len(results):>9} {errors:>7} {len(results) / elapsed:>9.1f} "
+            f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 99):>8.1f}"
+        )
+
+    def run_wsgi(self, targets: list, token: str, threads: int):
+        application = WSGIHandler()
+
+        def send(path):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": "localhost",
+                "SERVER_PORT": "80",
+                "HTTP_HOST": "localhost",
+                "HTTP_AUTHORIZATION": f"Bearer {token}",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.url_scheme": "http",
+            }
+            statuses = []
+            started_at = time.perf_counter()
+            response = application(environ, lambda status, headers: statuses.append(int(status.split()[0])))
+            b"".join(response)
+            response.close()
+            return statuses[0], time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(send, targets))
+        return results, time.perf_counter() - started_at
+
+    async def run_asgi(self, targets: list, token: str, concurrency: int):
+        application = ASGIHandler()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(path):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "query_string": b"",
+                "server": ("localhost", 80),
+                "headers": [(b"host", b"localhost"), (b"authorization", f"Bearer {token}".encode())],
+            }
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send_message(message):
+                messages.append(message)
+
+            async with semaphore:
+                started_at = time.perf_counter()
+                await application(scope, receive, send_message)
+                return messages[0]["status"], time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*(send(path) for path in targets))
+        return results, time.perf_counter() - started_at
@@ -0,0 +1,113 @@
+"""
+Command to benchmark the JSON envelope renderer on large order lists
+"""
+
+import json
+import statistics
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from orderNow.renderers import CustomRenderer, envelope
+
+
+class EnvelopeJSONRenderer(JSONRenderer):
+    """
+    Previous renderer, encoding the envelope dict with JSONRenderer
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        status_code = renderer_context["response"].status_code
+        return super().render(envelope(data, status_code), accepted_media_type, renderer_context)
+
+
+class StdlibCustomRenderer(CustomRenderer):
+    use_orjson = False
+
+
+def build_orders(count: int, items: int) -> ReturnList:
+    """
+    Function to build data shaped like the output of OrdersSerializer
+
+    Args:
+        count (int): Number of orders
+        items (int): Number of items per order
+
+    Returns:
+        ReturnList: Serialized orders
+    """
+
+    order_datetime = timezone.now().isoformat().replace("+00:00", "Z")
+    orders = ReturnList(serializer=None)
+    for order_id in range(1, count + 1):
+        order_items = [
+            OrderedDict(
+                [
+                    ("price", Decimal(f"{item_id * 7}.{item_id:02d}")),
+                    ("quantity", item_id),
+                    ("id", order_id * items + item_id),
+                    ("item", f"Item {item_id}"),
+                ]
+            )
+            for item_id in range(1, items + 1)
+        ]
+        orders.append(
+            OrderedDict(
+                [
+                    ("id", order_id),
+                    ("restaurant", f"Restaurant {order_id % 50}"),
+                    ("customer", f"customer{order_id % 500}"),
+                    ("items", order_items),
+                    ("order_datetime", order_datetime),
+                    ("total_amount", sum(item["price"] * item["quantity"] for item in order_items)),
+                    ("status", "PLACED"),
+                    ("address", f"{order_id}, Street, City, State"),
+                    ("contact", "9999999999"),
+                ]
+            )
+        )
+    return orders
+
+
+class Command(BaseCommand):
+    help = "Render a large order list with the previous and current envelope renderers and report their timings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=5000)
+        parser.add_argument("--items", type=int, default=5, help="Items per order.")
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        data = build_orders(options["orders"], options["items"])
+        renderers = [("envelope + JSONRenderer", EnvelopeJSONRenderer()), ("stdlib", StdlibCustomRenderer())]
+        if CustomRenderer.use_orjson:
+            renderers.append(("orjson", CustomRenderer()))
+
+        renderer_context = {"response": Response(status=200)}
+        expected = None
+        baseline = None
+        self.stdout.write(f"{'renderer':<24} {'median ms':>10} {'MB/s':>8} {'speedup':>8} {'output':>10}")
+        for name, renderer in renderers:
+            durations = []
+            for _ in range(options["runs"]):
+                started_at = time.perf_counter()
+                content = renderer.render(data, "application/json", renderer_context)
+                durations.append(time.perf_counter() - started_at)
+
+            duration = statistics.median(durations)
+            if expected is None:
+                expected, baseline = content, duration
+            output = "identical" if content == expected else "same json"
+            if json.loads(content) != json.loads(expected):
+                output = "different"
+
+            self.stdout.write(
+                f"{name:<24} {duration * 1000:>10.1f} {len(content) / duration / 1e6:>8.1f} "
+                f"{baseline / duration:>7.1f}x {output:>10}"
+            )
@@ -0,0 +1,108 @@
+"""
+Command to measure worker cold start time and per request middleware overhead of settings profiles
+"""
+
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from importlib import import_module
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test.utils import override_settings
+from django.urls import path
+
+DEFAULT_PROFILES = ["orderNow.settings", "orderNow.settings_api"]
+
+# Boot of a worker: app registry, middleware chain and urlconf, which is imported on the first request
+BOOT_SCRIPT = """
+import json, time
+started_at = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+print(json.dumps({"boot": time.perf_counter() - started_at, "modules": len(__import__("sys").modules)}))
+"""
+
+
+def empty_view(request):
+    return HttpResponse()
+
+
+# Urlconf of the middleware benchmark, so only middleware runs around the view
+urlpatterns = [path("", empty_view)]
+
+
+class Command(BaseCommand):
+    help = "Measure cold start time of a worker and middleware time per request for each settings profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile", action="append", help="Settings module to measure, repeatable. Defaults to both profiles."
+        )
+        parser.add_argument("--runs", type=int, default=5, help="Worker boots measured per profile.")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests measured per profile.")
+
+    def handle(self, *args, **options):
+        profiles = options["profile"] or DEFAULT_PROFILES
+        baseline = self.measure_requests([], options["requests"])
+
+        self.stdout.write(f"{'profile':<40} {'boot ms':>9} {'modules':>8} {'middleware':>11} {'us/request':>11}")
+        for profile in profiles:
+            boots = [self.measure_boot(profile) for _ in range(options["runs"])]
+            middleware = import_module(profile).MIDDLEWARE
+            per_request = self.measure_requests(middleware, options["requests"]) - baseline
+            self.stdout.write(
+                f"{profile:<40} {statistics.median(boot['boot'] for boot in boots) * 1000:>9.1f} "
+                f"{boots[0]['modules']:>8} {len(middleware):>11} {per_request * 1e6:>11.1f}"
+            )
+
+    def measure_boot(self, profile: str) -> dict:
+        """
+        Function to boot a worker with a settings profile in a new interpreter
+
+        Returns:
+            dict: Seconds spent booting and number of imported modules
+        """
+
+        environment = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        result = subprocess.run([sys.executable, "-c", BOOT_SCRIPT], env=environment, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f"Worker failed to boot with {profile}:\n{result.stderr}")
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def measure_requests(self, middleware: list, count: int) -> float:
+        """
+        Function to measure the mean time of a request to an empty view through a middleware chain
+
+        Returns:
+            float: Seconds per request
+        """
+
+        with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__):
+            application = WSGIHandler()
+            durations = []
+            for _ in range(count):
+                environ = {
+                    "REQUEST_METHOD": "GET",
+                    "PATH_INFO": "/",
+                    "QUERY_STRING": "",
+                    "SERVER_NAME": "localhost",
+                    "SERVER_PORT": "80",
+                    "HTTP_HOST": "localhost",
+                    "wsgi.input": io.BytesIO(),
+                    "wsgi.url_scheme": "http",
+                }
+                started_at = time.perf_counter()
+                response = application(environ, lambda status, headers: None)
+                response.close()
+                durations.append(time.perf_counter() - started_at)
+        return statistics.mean(durations)
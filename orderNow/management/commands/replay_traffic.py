@@ -0,0 +1,182 @@
+"""
+Command to replay captured traffic against a server
+"""
+
+import json
+import math
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import Users
+
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Function to compute a percentile of sorted values by nearest rank
+    """
+
+    if not values:
+        return 0
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(0, rank - 1)]
+
+
+def endpoint_name(event: dict) -> str:
+    """
+    Function to name the endpoint of a captured request, replacing the ids in its path
+    """
+
+    return f"{event.get('method')} {NUMERIC_SEGMENT.sub('/{id}', event.get('path', ''))}"
+
+
+class Command(BaseCommand):
+    help = "Replay requests captured by TrafficCaptureMiddleware and report latency distributions and error rates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=1.0,
+            help="Time compression factor, 10 replays ten times faster than captured. 0 sends as fast as possible.",
+        )
+        parser.add_argument(
+            "--identity-map",
+            type=Path,
+            help="JSON file mapping captured identities to ids of local users to authenticate as.",
+        )
+        parser.add_argument("--user", type=int, help="Id of the local user used for identities not in the map.")
+        parser.add_argument("--limit", type=int, help="Replay only the first requests.")
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        if not options["path"].exists():
+            raise CommandError(f"File not found: {options['path']}")
+
+        with open(options["path"], encoding="utf-8") as file:
+            events = [json.loads(line) for line in file if line.strip()]
+        events.sort(key=lambda event: event["ts"])
+        if options["limit"]:
+            events = events[: options["limit"]]
+        if not events:
+            raise CommandError("No requests to replay.")
+
+        identity_map = json.loads(options["identity_map"].read_text()) if options["identity_map"] else {}
+        self.identity_map = identity_map
+        self.default_user = options["user"]
+        self.tokens = self.get_tokens()
+        self.base_url = options["base_url"].rstrip("/")
+        self.timeout = options["timeout"]
+        self.results = []
+        self.results_lock = threading.Lock()
+
+        speed = options["speed"]
+        first_ts = events[0]["ts"]
+        started_at = time.monotonic()
+        late = 0
+        futures = []
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            for event in events:
+                if speed:
+                    delay = started_at + (event["ts"] - first_ts) / speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    elif delay < -0.1:
+                        late += 1
+                futures.append(executor.submit(self.send, event))
+        elapsed = time.monotonic() - started_at
+
+        # Requests which could not be sent are errors without a latency
+        for event, future in zip(events, futures):
+            error = future.exception()
+            if error is not None:
+                self.stderr.write(f"{event.get('method')} {event.get('path')}: {error!r}")
+                self.results.append((endpoint_name(event), None, None))
+
+        self.report(elapsed, late)
+
+    def get_tokens(self) -> dict:
+        """
+        Function to issue the access tokens of the users replayed as, failing on ids of missing users
+
+        Returns:
+            dict: Access token by user id
+        """
+
+        user_ids = [*self.identity_map.values(), self.default_user]
+        try:
+            user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+        except (TypeError, ValueError):
+            raise CommandError("Identity map values and --user must be user ids.")
+
+        users = Users.objects.in_bulk(user_ids)
+        missing = sorted(user_ids - users.keys())
+        if missing:
+            raise CommandError(f"Users not found: {', '.join(map(str, missing))}")
+        return {user_id: str(RefreshToken.for_user(user).access_token) for user_id, user in users.items()}
+
+    def get_token(self, identity):
+        user_id = self.identity_map.get(identity, self.default_user) if identity else None
+        return self.tokens[int(user_id)] if user_id is not None else None
+
+    def send(self, event: dict) -> None:
+        url = self.base_url + event["path"] + (f"?{event['query']}" if event["query"] else "")
+        data = json.dumps(event["body"]).encode() if event["body"] is not None else None
+        request = urllib.request.Request(url, data=data, method=event["method"])
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        token = self.get_token(event["identity"])
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+
+        started_at = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        except (urllib.error.URLError, OSError):
+            status = None
+        latency = time.perf_counter() - started_at
+
+        with self.results_lock:
+            self.results.append((endpoint_name(event), status, latency))
+
+    def report(self, elapsed: float, late: int) -> None:
+        by_endpoint = defaultdict(list)
+        for endpoint, status, latency in self.results:
+            by_endpoint[endpoint].append((status, latency))
+
+        self.stdout.write(
+            f"Replayed {len(self.results)} requests in {elapsed:.2f}s ({len(self.results) / elapsed:.1f} req/s), "
+            f"{late} sent late."
+        )
+        columns = ["count", "4xx", "errors", "p50 ms", "p90 ms", "p99 ms", "max ms"]
+        self.stdout.write(f"{'endpoint':<50} " + " ".join(f"{column:>8}" for column in columns))
+        for endpoint, results in sorted(by_endpoint.items()) + [("total", [result[1:] for result in self.results])]:
+            self.stdout.write(self.format_row(endpoint, results))
+
+    def format_row(self, endpoint: str, results: list) -> str:
+        latencies = sorted(latency * 1000 for _, latency in results if latency is not None)
+        client_errors = sum(1 for status, _ in results if status and 400 <= status < 500)
+        errors = sum(1 for status, _ in results if status is None or status >= 500)
+        error_rate = f"{errors / len(results):.1%}"
+        return (
+            f"{endpoint:<50} {len(results):>8} {client_errors:>8} {error_rate:>8} "
+            f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 90):>8.1f} "
+            f"{percentile(latencies, 99):>8.1f} {percentile(latencies, 100):>8.1f}"
+        )
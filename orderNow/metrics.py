@@ -0,0 +1,300 @@
+"""
+Performance metrics module
+
+Keeps per process histograms of request timings and renders them in the Prometheus text format.
+Timings of the request being measured are collected in a context variable, which the stages
+(database, serializers, renderer) add to through `timed` or the database execute wrapper.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from rest_framework import serializers
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+@dataclass
+class RequestSample:
+    """
+    Timings collected for a single request
+    """
+
+    db_time: float = 0
+    queries: int = 0
+    serializer_time: float = 0
+    render_time: float = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started_at
+            self.queries += 1
+
+
+current_sample: ContextVar = ContextVar("current_sample", default=None)
+serializer_depth: ContextVar = ContextVar("serializer_depth", default=0)
+
+
+class Histogram:
+    """
+    Histogram metric with a series per label values
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * len(self.buckets), 0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self.lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self.series.items()}
+
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = dict(zip(self.labels, label_values))
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, bucket_count
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Counter:
+    """
+    Counter metric with a series per label values
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_values: tuple, value: float = 1) -> None:
+        with self.lock:
+            self.series[label_values] = self.series.get(label_values, 0) + value
+
+    def samples(self):
+        with self.lock:
+            series = dict(self.series)
+
+        for label_values, value in sorted(series.items()):
+            yield f"{self.name}_total", dict(zip(self.labels, label_values)), value
+
+
+class Gauge:
+    """
+    Gauge metric with a series per label values
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def set(self, label_values: tuple, value: float) -> None:
+        with self.lock:
+            self.series[label_values] = value
+
+    def samples(self):
+        with self.lock:
+            series = dict(self.series)
+
+        for label_values, value in sorted(series.items()):
+            yield self.name, dict(zip(self.labels, label_values)), value
+
+
+class Registry:
+    """
+    Collection of metrics exposed by this process
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, documentation: str, labels: tuple, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def counter(self, name: str, documentation: str, labels: tuple) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def collector(self, collect):
+        """
+        Function to register a callable updating metrics before every render, for metrics read from elsewhere
+        """
+
+        with self.lock:
+            self.collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        """
+        Function to render every metric in the Prometheus text format
+
+        Returns:
+            str: Rendered metrics
+        """
+
+        for collect in list(self.collectors):
+            collect()
+
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"') for key, value in labels.items()}
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}"
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+REQUEST_LABELS = ("view", "action")
+request_duration = registry.histogram("ordernow_request_duration_seconds", "Wall time of requests.", REQUEST_LABELS)
+db_duration = registry.histogram(
+    "ordernow_request_db_duration_seconds", "Time spent executing database queries per request.", REQUEST_LABELS
+)
+db_queries = registry.histogram(
+    "ordernow_request_db_queries", "Database queries executed per request.", REQUEST_LABELS, QUERY_BUCKETS
+)
+serializer_duration = registry.histogram(
+    "ordernow_request_serializer_duration_seconds", "Time spent validating and serializing per request.", REQUEST_LABELS
+)
+render_duration = registry.histogram(
+    "ordernow_request_render_duration_seconds", "Time spent rendering responses per request.", REQUEST_LABELS
+)
+responses = registry.counter("ordernow_responses", "Responses by status code.", REQUEST_LABELS + ("status",))
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Context manager adding the time spent in its block to a stage of the current request sample
+
+    Args:
+        stage (str): Either `serializer` or `render`
+    """
+
+    sample = current_sample.get()
+    if sample is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        attribute = f"{stage}_time"
+        setattr(sample, attribute, getattr(sample, attribute) + time.perf_counter() - started_at)
+
+
+@contextmanager
+def timed_serializer():
+    """
+    Context manager timing the serializer stage, only in the block of the outermost serializer running
+    """
+
+    depth = serializer_depth.get()
+    token = serializer_depth.set(depth + 1)
+    try:
+        if depth:
+            yield
+        else:
+            with timed("serializer"):
+                yield
+    finally:
+        serializer_depth.reset(token)
+
+
+def record(view: str, action: str, status_code: int, duration: float, sample: RequestSample) -> None:
+    """
+    Function to record the timings of a finished request
+    """
+
+    labels = (view, action)
+    request_duration.observe(labels, duration)
+    db_duration.observe(labels, sample.db_time)
+    db_queries.observe(labels, sample.queries)
+    serializer_duration.observe(labels, sample.serializer_time)
+    render_duration.observe(labels, sample.render_time)
+    responses.inc(labels + (str(status_code),))
+
+
+_serializer_timing_installed = False
+
+
+def install_serializer_timing() -> None:
+    """
+    Function to time validation and serialization of every DRF serializer
+
+    Only the outermost serializer running is measured, serializers used while it validates or
+    serializes, like nested ones, are part of its time.
+    """
+
+    global _serializer_timing_installed
+    if _serializer_timing_installed:
+        return
+    _serializer_timing_installed = True
+
+    data_property = serializers.BaseSerializer.data
+    is_valid = serializers.BaseSerializer.is_valid
+
+    def timed_data(self):
+        with timed_serializer():
+            return data_property.fget(self)
+
+    def timed_is_valid(self, *args, **kwargs):
+        with timed_serializer():
+            return is_valid(self, *args, **kwargs)
+
+    serializers.BaseSerializer.data = property(timed_data)
+    serializers.BaseSerializer.is_valid = timed_is_valid
@@ -0,0 +1,199 @@
+"""
+Middleware Module
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from orderNow import metrics
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Middleware recording wall, database, serializer and renderer time of sampled requests per view and action
+
+    Under ASGI, database time is recorded for queries made through `orderNow.async_views.run_sync`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.install_serializer_timing()
+        mark_async(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        if not self.sampled():
+            return self.get_response(request)
+
+        sample = metrics.RequestSample()
+        token = metrics.current_sample.set(sample)
+        started_at = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sample.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+
+        self.record(request, response, time.perf_counter() - started_at, sample)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        sample = metrics.RequestSample()
+        token = metrics.current_sample.set(sample)
+        started_at = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+
+        self.record(request, response, time.perf_counter() - started_at, sample)
+        return response
+
+    def sampled(self) -> bool:
+        config = settings.PERFORMANCE_METRICS
+        return config["ENABLED"] and random.random() < config["SAMPLE_RATE"]
+
+    def record(self, request, response, duration: float, sample) -> None:
+        view, action = "unresolved", request.method.lower()
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None:
+            view_func = resolver_match.func
+            view_class = getattr(view_func, "cls", None)
+            if view_class is None:
+                view = view_func.__name__
+            else:
+                actions = getattr(view_func, "actions", None) or {}
+                view, action = view_class.__name__, actions.get(action, action)
+
+        metrics.record(view, action, response.status_code, duration, sample)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Middleware writing a sample of API requests to a JSONL file, to be replayed by the `replay_traffic` command
+
+    Users are recorded by an HMAC of their id, and configured body fields are redacted.
+    """
+
+    lock = threading.Lock()
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        mark_async(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        config = settings.TRAFFIC_CAPTURE
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        # Read before the view, so the body is still available once the request stream is consumed
+        body = self.get_body(request, config)
+        timestamp = time.time()
+        started_at = time.perf_counter()
+        response = self.get_response(request)
+        self.write(config, self.get_event(request, response, body, timestamp, time.perf_counter() - started_at))
+        return response
+
+    async def __acall__(self, request):
+        config = settings.TRAFFIC_CAPTURE
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return await self.get_response(request)
+
+        body = self.get_body(request, config)
+        timestamp = time.time()
+        started_at = time.perf_counter()
+        response = await self.get_response(request)
+        event = self.get_event(request, response, body, timestamp, time.perf_counter() - started_at)
+        await sync_to_async(self.write)(config, event)
+        return response
+
+    def get_event(self, request, response, body, timestamp: float, duration: float) -> dict:
+        return {
+            "ts": timestamp,
+            "method": request.method,
+            "path": request.path,
+            "query": request.META.get("QUERY_STRING", ""),
+            "content_type": request.content_type,
+            "body": body,
+            "identity": self.get_identity(request),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+
+    def write(self, config: dict, event: dict) -> None:
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with self.lock, open(config["PATH"], "a", encoding="utf-8") as file:
+            file.write(line)
+
+    def get_body(self, request, config: dict):
+        if request.content_type != "application/json":
+            return None
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if not content_length or content_length > config["MAX_BODY_BYTES"]:
+            return None
+
+        try:
+            body = json.loads(request.body)
+        except ValueError:
+            return None
+        return redact(body, set(config["REDACT_FIELDS"]))
+
+    def get_identity(self, request):
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return hmac.new(settings.SECRET_KEY.encode(), str(user.id).encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def mark_async(middleware) -> None:
+    """
+    Function to switch a middleware to async mode when the next handler is async, as MiddlewareMixin does
+    """
+
+    if asyncio.iscoroutinefunction(middleware.get_response):
+        middleware._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+def redact(value, fields: set):
+    """
+    Function to replace the values of sensitive fields in a decoded JSON body
+
+    Args:
+        value: Decoded JSON value
+        fields (set): Names of fields to redact
+
+    Returns:
+        Value with redacted fields
+    """
+
+    if isinstance(value, dict):
+        return {key: "***" if key in fields else redact(item, fields) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, fields) for item in value]
+    return value
@@ -2,26 +2,104 @@
 Custom Renderer Module
 """
 
+import json
+from decimal import Decimal
+
 from rest_framework.renderers import JSONRenderer
 
+from orderNow.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+SUCCESS_PREFIX = b'{"status":"success","data":'
+ERROR_PREFIX = b'{"status":"error","data":'
+EMPTY_MESSAGE_SUFFIX = b',"message":null}'
+ERROR_MESSAGE_PREFIX = b'{"status":"error","data":null,"message":'
+
+
+def envelope(data, status_code: int) -> dict:
+    """
+    Function to wrap response data in the envelope of every response
+
+    Args:
+        data: Response data
+        status_code (int): Status code of the response
+
+    Returns:
+        dict: Enveloped data
+    """
+
+    response = {"status": "success", "data": data, "message": None}
+    if not 200 <= status_code < 300:
+        response["status"] = "error"
+        if isinstance(data, dict) and "detail" in data:
+            response["message"] = data["detail"]
+            response["data"] = None
+    return response
+
 
 class CustomRenderer(JSONRenderer):
     """
     Custom renderer class for json response
+
+    The `{"status", "data", "message"}` envelope is written around the encoded data instead of being
+    built as a dict and encoded with it. Data is encoded with orjson, declared in the Pipfile, and
+    with the C accelerated stdlib encoder for values orjson rejects or environments without it, both
+    producing the same output as `JSONRenderer`.
     """
 
+    use_orjson = orjson is not None
+
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
         Renders data into JSON
         """
 
-        status_code = renderer_context["response"].status_code
-        response = {"status": "success", "data": data, "message": None}
+        with timed("render"):
+            status_code = renderer_context["response"].status_code
+            if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+                return super().render(envelope(data, status_code), accepted_media_type, renderer_context)
+
+            if 200 <= status_code < 300:
+                return SUCCESS_PREFIX + self.encode(data) + EMPTY_MESSAGE_SUFFIX
+            if isinstance(data, dict) and "detail" in data:
+                return ERROR_MESSAGE_PREFIX + self.encode(data["detail"]) + b"}"
+            return ERROR_PREFIX + self.encode(data) + EMPTY_MESSAGE_SUFFIX
+
+    def encode(self, data) -> bytes:
+        """
+        Function to encode data in the compact output of `JSONRenderer`
+
+        Returns:
+            bytes: Encoded data
+        """
+
+        encoded = None
+        if self.use_orjson:
+            try:
+                encoded = orjson.dumps(
+                    data,
+                    default=self.encode_default,
+                    option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+                )
+            except TypeError:
+                # Values orjson rejects, such as integers larger than 64 bits, are left to the stdlib encoder
+                pass
+        if encoded is None:
+            encoded = json.dumps(
+                data, cls=self.encoder_class, ensure_ascii=False, allow_nan=not self.strict, separators=(",", ":")
+            ).encode()
 
-        if not str(status_code).startswith("2"):
-            response["status"] = "error"
-            if "detail" in data:
-                response["message"] = data["detail"]
-                response["data"] = None
+        # Same escaping as JSONRenderer, so the output is a strict javascript subset
+        if b"\xe2\x80" in encoded:
+            encoded = encoded.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        return encoded
 
-        return super(CustomRenderer, self).render(response, accepted_media_type, renderer_context)
+    def encode_default(self, obj):
+        # Decimals are most of the values orjson does not support, converted without the generic encoder
+        if type(obj) is Decimal:
+            return float(obj)
+        return self.encoder_class().default(obj)
@@ -2,6 +2,7 @@
 Django settings for orderNow project.
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -34,9 +35,12 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
+    "orderNow",
 ]
 
 MIDDLEWARE = [
+    "orderNow.middleware.PerformanceMetricsMiddleware",
+    "orderNow.middleware.TrafficCaptureMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -46,7 +50,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "orderNow.urls"
+# "asgi" when served by orderNow.asgi, "wsgi" otherwise
+ORDERNOW_SERVER = os.environ.get("ORDERNOW_SERVER", "wsgi")
+
+ROOT_URLCONF = "orderNow.asgi_urls" if ORDERNOW_SERVER == "asgi" else "orderNow.urls"
 
 TEMPLATES = [
     {
@@ -82,6 +89,160 @@ DATABASES = {
 }
 
 
+# Read replicas, aliases of DATABASES serving list and report reads, see orderNow.db_routers
+# Users are pinned to the default database for PIN_SECONDS after a write, so they read their own writes
+# Replica aliases set "TEST": {"MIRROR": "default"}, so tests read what they write
+
+DATABASE_REPLICAS = {
+    "ALIASES": [],
+    "PIN_SECONDS": 5,
+}
+
+
+# Order shards, database aliases holding the orders of restaurants, see orders.shards
+# Restaurants are assigned to ALIASES by id, changing ALIASES moves restaurants, whose orders must be moved first
+# Shard aliases need copies of the users, restaurants and menus tables of the default database
+
+ORDER_SHARDS = {
+    "ALIASES": ["default"],
+}
+
+DATABASE_ROUTERS = ["orders.shards.ShardRouter", "orderNow.db_routers.ReplicaRouter"]
+
+
+# Performance metrics, exposed for Prometheus at /metrics
+# SAMPLE_RATE is the fraction of requests which are measured
+# /metrics answers requests from ALLOWED_IPS, or bearing TOKEN in their Authorization header, others get a 404
+
+PERFORMANCE_METRICS = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1.0,
+    "ALLOWED_IPS": ["127.0.0.1", "::1"],
+    "TOKEN": os.environ.get("METRICS_TOKEN"),
+}
+
+
+# Async read endpoints served under ASGI, see orderNow.async_views
+# Queries of async views run in the thread pool, unless THREAD_SENSITIVE runs them in the thread shared by sync views
+
+ASYNC_READS = {
+    "THREAD_SENSITIVE": False,
+}
+
+
+# Server-sent event streams of restaurant orders under ASGI, see orders.streams
+# BROKER delivers events to the streams, the default one only reaches streams of the same worker process
+# QUEUE_SIZE is the number of events buffered per stream, REPLAY_SIZE the number kept per restaurant for resuming streams
+# HEARTBEAT_INTERVAL is the number of seconds between keep alive comments of idle streams
+
+ORDER_EVENTS = {
+    "BROKER": "orders.events.InProcessBroker",
+    "QUEUE_SIZE": 100,
+    "REPLAY_SIZE": 1000,
+    "HEARTBEAT_INTERVAL": 15,
+}
+
+
+# Transactional outbox of order events, sent to SINK by `manage.py relay_outbox`, see orders.outbox
+# Events are delivered at least once, consumers drop duplicates by their `key`
+# The default sink appends events to the JSONL file at PATH, POLL_INTERVAL is the seconds the relay waits when idle
+# METRICS_TTL is the seconds for which scrapes of /metrics serve the outbox metrics without reading the shards again
+
+ORDER_OUTBOX = {
+    "SINK": "orders.outbox.FileSink",
+    "PATH": BASE_DIR / "outbox.jsonl",
+    "BATCH_SIZE": 100,
+    "POLL_INTERVAL": 1,
+    "METRICS_TTL": 15,
+}
+
+
+# Idempotency keys of order placements, see orders.idempotency
+# Retries of a placement with the same Idempotency-Key header are answered with its stored response
+# Keys expire TTL seconds after the first request, expired keys are removed by `manage.py purge_idempotency_keys`
+
+IDEMPOTENCY_KEYS = {
+    "TTL": 24 * 60 * 60,
+}
+
+
+# Asynchronous order intake, see orders.intake
+# With ASYNC, POST /orders/ queues orders and answers 202, workers of `manage.py process_order_intake` place them
+# Workers claim up to GROUP_SIZE orders of a restaurant at once, orders claimed LEASE_SECONDS ago are claimed again
+
+ORDER_INTAKE = {
+    "ASYNC": False,
+    "WORKERS": 4,
+    "GROUP_SIZE": 20,
+    "LEASE_SECONDS": 60,
+    "POLL_INTERVAL": 0.5,
+}
+
+
+# With ENABLED, order placements of a process arriving within WINDOW_MS are committed together in one transaction
+# A group is committed as soon as it has MAX_GROUP_SIZE placements
+# Placements wait for their group on their request thread, so it needs a threaded WSGI server and is off under ASGI
+
+ORDER_GROUP_COMMIT = {
+    "ENABLED": False,
+    "WINDOW_MS": 5,
+    "MAX_GROUP_SIZE": 50,
+}
+
+
+# Items added to carts hold their stock for HOLD_SECONDS, see orders.carts
+# Expired holds are released by `manage.py release_cart_holds` every SWEEP_INTERVAL seconds, BATCH_SIZE per transaction
+
+ORDER_CARTS = {
+    "HOLD_SECONDS": 10 * 60,
+    "SWEEP_INTERVAL": 30,
+    "BATCH_SIZE": 500,
+}
+
+
+# Delivered and cancelled orders last updated AFTER_DAYS ago are moved to the archive by `manage.py archive_orders`
+
+ORDER_ARCHIVE = {
+    "AFTER_DAYS": 90,
+}
+
+
+# Capture of sampled API requests to a JSONL file, replayed with `manage.py replay_traffic`
+
+TRAFFIC_CAPTURE = {
+    "ENABLED": False,
+    "SAMPLE_RATE": 0.01,
+    "PATH": BASE_DIR / "traffic.jsonl",
+    "MAX_BODY_BYTES": 65536,
+    "REDACT_FIELDS": ["password", "refresh", "access"],
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Deployments running flash sales need a cache shared by their processes, see restaurants.flash_sale
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# Seconds for which restaurant ownership of a user is cached for permission checks
+OWNERSHIP_CACHE_TTL = 300
+
+# Seconds for which the user resolved from an access token is cached
+AUTH_USER_CACHE_TTL = 60
+
+
+# Directory where data migrations checkpoint their progress, see `orderNow.data_migrations`
+DATA_MIGRATION_CHECKPOINT_DIR = BASE_DIR / ".data_migrations"
+
+# Runs the migrations of the test databases with a temporary checkpoint directory
+TEST_RUNNER = "orderNow.testing.TestRunner"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -125,7 +286,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": ["orderNow.renderers.CustomRenderer"],
     "COERCE_DECIMAL_TO_STRING": False,
@@ -139,3 +300,14 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+TOKEN_REVOCATION = {
+    # Expected number of live revocations and false positive rate of the per process Bloom filter
+    "CAPACITY": 100000,
+    "ERROR_RATE": 0.001,
+    # Seconds between incremental refreshes of the filter and full rebuilds of it
+    "REFRESH_INTERVAL": 5,
+    "REBUILD_INTERVAL": 3600,
+    # Seconds of overlap between refreshes, covering revocations committed after they were written
+    "SYNC_OVERLAP": 60,
+}
@@ -0,0 +1,43 @@
+"""
+Django settings for API workers in production.
+
+The API authenticates with JWT only, so the apps and middleware serving browsers (admin, sessions,
+messages, CSRF and clickjacking protection) are left out of worker boot and of the request path.
+The admin is served by a separate deployment using `orderNow.settings`.
+
+Selected with `DJANGO_SETTINGS_MODULE=orderNow.settings_api`.
+"""
+
+from orderNow.settings import *  # noqa: F401,F403
+from orderNow.settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+BROWSER_APPS = [
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+]
+
+BROWSER_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in BROWSER_APPS]
+
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in BROWSER_MIDDLEWARE]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+            ],
+        },
+    },
+]
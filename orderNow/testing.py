@@ -0,0 +1,143 @@
+"""
+Testing utilities
+
+Test client and test case which record the SQL executed by every request. A request fails the
+test when it repeats a query shape (a query differing only in its parameters) too many times,
+which is how N+1 patterns show up, or when it exceeds the query budget declared by the test.
+
+The test runner keeps the checkpoints of data migrations run on the test databases out of the
+checkpoint directory of the project.
+"""
+
+import re
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, TestCase
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from users.revocation import revocation_registry
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+VALUE_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def query_shape(sql: str) -> str:
+    """
+    Function to normalize a query, replacing its parameters by placeholders
+
+    Args:
+        sql (str): Executed query
+
+    Returns:
+        str: Shape of the query
+    """
+
+    shape = STRING_LITERAL.sub("?", sql)
+    shape = NUMBER_LITERAL.sub("?", shape)
+    shape = VALUE_LIST.sub("(...)", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+def find_repeated_queries(queries: list, threshold: int) -> dict:
+    """
+    Function to find select query shapes executed at least `threshold` times
+
+    Args:
+        queries (list): Executed queries
+        threshold (int): Minimum number of executions reported
+
+    Returns:
+        dict: Number of executions by query shape
+    """
+
+    shapes = Counter(query_shape(sql) for sql in queries if sql.lstrip().upper().startswith("SELECT"))
+    return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+
+class QueryBudgetClient(Client):
+    """
+    Test client checking the queries executed by each request
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.repeated_query_threshold = None
+        self.query_budget = None
+        self.captured_queries = []
+
+    def request(self, **request):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as context:
+            response = super().request(**request)
+        self.captured_queries = [query["sql"] for query in context.captured_queries]
+        self.check_queries(request)
+        return response
+
+    def check_queries(self, request: dict) -> None:
+        target = f"{request['REQUEST_METHOD']} {request['PATH_INFO']}"
+        queries = "\n".join(f"{i}. {sql}" for i, sql in enumerate(self.captured_queries, start=1))
+
+        if self.query_budget is not None and len(self.captured_queries) > self.query_budget:
+            raise AssertionError(
+                f"{target} executed {len(self.captured_queries)} queries, budget is {self.query_budget}:\n{queries}"
+            )
+
+        if self.repeated_query_threshold:
+            repeated = find_repeated_queries(self.captured_queries, self.repeated_query_threshold)
+            if repeated:
+                shapes = "\n".join(f"{count}x {shape}" for shape, count in repeated.items())
+                raise AssertionError(f"{target} repeated queries, possible N+1:\n{shapes}\n{queries}")
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Test case whose client fails on N+1 query patterns and supports query budgets
+
+    The process wide revocation registry is reset before each test, so its periodic refresh does not
+    add queries to the requests of whichever test it falls due in.
+    """
+
+    client_class = QueryBudgetClient
+    repeated_query_threshold = 3
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        revocation_registry.reset()
+        self.client.repeated_query_threshold = self.repeated_query_threshold
+
+    @contextmanager
+    def assertQueryBudget(self, budget: int):
+        """
+        Context manager failing when a request made in its block executes more than `budget` queries
+
+        Args:
+            budget (int): Maximum number of queries per request
+        """
+
+        previous_budget, self.client.query_budget = self.client.query_budget, budget
+        try:
+            yield
+        finally:
+            self.client.query_budget = previous_budget
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner pointing the checkpoints of data migrations to a temporary directory
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.checkpoint_directory = tempfile.TemporaryDirectory()
+        self.checkpoint_settings = override_settings(DATA_MIGRATION_CHECKPOINT_DIR=self.checkpoint_directory.name)
+        self.checkpoint_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.checkpoint_settings.disable()
+        self.checkpoint_directory.cleanup()
+        super().teardown_test_environment(**kwargs)
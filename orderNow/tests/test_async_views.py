@@ -0,0 +1,115 @@
+"""
+Async views test module
+"""
+
+from asgiref.sync import sync_to_async
+from ddf import G
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.models import OrderItems, Orders
+from restaurants.models import Menus, Restaurants
+from users.models import RevokedTokens, Users
+
+
+@override_settings(ROOT_URLCONF="orderNow.asgi_urls", ASYNC_READS={"THREAD_SENSITIVE": True})
+class AsyncReadViewTests(QueryBudgetTestCase):
+    """
+    Class to test async read views served under ASGI
+    """
+
+    def setUp(self):
+        self.user = G(Users)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.restaurant = G(Restaurants, owner=self.user)
+        self.menu = G(Menus, restaurant=self.restaurant)
+        order = G(Orders, customer=self.user, restaurant=self.restaurant)
+        G(OrderItems, order=order, item=self.menu)
+        G(Orders, restaurant=self.restaurant)
+
+    async def assertSameResponse(self, url: str):
+        """
+        Function to assert the async view responds like the sync view
+
+        Headers of the async client are given by their ASGI names.
+        """
+
+        sync_response = await sync_to_async(self.client.get)(url, HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        async_response = await self.async_client.get(url, authorization=f"Bearer {self.token}")
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response["Content-Type"], sync_response["Content-Type"])
+        self.assertEqual(async_response.json(), sync_response.json())
+        return async_response
+
+    async def test_restaurant_read_success(self):
+        """
+        Testcase for testing restaurant list and retrieve are served by async views.
+        """
+
+        await self.assertSameResponse(reverse("restaurants:restaurants-list"))
+        await self.assertSameResponse(reverse("restaurants:restaurants-detail", args=[self.restaurant.id]))
+
+    async def test_menu_read_success(self):
+        """
+        Testcase for testing menu list and retrieve are served by async views.
+        """
+
+        await self.assertSameResponse(reverse("restaurants:menus-list", args=[self.restaurant.id]))
+        await self.assertSameResponse(reverse("restaurants:menus-detail", args=[self.restaurant.id, self.menu.id]))
+
+    async def test_order_list_success(self):
+        """
+        Testcase for testing order list is served by an async view.
+        """
+
+        response = await self.assertSameResponse(reverse("orders:orders-list"))
+
+        self.assertEqual(len(response.json()["data"]), 1)
+
+    async def test_read_not_found(self):
+        """
+        Testcase for testing async views respond with not found for missing objects.
+        """
+
+        response = await self.async_client.get(
+            reverse("restaurants:restaurants-detail", args=[0]), authorization=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"data": None, "status": "error", "message": "Not found."})
+
+    async def test_read_unauthenticated(self):
+        """
+        Testcase for testing async views reject missing and revoked tokens.
+        """
+
+        response = await self.async_client.get(reverse("orders:orders-list"))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+        await sync_to_async(RevokedTokens.objects.revoke_user)(self.user.id)
+        response = await self.async_client.get(
+            reverse("restaurants:restaurants-list"), authorization=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"data": None, "status": "error", "message": "Token is revoked"})
+
+    async def test_write_delegated_to_sync_view(self):
+        """
+        Testcase for testing unsafe methods on async routes are served by the sync viewset.
+        """
+
+        response = await self.async_client.post(
+            reverse("restaurants:restaurants-list"),
+            data={"name": "Restaurant"},
+            content_type="application/json",
+            authorization=f"Bearer {self.token}",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["name"], "Restaurant")
@@ -0,0 +1,119 @@
+"""
+Database routers test module
+"""
+
+from unittest import skipUnless
+
+from ddf import G
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.db_routers import ReplicaRouter, is_pinned_to_primary, reading_from_replica
+from orderNow.testing import QueryBudgetClient, QueryBudgetTestCase
+from orders.models import Orders
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+REPLICAS = {"ALIASES": ["replica"], "PIN_SECONDS": 5}
+HAS_REPLICA = "replica" in settings.DATABASES
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTests(QueryBudgetTestCase):
+    """
+    Class to test routing of queries between the default database and replicas
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_router_reads_from_replica(self):
+        """
+        Testcase for testing only reads go to a replica, and only while reading from replicas is enabled.
+        """
+
+        router = ReplicaRouter()
+        self.assertEqual(Orders.objects.all().db, "default")
+
+        token = reading_from_replica.set(True)
+        try:
+            self.assertEqual(Orders.objects.all().db, "replica")
+            self.assertEqual(Orders.objects.select_for_update().db, "default")
+            self.assertEqual(router.db_for_write(Orders), "default")
+        finally:
+            reading_from_replica.reset(token)
+
+        self.assertTrue(router.allow_migrate("default", "orders"))
+        self.assertFalse(router.allow_migrate("replica", "orders"))
+
+    def test_write_pins_user_to_primary(self):
+        """
+        Testcase for testing successful writes pin their user to the default database, and failed ones do not.
+        """
+
+        user = G(Users)
+        authorization = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+        self.client.post(reverse("restaurants:restaurants-list"), data={}, HTTP_AUTHORIZATION=authorization)
+        self.assertFalse(is_pinned_to_primary(user.id))
+
+        response = self.client.post(
+            reverse("restaurants:restaurants-list"), data={"name": "Restaurant"}, HTTP_AUTHORIZATION=authorization
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned_to_primary(user.id))
+        self.assertFalse(reading_from_replica.get())
+
+
+@skipUnless(HAS_REPLICA, "Needs a `replica` alias mirroring the default database")
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaReadTests(TransactionTestCase):
+    """
+    Class to test reads of list and report endpoints are served by a replica
+
+    Runs with a `replica` alias in DATABASES whose `TEST` settings mirror the default database.
+    """
+
+    # Test runners set up every database of the collected test cases, skipped ones included
+    databases = {"default", "replica"} if HAS_REPLICA else {"default"}
+    client_class = QueryBudgetClient
+
+    def setUp(self):
+        cache.clear()
+        self.user = G(Users, balance=1000, phone_number="9999999999")
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.restaurant = G(Restaurants, owner=self.user)
+        self.menu = G(Menus, restaurant=self.restaurant, quantity=10, price=10)
+
+    def replica_queries(self, method: str, url: str, **kwargs) -> int:
+        with CaptureQueriesContext(connections["replica"]) as context:
+            response = getattr(self.client, method)(url, HTTP_AUTHORIZATION=f"Bearer {self.token}", **kwargs)
+        self.assertLess(response.status_code, 400)
+        return len(context.captured_queries)
+
+    def test_reads_from_replica_until_write(self):
+        """
+        Testcase for testing reads go to a replica, except writes and reads of a user who just wrote.
+        """
+
+        self.assertGreater(self.replica_queries("get", reverse("restaurants:restaurants-list")), 0)
+        self.assertGreater(self.replica_queries("get", reverse("orders:orders-list")), 0)
+        self.assertGreater(
+            self.replica_queries(
+                "get",
+                reverse("restaurants:reports-customer-spends-report", kwargs={"restaurant_id": self.restaurant.id}),
+            ),
+            0,
+        )
+        self.assertEqual(self.replica_queries("get", reverse("orders:orders-list"), data={"since": "0-0"}), 0)
+
+        data = {"items": [{"id": self.menu.id, "quantity": 1}]}
+        self.assertEqual(
+            self.replica_queries("post", reverse("orders:orders-list"), data=data, content_type="application/json"), 0
+        )
+        self.assertEqual(self.replica_queries("get", reverse("orders:orders-list")), 0)
@@ -0,0 +1,114 @@
+"""
+Performance metrics test module
+"""
+
+from unittest.mock import patch
+
+from ddf import G
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow import metrics
+from orderNow.testing import QueryBudgetTestCase
+from restaurants.models import Restaurants
+from users.models import Users
+
+
+class MetricsTests(QueryBudgetTestCase):
+    """
+    Class to test performance metrics middleware and endpoint
+    """
+
+    def setUp(self):
+        self.user = G(Users)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        G(Restaurants, owner=self.user)
+
+    def get_count(self, name: str, labels: tuple):
+        return metrics.registry.metrics[name].series.get(labels, [None, 0, 0])[2]
+
+    def test_request_is_recorded_per_view_and_action(self):
+        """
+        Testcase for testing request timings are recorded and exposed.
+        """
+
+        labels = ("RestaurantViewSet", "list")
+        count = self.get_count("ordernow_request_duration_seconds", labels)
+
+        response = self.client.get(reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.get_count("ordernow_request_duration_seconds", labels), count + 1)
+        db_queries = metrics.registry.metrics["ordernow_request_db_queries"].series[labels]
+        self.assertGreaterEqual(db_queries[1], 1)
+        self.assertGreater(metrics.registry.metrics["ordernow_request_render_duration_seconds"].series[labels][1], 0)
+        self.assertGreater(
+            metrics.registry.metrics["ordernow_request_serializer_duration_seconds"].series[labels][1], 0
+        )
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        content = response.content.decode()
+        self.assertIn("# TYPE ordernow_request_duration_seconds histogram", content)
+        self.assertIn(
+            'ordernow_request_duration_seconds_bucket{view="RestaurantViewSet",action="list",le="+Inf"}', content
+        )
+        self.assertIn('ordernow_responses_total{view="RestaurantViewSet",action="list",status="200"}', content)
+
+    @override_settings(PERFORMANCE_METRICS={"ENABLED": True, "SAMPLE_RATE": 0})
+    def test_request_is_not_recorded_when_not_sampled(self):
+        """
+        Testcase for testing requests outside the sample rate are not recorded.
+        """
+
+        labels = ("RestaurantViewSet", "list")
+        count = self.get_count("ordernow_request_duration_seconds", labels)
+
+        self.client.get(reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        self.assertEqual(self.get_count("ordernow_request_duration_seconds", labels), count)
+
+    @override_settings(
+        PERFORMANCE_METRICS={"ENABLED": True, "SAMPLE_RATE": 1.0, "ALLOWED_IPS": ["10.0.0.1"], "TOKEN": "secret"}
+    )
+    def test_metrics_restricted_to_allowed_ips_and_token(self):
+        """
+        Testcase for testing metrics are only exposed to allowed addresses and requests bearing the metrics token.
+        """
+
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 404)
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.1").status_code, 200)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+
+    def test_nested_serializers_timed_once(self):
+        """
+        Testcase for testing serializers used by another serializer are timed as part of it only.
+        """
+
+        class InnerSerializer(serializers.Serializer):
+            name = serializers.CharField()
+
+        class OuterSerializer(serializers.Serializer):
+            inner = serializers.SerializerMethodField()
+
+            def get_inner(self, instance):
+                return InnerSerializer(instance).data
+
+            def validate(self, attrs):
+                InnerSerializer(data={"name": "inner"}).is_valid(raise_exception=True)
+                return attrs
+
+        token = metrics.current_sample.set(metrics.RequestSample())
+        try:
+            with patch.object(metrics, "timed", wraps=metrics.timed) as timed:
+                OuterSerializer({"name": "outer"}).data
+                OuterSerializer(data={}).is_valid(raise_exception=True)
+        finally:
+            metrics.current_sample.reset(token)
+
+        self.assertEqual(timed.call_count, 2)
@@ -0,0 +1,76 @@
+"""
+Renderer test module
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.response import Response
+
+from orderNow.management.commands.benchmark_renderer import EnvelopeJSONRenderer, StdlibCustomRenderer, build_orders
+from orderNow import renderers
+from orderNow.renderers import CustomRenderer
+
+
+class CustomRendererTests(SimpleTestCase):
+    """
+    Class to test the envelope renderer produces the output of the envelope encoded by JSONRenderer
+    """
+
+    def assertSameOutput(self, data, status_code: int = 200, accepted_media_type: str = "application/json"):
+        context = {"response": Response(status=status_code)}
+        expected = EnvelopeJSONRenderer().render(data, accepted_media_type, context)
+        for renderer in [CustomRenderer(), StdlibCustomRenderer()]:
+            with self.subTest(renderer=type(renderer).__name__):
+                self.assertEqual(renderer.render(data, accepted_media_type, context), expected)
+
+    def test_render_success(self):
+        """
+        Testcase for testing successful responses, including decimals, datetimes and escaped characters.
+        """
+
+        self.assertSameOutput(build_orders(20, 3))
+        self.assertSameOutput({"amount": Decimal("10.50"), "at": timezone.now(), "name": "a bé"})
+        self.assertSameOutput([])
+        self.assertSameOutput(None, status_code=204)
+
+    def test_render_error(self):
+        """
+        Testcase for testing error responses with and without detail.
+        """
+
+        self.assertSameOutput({"detail": ErrorDetail("Not found.", code="not_found")}, status_code=404)
+        self.assertSameOutput({"name": [ErrorDetail("This field is required.", code="required")]}, status_code=400)
+
+    def test_render_indent(self):
+        """
+        Testcase for testing pretty printed responses.
+        """
+
+        self.assertSameOutput(build_orders(2, 2), accepted_media_type="application/json; indent=4")
+
+    def test_render_paths(self):
+        """
+        Testcase for testing data is encoded with orjson, a declared dependency, and with the stdlib encoder otherwise.
+        """
+
+        context = {"response": Response(status=200)}
+        self.assertTrue(CustomRenderer.use_orjson)
+        with patch.object(renderers.orjson, "dumps", wraps=renderers.orjson.dumps) as orjson_dumps, patch.object(
+            renderers.json, "dumps", wraps=renderers.json.dumps
+        ) as json_dumps:
+            CustomRenderer().render(build_orders(2, 2), "application/json", context)
+            self.assertEqual((orjson_dumps.call_count, json_dumps.call_count), (1, 0))
+
+            StdlibCustomRenderer().render(build_orders(2, 2), "application/json", context)
+            self.assertEqual((orjson_dumps.call_count, json_dumps.call_count), (1, 1))
+
+    def test_render_integers_orjson_rejects(self):
+        """
+        Testcase for testing values orjson rejects are encoded by the stdlib encoder.
+        """
+
+        self.assertSameOutput({"id": 2**70})
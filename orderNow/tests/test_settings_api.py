@@ -0,0 +1,69 @@
+"""
+API settings profile test module
+"""
+
+import os
+from io import StringIO
+
+from ddf import G
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow import settings_api
+from orderNow.testing import QueryBudgetTestCase
+from users.models import Users
+
+
+@override_settings(MIDDLEWARE=settings_api.MIDDLEWARE)
+class ApiProfileTests(QueryBudgetTestCase):
+    """
+    Class to test the API works with the middleware of the API profile
+    """
+
+    def setUp(self):
+        self.user = G(Users)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def test_api_profile_middleware(self):
+        """
+        Testcase for testing browser only middleware is left out of the API profile.
+        """
+
+        self.assertNotIn("django.contrib.admin", settings_api.INSTALLED_APPS)
+        self.assertIn("django.contrib.auth", settings_api.INSTALLED_APPS)
+        self.assertNotIn("django.middleware.csrf.CsrfViewMiddleware", settings_api.MIDDLEWARE)
+        self.assertIn("orderNow.middleware.PerformanceMetricsMiddleware", settings_api.MIDDLEWARE)
+
+    def test_api_profile_requests_success(self):
+        """
+        Testcase for testing reads and writes are served without browser only middleware.
+        """
+
+        response = self.client.post(
+            reverse("restaurants:restaurants-list"),
+            data={"name": "Restaurant"},
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("X-Frame-Options", response)
+
+        response = self.client.get(reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 1)
+
+    def test_measure_startup(self):
+        """
+        Testcase for testing startup and middleware times are reported per profile.
+        """
+
+        stdout = StringIO()
+        profile = os.environ["DJANGO_SETTINGS_MODULE"]
+        call_command("measure_startup", "--profile", profile, "--runs", "1", "--requests", "10", stdout=stdout)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split()[0], profile)
@@ -0,0 +1,168 @@
+"""
+Traffic capture and replay test module
+"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from ddf import G
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from restaurants.models import Restaurants
+from users.models import Users
+
+
+class TrafficCaptureTests(QueryBudgetTestCase):
+    """
+    Class to test traffic capture middleware
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "traffic.jsonl"
+        self.user = G(Users)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def capture_settings(self, **kwargs):
+        config = {
+            "ENABLED": True,
+            "SAMPLE_RATE": 1,
+            "PATH": self.path,
+            "MAX_BODY_BYTES": 1024,
+            "REDACT_FIELDS": ["password"],
+            **kwargs,
+        }
+        return override_settings(TRAFFIC_CAPTURE=config)
+
+    def test_capture_request_success(self):
+        """
+        Testcase for testing requests are captured with redacted body and anonymized identity.
+        """
+
+        with self.capture_settings():
+            self.client.post(
+                reverse("restaurants:restaurants-list"),
+                data={"name": "Restaurant", "password": "secret"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {self.token}",
+            )
+            self.client.get(reverse("restaurants:restaurants-list") + "?search=1")
+
+        events = [json.loads(line) for line in self.path.read_text().splitlines()]
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]["method"], "POST")
+        self.assertEqual(events[0]["path"], "/restaurants/")
+        self.assertEqual(events[0]["body"], {"name": "Restaurant", "password": "***"})
+        self.assertEqual(events[0]["status"], 201)
+        self.assertEqual(len(events[0]["identity"]), 16)
+        self.assertNotIn(str(self.user.id), events[0]["identity"])
+        self.assertEqual(events[1]["query"], "search=1")
+        self.assertEqual(events[1]["identity"], None)
+        self.assertEqual(events[1]["body"], None)
+
+    def test_capture_disabled_by_sample_rate(self):
+        """
+        Testcase for testing requests outside the sample rate are not captured.
+        """
+
+        with self.capture_settings(SAMPLE_RATE=0):
+            self.client.get(reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        self.assertFalse(self.path.exists())
+
+
+class ReplayTrafficTests(LiveServerTestCase):
+    """
+    Class to test replay traffic command
+    """
+
+    def replay(self, events: list, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "traffic.jsonl"
+            path.write_text("\n".join(json.dumps(event) for event in events))
+            stdout, stderr = StringIO(), StringIO()
+            call_command(
+                "replay_traffic",
+                str(path),
+                "--base-url",
+                self.live_server_url,
+                "--speed",
+                "0",
+                *args,
+                stdout=stdout,
+                stderr=stderr,
+            )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_replay_traffic_success(self):
+        """
+        Testcase for testing captured requests are replayed and reported.
+        """
+
+        user = G(Users)
+        G(Restaurants, owner=user)
+        events = [
+            {"ts": 1.0, "method": "GET", "path": "/restaurants/", "query": "", "body": None, "identity": "a"},
+            {"ts": 1.1, "method": "POST", "path": "/restaurants/", "query": "", "body": {"name": "R"}, "identity": "a"},
+            {"ts": 1.2, "method": "GET", "path": "/restaurants/", "query": "", "body": None, "identity": None},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "traffic.jsonl"
+            path.write_text("\n".join(json.dumps(event) for event in events))
+            identity_map = Path(directory) / "identities.json"
+            identity_map.write_text(json.dumps({"a": user.id}))
+            stdout = StringIO()
+
+            call_command(
+                "replay_traffic",
+                str(path),
+                "--base-url",
+                self.live_server_url,
+                "--speed",
+                "0",
+                "--identity-map",
+                str(identity_map),
+                stdout=stdout,
+            )
+
+        output = stdout.getvalue()
+        self.assertIn("Replayed 3 requests", output)
+        self.assertRegex(output, r"GET /restaurants/\s+2\s+1\s+0.0%")
+        self.assertRegex(output, r"POST /restaurants/\s+1\s+0\s+0.0%")
+        self.assertEqual(Restaurants.objects.filter(name="R", owner=user).count(), 1)
+
+    def test_replay_traffic_counts_failed_requests(self):
+        """
+        Testcase for testing requests raising while being sent are reported as errors.
+        """
+
+        events = [
+            {"ts": 1.0, "method": "GET", "path": "/restaurants/", "query": "", "body": None, "identity": None},
+            {"ts": 1.1, "method": "GET", "path": "/restaurants/", "body": None, "identity": None},
+        ]
+
+        stdout, stderr = self.replay(events)
+
+        self.assertIn("Replayed 2 requests", stdout)
+        self.assertRegex(stdout, r"GET /restaurants/\s+2\s+1\s+50.0%")
+        self.assertIn("GET /restaurants/: KeyError('query')", stderr)
+
+    def test_replay_traffic_rejects_unknown_users(self):
+        """
+        Testcase for testing replay fails before sending any request when a user to authenticate as does not exist.
+        """
+
+        user = G(Users)
+        events = [{"ts": 1.0, "method": "POST", "path": "/restaurants/", "query": "", "body": {}, "identity": "a"}]
+
+        with self.assertRaisesMessage(CommandError, f"Users not found: {user.id + 1}"):
+            self.replay(events, "--user", str(user.id + 1))
+        self.assertEqual(Restaurants.objects.count(), 0)
@@ -15,10 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 
-from orderNow.views import error_404, error_500
+from orderNow.views import error_404, error_500, metrics
 
 handler500 = error_500
 handler404 = error_404
@@ -27,5 +27,11 @@ urlpatterns = [
     path("", include("users.urls")),
     path("", include("restaurants.urls")),
     path("", include("orders.urls")),
-    path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
 ]
+
+# Not installed by the API profile, orderNow.settings_api
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
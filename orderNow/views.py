@@ -2,9 +2,13 @@
 Views Module
 """
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from rest_framework import status
 
+from orderNow.metrics import registry
+
 
 def error_404(request, exception):
     """
@@ -25,3 +29,28 @@ def error_500(request):
         {"status": "error", "data": None, "message": "Internal Server Error"},
         status=status.HTTP_500_INTERNAL_SERVER_ERROR,
     )
+
+
+def metrics_allowed(request) -> bool:
+    """
+    Function to check if a request may read the performance metrics
+
+    Returns:
+        bool: `True` if the request comes from an allowed address or bears the metrics token
+    """
+
+    config = settings.PERFORMANCE_METRICS
+    token = config["TOKEN"]
+    if token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return True
+    return request.META.get("REMOTE_ADDR") in config["ALLOWED_IPS"]
+
+
+def metrics(request):
+    """
+    View exposing performance metrics of this process in the Prometheus text format
+    """
+
+    if not metrics_allowed(request):
+        return error_404(request, None)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,173 @@
+"""
+Orders archive module
+
+Delivered and cancelled orders are moved from `Orders` and `OrderItems` to `ArchivedOrders` and
+`ArchivedOrderItems` once they are older than `ORDER_ARCHIVE["AFTER_DAYS"]`, keeping the indexes of
+the live tables small. Orders keep their ids, so they are still served by order retrieve and export.
+
+Archived orders are added to rollups in the transaction moving them, so reports read the rollups
+instead of the archive. Archived orders no longer show up in delta syncs, clients keep the state
+they last synced, which is final. Each shard archives its own orders into its own archive and rollups.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from orderNow.data_migrations import run_in_batches
+from orders.models import (
+    ArchivedOrderItems,
+    ArchivedOrders,
+    CustomerItemRollups,
+    CustomerSpendRollups,
+    OrderItems,
+    Orders,
+)
+from orders.shards import on_shard, shard_aliases, shard_for_restaurant
+
+TERMINAL_STATUSES = [Orders.OrderStatuses.DELIVERED, Orders.OrderStatuses.CANCELLED]
+
+ORDER_FIELDS = [
+    "id",
+    "status",
+    "restaurant_id",
+    "customer_id",
+    "order_datetime",
+    "updated_at",
+    "total_amount",
+    "address",
+    "contact",
+]
+ITEM_FIELDS = ["id", "item_id", "price", "quantity", "order_id"]
+
+
+def archivable_orders(before: datetime):
+    """
+    Function to get the orders in a final status which were last updated before a time
+    """
+
+    return Orders.objects.filter(status__in=TERMINAL_STATUSES, updated_at__lt=before)
+
+
+def archive_orders(before: datetime = None, **kwargs) -> int:
+    """
+    Function to move orders in a final status to the archive in batches
+
+    Args:
+        before (datetime): Orders last updated before it are archived, defaults to `ORDER_ARCHIVE["AFTER_DAYS"]` ago
+        **kwargs: Options of `run_in_batches`
+
+    Returns:
+        int: Number of archived orders
+    """
+
+    if before is None:
+        before = timezone.now() - timedelta(days=settings.ORDER_ARCHIVE["AFTER_DAYS"])
+    return sum(
+        run_in_batches(on_shard(archivable_orders(before), shard), archive_batch, **kwargs) for shard in shard_aliases()
+    )
+
+
+def archive_batch(batch) -> None:
+    """
+    Function to move a batch of orders with their items to the archive and add them to the rollups
+    """
+
+    shard = batch.db
+    orders = list(batch.select_for_update())
+    items = list(OrderItems.objects.using(shard).filter(order__in=orders))
+
+    ArchivedOrders.objects.using(shard).bulk_create(
+        [ArchivedOrders(**{field: getattr(order, field) for field in ORDER_FIELDS}) for order in orders]
+    )
+    ArchivedOrderItems.objects.using(shard).bulk_create(
+        [ArchivedOrderItems(**{field: getattr(item, field) for field in ITEM_FIELDS}) for item in items]
+    )
+    add_to_rollups(orders, items, shard)
+
+    OrderItems.objects.using(shard).filter(pk__in=[item.pk for item in items]).delete()
+    Orders.objects.using(shard).filter(pk__in=[order.pk for order in orders]).delete()
+
+
+def add_to_rollups(orders: list, items: list, shard: str) -> None:
+    spends = defaultdict(lambda: {"orders": 0, "total_amount": 0})
+    for order in orders:
+        spend = spends[(order.restaurant_id, order.customer_id, timezone.localdate(order.order_datetime))]
+        spend["orders"] += 1
+        spend["total_amount"] += order.total_amount
+    increment(CustomerSpendRollups.objects.using(shard), ["restaurant_id", "customer_id", "day"], spends)
+
+    orders_by_id = {order.id: order for order in orders}
+    counts = defaultdict(lambda: {"order_items": 0})
+    for item in items:
+        order = orders_by_id[item.order_id]
+        counts[(order.restaurant_id, order.customer_id, item.item_id)]["order_items"] += 1
+    increment(CustomerItemRollups.objects.using(shard), ["restaurant_id", "customer_id", "item_id"], counts)
+
+
+def increment(rollups, key_fields: list, increments: dict) -> None:
+    """
+    Function to add values to rollup rows, creating the missing ones
+
+    Args:
+        rollups: Manager of the rollup model, on the shard of the rollup rows
+        key_fields (list): Fields identifying a rollup row
+        increments (dict): Values to add by field, by key of the rollup row
+    """
+
+    if not increments:
+        return
+
+    lookups = {f"{field}__in": {key[i] for key in increments} for i, field in enumerate(key_fields)}
+    existing = {
+        tuple(getattr(rollup, field) for field in key_fields): rollup
+        for rollup in rollups.select_for_update().filter(**lookups)
+    }
+
+    created, updated = [], []
+    for key, values in increments.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            created.append(rollups.model(**dict(zip(key_fields, key)), **values))
+            continue
+        for field, value in values.items():
+            setattr(rollup, field, getattr(rollup, field) + value)
+        updated.append(rollup)
+
+    rollups.bulk_create(created)
+    if updated:
+        rollups.bulk_update(updated, list(next(iter(increments.values()))))
+
+
+def archived_customer_spends(restaurant_id, from_date=None, to_date=None):
+    """
+    Function to total the spends of customers over the archived orders of a restaurant
+
+    Days between the dates are read from the rollups. Like `order_datetime__range` with dates, the
+    range also includes orders placed at midnight of `to_date`, which are read from the archive.
+
+    Returns:
+        list: Spends by customer, with `customer`, `user_email` and `total_amount_spent`
+    """
+
+    shard = shard_for_restaurant(restaurant_id)
+    rollups = on_shard(CustomerSpendRollups.objects.filter(restaurant_id=restaurant_id), shard)
+    if from_date and to_date:
+        rollups = rollups.filter(day__gte=from_date, day__lt=to_date)
+    spends = list(
+        rollups.values("customer", user_email=models.F("customer__email")).annotate(
+            total_amount_spent=models.Sum("total_amount")
+        )
+    )
+
+    if from_date and to_date and from_date <= to_date:
+        midnight = timezone.make_aware(datetime.combine(to_date, time()))
+        spends += (
+            on_shard(ArchivedOrders.objects.filter(restaurant_id=restaurant_id, order_datetime=midnight), shard)
+            .values("customer", user_email=models.F("customer__email"))
+            .annotate(total_amount_spent=models.Sum("total_amount"))
+        )
+    return spends
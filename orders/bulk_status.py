@@ -0,0 +1,131 @@
+"""
+Bulk order status module
+
+Restaurant owners move many orders to a status in one request. The orders of each shard are locked
+with a single query and the valid transitions applied with a single update, instead of one locked
+read and save per order. Refunds of cancelled orders are added up per customer and credited with a
+single update, see `orders.refunds` for cancellations whose default transaction fails to commit.
+Every order gets its own result, orders failing validation are left unchanged without failing the
+others.
+"""
+
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from orders.events import ORDER_STATUS_CHANGED, publish_on_commit
+from orders.models import Orders, OrderShards, OutboxEvents
+from orders.outbox import outbox_event
+from orders.refunds import record_refunds
+from orders.shards import shard_aliases
+from restaurants.ownership import get_owned_restaurants
+from users.authentication import invalidate_cached_user
+from users.models import Users
+
+FINAL_STATUSES = [Orders.OrderStatuses.CANCELLED, Orders.OrderStatuses.DELIVERED]
+
+
+def order_ids_by_shard(order_ids: list) -> dict:
+    """
+    Function to group order ids by the shard holding them, with a single lookup
+
+    Returns:
+        dict: Order ids per database alias, unknown orders being left out
+    """
+
+    aliases = shard_aliases()
+    if len(aliases) == 1:
+        return {aliases[0]: order_ids}
+    by_shard = {}
+    for order_id, shard in OrderShards.objects.filter(pk__in=order_ids).values_list("id", "shard"):
+        by_shard.setdefault(shard, []).append(order_id)
+    return by_shard
+
+
+def refund(refunds: Counter) -> None:
+    """
+    Function to credit the refunds of cancelled orders to their customers, with a single update
+
+    Args:
+        refunds (Counter): Amount per customer id
+    """
+
+    if not refunds:
+        return
+    customer_ids = sorted(refunds)
+    list(Users.objects.select_for_update().filter(pk__in=customer_ids).order_by("pk").values_list("pk", flat=True))
+    Users.objects.filter(pk__in=customer_ids).update(
+        balance=models.F("balance")
+        + models.Case(
+            *[models.When(pk=customer_id, then=models.Value(refunds[customer_id])) for customer_id in customer_ids],
+            default=models.Value(0),
+            output_field=models.DecimalField(max_digits=9, decimal_places=2),
+        )
+    )
+    for customer_id in customer_ids:
+        transaction.on_commit(lambda customer_id=customer_id: invalidate_cached_user(customer_id))
+
+
+def update_statuses(user, order_ids: list, status: str) -> list:
+    """
+    Function to move orders of the restaurants of an owner to a status
+
+    Args:
+        user (Users): Owner of the restaurants
+        order_ids (list): Ids of the orders
+        status (str): New status of the orders
+
+    Returns:
+        list: Result of each order, with its status once updated or the error it failed with
+    """
+
+    order_ids = list(dict.fromkeys(order_ids))
+    results = {order_id: {"id": order_id, "status": None, "error": "Not found."} for order_id in order_ids}
+    owned = list(get_owned_restaurants(user.id))
+    updated_at = timezone.now()
+    refunds = Counter()
+
+    # Orders are locked before their customers, like single status updates
+    with transaction.atomic(), ExitStack() as shard_transactions:
+        for shard, shard_order_ids in order_ids_by_shard(order_ids).items():
+            shard_transactions.enter_context(transaction.atomic(using=shard))
+            orders = list(
+                Orders.objects.using(shard)
+                .select_for_update()
+                .filter(pk__in=shard_order_ids, restaurant__in=owned)
+                .order_by("pk")
+            )
+
+            updated = []
+            for order in orders:
+                if order.status in FINAL_STATUSES:
+                    results[order.id].update(
+                        status=order.status, error=f"Order cannot be updated. Current status is: {order.status}"
+                    )
+                    continue
+                order.status = status
+                order.updated_at = updated_at
+                results[order.id].update(status=status, error=None)
+                updated.append(order)
+                if status == Orders.OrderStatuses.CANCELLED:
+                    refunds[order.customer_id] += order.total_amount
+
+            if not updated:
+                continue
+            # `update` skips `auto_now`, delta syncs rely on `updated_at`
+            Orders.objects.using(shard).filter(pk__in=[order.id for order in updated]).update(
+                status=status, updated_at=updated_at
+            )
+            OutboxEvents.objects.using(shard).bulk_create(
+                [outbox_event(order, ORDER_STATUS_CHANGED) for order in updated]
+            )
+            if status == Orders.OrderStatuses.CANCELLED:
+                record_refunds(shard, updated)
+            for order in updated:
+                publish_on_commit(order, ORDER_STATUS_CHANGED)
+
+        refund(refunds)
+
+    return [results[order_id] for order_id in order_ids]
@@ -0,0 +1,207 @@
+"""
+Carts module
+
+Customers add items to a server-side cart, each added item holding its quantity of the stock of
+the item for `ORDER_CARTS["HOLD_SECONDS"]`: the quantity is taken from `Menus.quantity` when the
+item is added, so stock is validated one item at a time as the cart is built. Checkout converts
+the held items into an order without locking the menu items again, only the customer is locked
+for the balance. Holds still in the cart at checkout are converted even if they expired, as their
+stock was never given back.
+
+Items on flash sale also take their reservation tokens when added, put back with their stock.
+Removed items give their stock back at once, expired ones are released in batches by
+`manage.py release_cart_holds`. Menu items are locked before the cart items holding them, like
+when items are added, so adding and releasing do not deadlock.
+"""
+
+from collections import Counter
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from rest_framework import serializers
+
+from orderNow.data_migrations import run_in_batches
+from orders.events import ORDER_CREATED, publish_on_commit
+from orders.models import CartItems, OrderItems, Orders
+from orders.outbox import add_to_outbox
+from orders.serializers import check_profile, delivery_address
+from orders.shards import shard_for_restaurant
+from restaurants.flash_sale import put_back_tokens, reserved_stock
+from restaurants.models import Menus
+from users.models import Users
+
+
+def hold_item(customer, item_id: int, quantity: int) -> CartItems:
+    """
+    Function to add an item to the cart of a customer, holding its quantity of the stock
+
+    Args:
+        customer (Users): Customer owning the cart
+        item_id (int): Id of the menu item
+        quantity (int): Quantity added to the cart
+
+    Returns:
+        CartItems: Cart item, with the quantity held in total
+    """
+
+    expires_at = timezone.now() + timedelta(seconds=settings.ORDER_CARTS["HOLD_SECONDS"])
+    # Holds of flash sale items take their tokens, given back with the stock when released
+    with reserved_stock([{"id": item_id, "quantity": quantity}]), transaction.atomic():
+        menu_item = Menus.objects.select_for_update().select_related("restaurant").filter(pk=item_id).first()
+        if menu_item is None or not menu_item.restaurant.is_active:
+            raise serializers.ValidationError({"Items": f"Invalid item id: {item_id}"})
+        if customer.cart_items.exclude(item__restaurant=menu_item.restaurant_id).exists():
+            raise serializers.ValidationError({"Items": "Select all items from same restaurant"})
+        if menu_item.quantity < quantity:
+            raise serializers.ValidationError({"Items": f"Not enough quantity available for item: {menu_item.name}"})
+
+        menu_item.quantity -= quantity
+        menu_item.save(update_fields=["quantity"])
+        cart_item, created = CartItems.objects.select_for_update().get_or_create(
+            customer=customer,
+            item=menu_item,
+            defaults={"quantity": quantity, "price": menu_item.price, "expires_at": expires_at},
+        )
+        if not created:
+            cart_item.quantity += quantity
+            cart_item.price = menu_item.price
+            cart_item.expires_at = expires_at
+            cart_item.save(update_fields=["quantity", "price", "expires_at"])
+    return cart_item
+
+
+def restock(quantities: Counter) -> None:
+    """
+    Function to give held quantities back to the stock of their items, with a single update
+
+    Args:
+        quantities (Counter): Quantity per menu item id
+    """
+
+    if not quantities:
+        return
+    Menus.objects.filter(pk__in=quantities).update(
+        quantity=models.F("quantity")
+        + models.Case(
+            *[models.When(pk=item_id, then=models.Value(quantity)) for item_id, quantity in quantities.items()],
+            default=models.Value(0),
+        )
+    )
+    transaction.on_commit(lambda: put_back_tokens(quantities))
+
+
+def release_holds(holds) -> int:
+    """
+    Function to delete cart items, giving their quantity back to the stock
+
+    Args:
+        holds: Queryset of the cart items, evaluated once their menu items are locked
+
+    Returns:
+        int: Number of released cart items
+    """
+
+    item_ids = sorted(set(holds.values_list("item_id", flat=True)))
+    list(Menus.objects.select_for_update().filter(pk__in=item_ids).order_by("pk").values_list("pk", flat=True))
+    released = list(holds.select_for_update().order_by("pk"))
+
+    quantities = Counter()
+    for cart_item in released:
+        quantities[cart_item.item_id] += cart_item.quantity
+    restock(quantities)
+    CartItems.objects.filter(pk__in=[cart_item.pk for cart_item in released]).delete()
+    return len(released)
+
+
+def release_item(customer, item_id: int) -> bool:
+    """
+    Function to remove an item from the cart of a customer
+
+    Returns:
+        bool: `False` if the item was not in the cart
+    """
+
+    with transaction.atomic():
+        return release_holds(customer.cart_items.filter(item_id=item_id)) > 0
+
+
+def release_expired_holds(batch_size: int = None) -> int:
+    """
+    Function to release the expired cart items of every customer in batches
+
+    Args:
+        batch_size (int): Number of cart items per transaction, defaults to `ORDER_CARTS["BATCH_SIZE"]`
+
+    Returns:
+        int: Number of released cart items
+    """
+
+    released = 0
+
+    def release(batch):
+        nonlocal released
+        # Holds extended since the batch was selected are kept
+        released += release_holds(batch.filter(expires_at__lte=timezone.now()))
+
+    expired = CartItems.objects.filter(expires_at__lte=timezone.now())
+    run_in_batches(expired, release, batch_size=batch_size or settings.ORDER_CARTS["BATCH_SIZE"])
+    return released
+
+
+def checkout_cart(customer_id: int) -> Orders:
+    """
+    Function to place an order with the items held by the cart of a customer
+
+    Args:
+        customer_id (int): Id of the customer
+
+    Returns:
+        Orders: Placed order
+    """
+
+    # The order is written to the shard of its restaurant, whose transaction commits before the default one,
+    # orders left on their shard by a failing default commit are cancelled by orders.reconciliation
+    with transaction.atomic(), ExitStack() as shard_transaction:
+        customer = Users.objects.select_for_update().get(pk=customer_id)
+        check_profile(customer)
+
+        cart_items = list(CartItems.objects.select_for_update().filter(customer=customer).order_by("pk"))
+        if not cart_items:
+            raise serializers.ValidationError({"Cart": "Cart is empty"})
+        prefetch_related_objects(cart_items, "item__restaurant")
+        restaurant = cart_items[0].item.restaurant
+        if not restaurant.is_active:
+            raise serializers.ValidationError({"Items": f"Invalid item id: {cart_items[0].item_id}"})
+
+        total_amount = sum(cart_item.price * cart_item.quantity for cart_item in cart_items)
+        if customer.balance < total_amount:
+            raise serializers.ValidationError({"Profile": "Not enough balance"})
+
+        shard = shard_for_restaurant(restaurant.id)
+        shard_transaction.enter_context(transaction.atomic(using=shard))
+        order = Orders.objects.using(shard).create(
+            restaurant=restaurant,
+            customer=customer,
+            total_amount=total_amount,
+            contact=customer.phone_number,
+            address=delivery_address(customer),
+        )
+        OrderItems.objects.using(shard).bulk_create(
+            [
+                OrderItems(order=order, item=cart_item.item, price=cart_item.price, quantity=cart_item.quantity)
+                for cart_item in cart_items
+            ]
+        )
+
+        customer.balance -= total_amount
+        customer.save()
+        CartItems.objects.filter(pk__in=[cart_item.pk for cart_item in cart_items]).delete()
+        add_to_outbox(order, ORDER_CREATED)
+        publish_on_commit(order, ORDER_CREATED)
+
+    prefetch_related_objects([order], "items__item")
+    return order
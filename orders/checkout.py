@@ -0,0 +1,87 @@
+"""
+Multi-restaurant checkout module
+
+A checkout places the items of several restaurants in a single request and transaction, split into
+one order per restaurant. The customer is locked and debited once for the total of the orders, the
+menu items of every restaurant are locked with a single query and their stock is updated with a
+single batched update. Either every order of the checkout is placed, or none of them.
+"""
+
+from contextlib import ExitStack
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from rest_framework import serializers
+
+from orders.group_commit import insert_orders
+from orders.models import Orders
+from orders.serializers import check_profile, delivery_address
+from restaurants.models import Menus
+from users.models import Users
+
+
+def place_checkout(customer_id: int, items: list) -> list:
+    """
+    Function to place the items of a checkout as one order per restaurant
+
+    Args:
+        customer_id (int): Id of the customer
+        items (list): Items of the checkout, with `id` and `quantity`
+
+    Returns:
+        list: Placed orders, in the order their restaurants first appear in the items
+    """
+
+    with transaction.atomic(), ExitStack() as shard_transactions:
+        customer = Users.objects.select_for_update().get(pk=customer_id)
+        check_profile(customer)
+
+        # Items are locked with a single query, in primary key order
+        menu_items = {
+            menu_item.pk: menu_item
+            for menu_item in Menus.objects.select_for_update()
+            .select_related("restaurant")
+            .filter(pk__in=[item_data["id"] for item_data in items])
+            .order_by("pk")
+        }
+
+        lines_by_restaurant = {}
+        for item_data in items:
+            item_id, quantity = item_data["id"], item_data["quantity"]
+            menu_item = menu_items.get(item_id)
+            if menu_item is None or not menu_item.restaurant.is_active:
+                raise serializers.ValidationError({"Items": f"Invalid item id: {item_id}"})
+            if menu_item.quantity < quantity:
+                raise serializers.ValidationError(
+                    {"Items": f"Not enough quantity available for item: {menu_item.name}"}
+                )
+            menu_item.quantity -= quantity
+            lines_by_restaurant.setdefault(menu_item.restaurant, []).append((menu_item, quantity))
+
+        orders = [
+            (
+                Orders(
+                    restaurant=restaurant,
+                    customer=customer,
+                    total_amount=sum(menu_item.price * quantity for menu_item, quantity in lines),
+                    contact=customer.phone_number,
+                    address=delivery_address(customer),
+                ),
+                lines,
+            )
+            for restaurant, lines in lines_by_restaurant.items()
+        ]
+        total_amount = sum(order.total_amount for order, _ in orders)
+        if customer.balance < total_amount:
+            raise serializers.ValidationError({"Profile": "Not enough balance"})
+
+        insert_orders(orders, shard_transactions)
+        Menus.objects.bulk_update(list(menu_items.values()), ["quantity"])
+        customer.balance -= total_amount
+        customer.save()
+
+    orders = [order for order, _ in orders]
+    # Items are read from the shard of the orders they are prefetched for
+    for shard in {order._state.db for order in orders}:
+        prefetch_related_objects([order for order in orders if order._state.db == shard], "items__item")
+    return orders
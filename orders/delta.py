@@ -0,0 +1,58 @@
+"""
+Orders delta sync module
+
+Changes are read in `(updated_at, id)` order after a high-water mark, which clients keep as an
+opaque `since` token of the form `<updated_at in microseconds>-<id>`.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_since(updated_at: datetime, pk: int) -> str:
+    """
+    Function to build the token of a high-water mark
+
+    Args:
+        updated_at (datetime): Modification time of the last change
+        pk (int): Id of the last change
+
+    Returns:
+        str: Token
+    """
+
+    return f"{(updated_at - EPOCH) // MICROSECOND}-{pk}"
+
+
+def decode_since(token: str) -> tuple:
+    """
+    Function to read the high-water mark of a token, `0` being the start of time
+
+    Args:
+        token (str): Token given by a client
+
+    Returns:
+        tuple: Modification time and id of the last change seen by the client
+    """
+
+    micros, _, pk = token.partition("-")
+    try:
+        return EPOCH + int(micros) * MICROSECOND, int(pk or 0)
+    except (ValueError, OverflowError):
+        raise ValidationError({"since": ["Invalid since token."]})
+
+
+def changed_since(queryset, since: tuple):
+    """
+    Function to filter orders changed after a high-water mark, in the order of their tokens
+    """
+
+    updated_at, pk = since
+    return queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk)).order_by(
+        "updated_at", "pk"
+    )
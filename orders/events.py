@@ -0,0 +1,199 @@
+"""
+Order events module
+
+Order events are published to a channel per restaurant once the transaction creating or updating
+the order is committed, and delivered to the subscribers of the channel, the server-sent event
+streams of `orders.streams`.
+
+The default broker keeps subscribers in this process, so it only reaches the streams served by the
+worker which committed the order. Deployments with several workers replace it with a broker backed
+by shared infrastructure, selected by `ORDER_EVENTS["BROKER"]`.
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+@dataclass
+class Event:
+    """
+    Event of a channel, identified by the epoch of its broker and its sequence number in the channel
+    """
+
+    id: str
+    type: str
+    data: str
+
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    Events of a channel queued for one subscriber
+
+    A subscriber not keeping up fills its queue and is marked overflowed, it should then close its
+    stream and resume from the last event it received.
+    """
+
+    channel: str
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+    overflowed: bool = field(default=False)
+
+    def deliver(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class InProcessBroker:
+    """
+    Broker delivering events to the subscribers of this process
+
+    Events of each channel are numbered and the latest are kept, so subscribers reconnecting with
+    the id of the last event they received get the events they missed.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+        self.history = {}
+        self.sequences = {}
+
+    @property
+    def config(self) -> dict:
+        return settings.ORDER_EVENTS
+
+    def publish(self, channel: str, event_type: str, data: dict) -> Event:
+        """
+        Function to publish an event to the subscribers of a channel, it may be called from any thread
+
+        Args:
+            channel (str): Name of the channel
+            event_type (str): Type of the event
+            data (dict): Payload of the event
+
+        Returns:
+            Event: Published event
+        """
+
+        payload = json.dumps(data, cls=JSONEncoder, separators=(",", ":"))
+        with self.lock:
+            sequence = self.sequences[channel] = self.sequences.get(channel, 0) + 1
+            event = Event(f"{self.epoch}:{sequence}", event_type, payload)
+            history = self.history.get(channel)
+            if history is None:
+                history = self.history[channel] = deque(maxlen=self.config["REPLAY_SIZE"])
+            history.append((sequence, event))
+            subscriptions = list(self.subscriptions.get(channel, ()))
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Loop of the subscriber is closed
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self, channel: str, last_event_id: str = None):
+        """
+        Function to subscribe the running event loop to a channel
+
+        Args:
+            channel (str): Name of the channel
+            last_event_id (str): Id of the last event received by the subscriber, if it is resuming
+
+        Returns:
+            tuple: Subscription and the events missed since `last_event_id`. Missed events are `None`
+            when they are no longer known, the subscriber must then reload its state.
+        """
+
+        subscription = Subscription(channel, asyncio.get_running_loop(), asyncio.Queue(self.config["QUEUE_SIZE"]))
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+            missed = [] if last_event_id is None else self.missed_events(channel, last_event_id)
+        return subscription, missed
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def last_event_id(self, channel: str) -> str:
+        with self.lock:
+            return f"{self.epoch}:{self.sequences.get(channel, 0)}"
+
+    def missed_events(self, channel: str, last_event_id: str):
+        epoch, _, sequence = last_event_id.partition(":")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+
+        sequence = int(sequence)
+        history = self.history.get(channel, ())
+        oldest = history[0][0] if history else self.sequences.get(channel, 0) + 1
+        if sequence < oldest - 1:
+            return None
+        return [event for event_sequence, event in history if event_sequence > sequence]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Function to get the broker of this process, of the class configured by `ORDER_EVENTS["BROKER"]`
+    """
+
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.ORDER_EVENTS["BROKER"])()
+    return _broker
+
+
+def restaurant_channel(restaurant_id: int) -> str:
+    return f"restaurant:{restaurant_id}"
+
+
+datetime_field = serializers.DateTimeField()
+
+
+def order_event_data(order) -> dict:
+    return {
+        "id": order.id,
+        "status": order.status,
+        "total_amount": order.total_amount,
+        "customer_id": order.customer_id,
+        "updated_at": datetime_field.to_representation(order.updated_at),
+    }
+
+
+def publish_on_commit(order, event_type: str) -> None:
+    """
+    Function to publish an event of an order once the current transaction is committed
+
+    Args:
+        order (Orders): Created or updated order
+        event_type (str): Type of the event
+    """
+
+    data = order_event_data(order)
+    transaction.on_commit(lambda: get_broker().publish(restaurant_channel(order.restaurant_id), event_type, data))
@@ -0,0 +1,139 @@
+"""
+Orders export module
+
+Exports are generated lazily for `StreamingHttpResponse`. Orders are read in primary key ordered
+chunks (keyset pagination) with the items of a chunk in one more query, so memory stays bounded by
+the chunk size whatever the export size. mysqlclient buffers whole result sets on the client, so
+`QuerySet.iterator` would not bound memory on MySQL.
+"""
+
+import csv
+import json
+from collections import defaultdict
+
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+ORDER_FIELDS = ["id", "order_datetime", "updated_at", "status", "total_amount", "address", "contact"]
+
+CSV_COLUMNS = [
+    "order_id",
+    "order_datetime",
+    "updated_at",
+    "status",
+    "restaurant",
+    "customer",
+    "total_amount",
+    "address",
+    "contact",
+    "item_id",
+    "item",
+    "price",
+    "quantity",
+]
+
+datetime_field = serializers.DateTimeField()
+
+
+def iter_orders(queryset, chunk_size: int = 1000):
+    """
+    Function to iterate over orders with their items, shaped like the output of OrdersSerializer
+
+    Args:
+        queryset: Orders or archived orders to export
+        chunk_size (int): Number of orders read per query
+
+    Yields:
+        dict: Order with its items
+    """
+
+    items_model = queryset.model._meta.get_field("items").related_model
+    queryset = queryset.order_by("pk").values(
+        *ORDER_FIELDS, restaurant_name=F("restaurant__name"), customer_username=F("customer__username")
+    )
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        orders = list(chunk[:chunk_size])
+        if not orders:
+            return
+
+        items = defaultdict(list)
+        order_items = (
+            items_model.objects.using(queryset.db)
+            .filter(order_id__in=[order["id"] for order in orders])
+            .order_by("pk")
+            .values("order_id", "id", "price", "quantity", item_name=F("item__name"))
+        )
+        for item in order_items:
+            items[item["order_id"]].append(
+                {"price": item["price"], "quantity": item["quantity"], "id": item["id"], "item": item["item_name"]}
+            )
+
+        for order in orders:
+            yield {
+                "id": order["id"],
+                "restaurant": order["restaurant_name"],
+                "customer": order["customer_username"],
+                "items": items[order["id"]],
+                "order_datetime": datetime_field.to_representation(order["order_datetime"]),
+                "updated_at": datetime_field.to_representation(order["updated_at"]),
+                "total_amount": order["total_amount"],
+                "status": order["status"],
+                "address": order["address"],
+                "contact": order["contact"],
+            }
+        last_pk = orders[-1]["id"]
+
+
+def ndjson_rows(orders):
+    """
+    Function to encode orders as newline delimited JSON, one order per line
+    """
+
+    for order in orders:
+        yield json.dumps(order, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class Echo:
+    """
+    File like object returning what is written, for csv writers feeding a streaming response
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_rows(orders):
+    """
+    Function to encode orders as csv, one row per order item
+    """
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for order in orders:
+        for item in order["items"]:
+            yield writer.writerow(
+                [
+                    order["id"],
+                    order["order_datetime"],
+                    order["updated_at"],
+                    order["status"],
+                    order["restaurant"],
+                    order["customer"],
+                    order["total_amount"],
+                    order["address"],
+                    order["contact"],
+                    item["id"],
+                    item["item"],
+                    item["price"],
+                    item["quantity"],
+                ]
+            )
+
+
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_rows, "application/x-ndjson"),
+    "csv": (csv_rows, "text/csv"),
+}
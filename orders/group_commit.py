@@ -0,0 +1,284 @@
+"""
+Order group commit module
+
+With `ORDER_GROUP_COMMIT["ENABLED"]`, order placements of a process arriving within
+`WINDOW_MS` of each other are placed together by the first of them, the leader of the group. The
+leader locks the customers and menu items of the whole group once, validates every order against
+that snapshot in arrival order, inserts the orders and their items in bulk and commits once, so the
+commit is paid once per group instead of once per order.
+
+Every order still succeeds or fails on its own, with the errors of a synchronous placement. Orders
+failing validation leave the snapshot unchanged for the orders after them. If the group transaction
+fails as a whole, its placements raise the error, and are placed again on their own by the view.
+
+Placements wait for their group on the thread of their request, so groups only grow when requests
+are served by concurrent threads, as with a threaded WSGI server like `gunicorn --threads`. Under
+ASGI, sync views run one at a time on a single thread, each placement would wait out the window
+alone, so group commit is off when `ORDERNOW_SERVER` is "asgi".
+"""
+
+import threading
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from rest_framework import serializers
+
+from orders.events import ORDER_CREATED, publish_on_commit
+from orders.models import OrderItems, Orders, OrderShards, OutboxEvents
+from orders.outbox import outbox_event
+from orders.serializers import check_profile, delivery_address
+from orders.shards import shard_for_restaurant
+from restaurants.models import Menus
+from users.authentication import invalidate_cached_user
+from users.models import Users
+
+
+def group_commit_enabled() -> bool:
+    return settings.ORDER_GROUP_COMMIT["ENABLED"] and settings.ORDERNOW_SERVER != "asgi"
+
+
+@dataclass(eq=False)
+class Placement:
+    """
+    Order placement waiting for its group to be committed
+    """
+
+    customer_id: int
+    items: list
+    done: threading.Event = field(default_factory=threading.Event)
+    order: Orders = None
+    error: Exception = None
+
+
+class GroupCommitter:
+    """
+    Collector of the order placements of this process into groups committed once
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+        self.full = threading.Event()
+
+    @property
+    def config(self) -> dict:
+        return settings.ORDER_GROUP_COMMIT
+
+    def place(self, customer_id: int, items: list) -> Orders:
+        """
+        Function to place an order with the next group
+
+        Args:
+            customer_id (int): Id of the customer
+            items (list): Items of the order, with `id` and `quantity`
+
+        Returns:
+            Orders: Placed order
+
+        Raises:
+            ValidationError: If the order can not be placed
+            DatabaseError: If the group transaction failed
+        """
+
+        placement = Placement(customer_id, items)
+        with self.lock:
+            self.pending.append(placement)
+            leader = len(self.pending) == 1
+            if len(self.pending) >= self.config["MAX_GROUP_SIZE"]:
+                self.full.set()
+
+        if leader:
+            self.full.wait(self.config["WINDOW_MS"] / 1000)
+            with self.lock:
+                group, self.pending = self.pending, []
+                self.full.clear()
+            commit_group(group)
+        else:
+            placement.done.wait()
+
+        if placement.error is not None:
+            raise placement.error
+        return placement.order
+
+
+_committer = None
+_committer_lock = threading.Lock()
+
+
+def get_group_committer() -> GroupCommitter:
+    """
+    Function to get the group committer of this process
+    """
+
+    global _committer
+    if _committer is None:
+        with _committer_lock:
+            if _committer is None:
+                _committer = GroupCommitter()
+    return _committer
+
+
+def commit_group(group: list) -> None:
+    """
+    Function to place a group of orders, waking up the placements waiting for it
+    """
+
+    try:
+        place_group(group)
+    except DatabaseError as error:
+        # Every order of the group is placed again on its own by the view
+        for placement in group:
+            placement.order, placement.error = None, error
+    except Exception as error:
+        # Orders validated before the error were rolled back with the group
+        for placement in group:
+            placement.order = None
+            if placement.error is None:
+                placement.error = error
+    finally:
+        for placement in group:
+            placement.done.set()
+
+
+def build_order(placement: Placement, customers: dict, menus: dict):
+    """
+    Function to validate an order against the locked snapshot, taking its items and amount from it if valid
+
+    Returns:
+        tuple: Unsaved order and its items, as a list of menu item and quantity
+    """
+
+    customer = customers[placement.customer_id]
+    check_profile(customer)
+
+    restaurant = None
+    lines = []
+    ordered = Counter()
+    for item_data in placement.items:
+        item_id, quantity = item_data["id"], item_data["quantity"]
+        menu_item = menus.get(item_id)
+        if menu_item is None:
+            raise serializers.ValidationError({"Items": f"Invalid item id: {item_id}"})
+
+        if restaurant is None:
+            restaurant = menu_item.restaurant
+            if not restaurant.is_active:
+                raise serializers.ValidationError({"Items": f"Invalid item id: {item_id}"})
+        elif restaurant != menu_item.restaurant:
+            raise serializers.ValidationError({"Items": "Select all items from same restaurant"})
+
+        if menu_item.quantity - ordered[item_id] < quantity:
+            raise serializers.ValidationError({"Items": f"Not enough quantity available for item: {menu_item.name}"})
+        ordered[item_id] += quantity
+        lines.append((menu_item, quantity))
+
+    total_amount = sum(menu_item.price * quantity for menu_item, quantity in lines)
+    if customer.balance < total_amount:
+        raise serializers.ValidationError({"Profile": "Not enough balance"})
+
+    for menu_item, quantity in lines:
+        menu_item.quantity -= quantity
+    customer.balance -= total_amount
+    order = Orders(
+        restaurant=restaurant,
+        customer=customer,
+        total_amount=total_amount,
+        contact=customer.phone_number,
+        address=delivery_address(customer),
+    )
+    return order, lines
+
+
+def allocate_order_ids(allocations: list) -> None:
+    """
+    Function to insert the `OrderShards` rows allocating the ids of new orders, setting their primary keys
+
+    The rows are inserted with a single query where the database returns the ids of bulk inserts.
+    Others, like MySQL, do not tell which ids a multi-row insert generated, the rows are inserted
+    one by one there.
+
+    Args:
+        allocations (list): Unsaved `OrderShards` rows
+    """
+
+    if connections[router.db_for_write(OrderShards)].features.can_return_rows_from_bulk_insert:
+        OrderShards.objects.bulk_create(allocations)
+    else:
+        for allocation in allocations:
+            allocation.save(force_insert=True)
+
+
+def insert_orders(orders: list, shard_transactions: ExitStack) -> None:
+    """
+    Function to insert orders with their items and outbox events, in bulk on the shard of each order
+
+    The transactions of the shards commit before the default one, orders left on their shard by a
+    failing default commit are cancelled by `orders.reconciliation`.
+
+    Args:
+        orders (list): Unsaved orders, each with its items as a list of menu item and quantity
+        shard_transactions (ExitStack): Stack the transactions of the shards are entered in
+    """
+
+    by_shard = defaultdict(list)
+    allocations = [OrderShards(shard=shard_for_restaurant(order.restaurant_id)) for order, _ in orders]
+    allocate_order_ids(allocations)
+    for (order, lines), allocation in zip(orders, allocations):
+        order.id = allocation.pk
+        by_shard[allocation.shard].append((order, lines))
+
+    for shard, shard_orders in by_shard.items():
+        shard_transactions.enter_context(transaction.atomic(using=shard))
+        Orders.objects.using(shard).bulk_create([order for order, _ in shard_orders])
+        OrderItems.objects.using(shard).bulk_create(
+            [
+                OrderItems(order=order, item=menu_item, price=menu_item.price, quantity=quantity)
+                for order, lines in shard_orders
+                for menu_item, quantity in lines
+            ]
+        )
+        OutboxEvents.objects.using(shard).bulk_create([outbox_event(order, ORDER_CREATED) for order, _ in shard_orders])
+        for order, _ in shard_orders:
+            publish_on_commit(order, ORDER_CREATED)
+
+
+def place_group(group: list) -> None:
+    """
+    Function to place the orders of a group in a single transaction, recording the order or error of each placement
+    """
+
+    with transaction.atomic(), ExitStack() as shard_transactions:
+        # Rows are locked in primary key order, like synchronous placements
+        customer_ids = sorted({placement.customer_id for placement in group})
+        customers = {
+            customer.pk: customer
+            for customer in Users.objects.select_for_update().filter(pk__in=customer_ids).order_by("pk")
+        }
+        item_ids = sorted({item_data["id"] for placement in group for item_data in placement.items})
+        menus = {
+            menu_item.pk: menu_item
+            for menu_item in Menus.objects.select_for_update()
+            .select_related("restaurant")
+            .filter(pk__in=item_ids)
+            .order_by("pk")
+        }
+
+        placed = []
+        for placement in group:
+            try:
+                order, lines = build_order(placement, customers, menus)
+            except serializers.ValidationError as error:
+                placement.error = error
+                continue
+            placement.order = order
+            placed.append((order, lines))
+        insert_orders(placed, shard_transactions)
+
+        if placed:
+            Menus.objects.bulk_update(list(menus.values()), ["quantity"])
+            Users.objects.bulk_update(list(customers.values()), ["balance"])
+            for customer_id in customer_ids:
+                transaction.on_commit(lambda customer_id=customer_id: invalidate_cached_user(customer_id))
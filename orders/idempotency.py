@@ -0,0 +1,117 @@
+"""
+Order placement idempotency module
+
+Clients send an `Idempotency-Key` header with order placements they may retry. The first request
+with a key claims it by inserting an `IdempotencyKeys` row in a transaction held until its response
+is stored, retries are answered with the stored response. A retry arriving while the first request
+is still running blocks on the unique index of the key until the first request commits, so the
+order is only placed once.
+
+Only successful responses are stored, a failed request releases its key and its retries run again.
+Keys expire `IDEMPOTENCY_KEYS["TTL"]` seconds after they were claimed, expired keys are removed by
+`manage.py purge_idempotency_keys`.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from orderNow.data_migrations import run_in_batches
+from orders.models import IdempotencyKeys
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(request) -> str:
+    """
+    Function to hash the method, path and data of a request, telling apart requests reusing a key
+    """
+
+    data = json.dumps(request.data, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{request.method} {request.path}\n{data}".encode()).hexdigest()
+
+
+def claim_key(user, key: str, fingerprint: str) -> IdempotencyKeys:
+    """
+    Function to claim an idempotency key of a user, in the transaction of the request
+
+    Returns:
+        IdempotencyKeys: Claimed key, with a stored response if a previous request of the key succeeded
+    """
+
+    expires_at = timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEYS["TTL"])
+    try:
+        with transaction.atomic():
+            return IdempotencyKeys.objects.create(user=user, key=key, fingerprint=fingerprint, expires_at=expires_at)
+    except IntegrityError:
+        pass
+
+    # Waits for a request still holding the key
+    record = IdempotencyKeys.objects.select_for_update().get(user=user, key=key)
+    if record.expires_at <= timezone.now():
+        record.fingerprint = fingerprint
+        record.status_code = record.response = None
+        record.expires_at = expires_at
+        record.save()
+    return record
+
+
+def idempotent(request, key: str, handler) -> Response:
+    """
+    Function to handle a request once per idempotency key of its user
+
+    Args:
+        request: Request with the idempotency key
+        key (str): Idempotency key
+        handler: Callable handling the request, returning its response
+
+    Returns:
+        Response: Response of the handler, or the stored response of the key
+    """
+
+    if not key or len(key) > IdempotencyKeys._meta.get_field("key").max_length:
+        raise ValidationError({IDEMPOTENCY_KEY_HEADER: ["Key must have 1 to 255 characters."]})
+
+    fingerprint = request_fingerprint(request)
+    with transaction.atomic():
+        record = claim_key(request.user, key, fingerprint)
+        if record.fingerprint != fingerprint:
+            raise ValidationError({IDEMPOTENCY_KEY_HEADER: ["Key was already used for a different request."]})
+        if record.status_code is not None:
+            return Response(record.response, status=record.status_code, headers={REPLAYED_HEADER: "true"})
+
+        response = handler()
+        if not status.is_success(response.status_code):
+            transaction.set_rollback(True)
+            return response
+
+        record.status_code = response.status_code
+        # Stored as rendered, so replays do not depend on the serializers
+        record.response = json.loads(json.dumps(response.data, cls=JSONEncoder))
+        record.save(update_fields=["status_code", "response"])
+        return response
+
+
+def purge_expired_keys(**kwargs) -> int:
+    """
+    Function to delete expired idempotency keys in batches
+
+    Args:
+        **kwargs: Options of `run_in_batches`
+
+    Returns:
+        int: Number of deleted keys
+    """
+
+    expired = IdempotencyKeys.objects.filter(expires_at__lte=timezone.now())
+    return run_in_batches(expired, lambda batch: batch.filter(expires_at__lte=timezone.now()).delete(), **kwargs)
@@ -0,0 +1,160 @@
+"""
+Orders intake module
+
+With `ORDER_INTAKE["ASYNC"]`, order placements are validated without locking anything, queued in
+`QueuedOrders` and answered with 202 and a handle, whose result is reported by the intake status
+endpoint. Workers of `manage.py process_order_intake` place queued orders with the same
+transaction as synchronous placements. Flash sale tokens of the items are taken when the order is
+queued and kept in its payload, they are put back when the order fails.
+
+A worker claims the oldest pending orders of a single restaurant, skipping restaurants whose
+orders another worker is placing, so workers do not wait on the locks of the same menu items.
+Orders claimed by a worker which stopped are claimed again after `ORDER_INTAKE["LEASE_SECONDS"]`,
+an order is marked placed in the transaction placing it, so it is never placed twice.
+
+An order failing with an unexpected error, like a database error, is logged and marked failed
+without placing it, the worker goes on with the other orders of its group.
+"""
+
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+from orders.models import QueuedOrders
+from orders.serializers import OrdersSerializer
+from restaurants.flash_sale import put_back_tokens
+from restaurants.models import Menus
+
+logger = logging.getLogger(__name__)
+
+PLACEMENT_ERROR = {"Order": "Order could not be placed."}
+
+
+def enqueue_order(customer, validated_data: dict, tokens: dict = None) -> QueuedOrders:
+    """
+    Function to queue an order validated by `OrdersSerializer`
+
+    Args:
+        customer (Users): Customer placing the order
+        validated_data (dict): Validated order data
+        tokens (dict): Flash sale tokens taken for the order, per item id
+
+    Returns:
+        QueuedOrders: Queued order
+    """
+
+    items = [{"id": item["id"], "quantity": item["quantity"]} for item in validated_data["items"]]
+    restaurant_id = Menus.objects.filter(pk=items[0]["id"]).values_list("restaurant_id", flat=True).first()
+    if restaurant_id is None:
+        raise serializers.ValidationError({"Items": f"Invalid item id: {items[0]['id']}"})
+    # Keys of JSON objects are strings, tokens are kept as items
+    tokens = [{"id": item_id, "quantity": quantity} for item_id, quantity in (tokens or {}).items()]
+    return QueuedOrders.objects.create(
+        customer=customer, restaurant_id=restaurant_id, payload={"items": items, "tokens": tokens}
+    )
+
+
+def put_back_queued_tokens(queued: QueuedOrders) -> None:
+    put_back_tokens({item["id"]: item["quantity"] for item in queued.payload.get("tokens", [])})
+
+
+def intake_status(queued: QueuedOrders) -> dict:
+    return {
+        "handle": str(queued.handle),
+        "status": queued.status,
+        "order_id": queued.order_id,
+        "errors": queued.errors,
+    }
+
+
+def claim_group(group_size: int) -> list:
+    """
+    Function to claim the oldest pending orders of a restaurant no other worker is placing orders of
+
+    Args:
+        group_size (int): Maximum number of orders claimed
+
+    Returns:
+        list: Claimed orders, in the order they were queued
+    """
+
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.ORDER_INTAKE["LEASE_SECONDS"])
+    claimable = QueuedOrders.objects.filter(
+        Q(status=QueuedOrders.Statuses.PENDING) | Q(status=QueuedOrders.Statuses.PROCESSING, claimed_at__lt=expired)
+    )
+    busy = QueuedOrders.objects.filter(status=QueuedOrders.Statuses.PROCESSING, claimed_at__gte=expired)
+
+    restaurant_id = (
+        claimable.exclude(restaurant__in=busy.values("restaurant"))
+        .order_by("id")
+        .values_list("restaurant", flat=True)
+        .first()
+    )
+    if restaurant_id is None:
+        return []
+
+    ids = list(claimable.filter(restaurant=restaurant_id).order_by("id").values_list("id", flat=True)[:group_size])
+    claim = uuid.uuid4()
+    # Orders claimed by another worker in the meantime are no longer claimable, and left out
+    claimable.filter(id__in=ids).update(status=QueuedOrders.Statuses.PROCESSING, claim=claim, claimed_at=now)
+    return list(QueuedOrders.objects.filter(claim=claim).order_by("id"))
+
+
+def place_queued_order(queued: QueuedOrders) -> None:
+    """
+    Function to place a queued order, recording the order or the errors it failed with
+    """
+
+    serializer = OrdersSerializer(data={"items": queued.payload["items"]})
+    with transaction.atomic():
+        # Orders claimed again by another worker once the lease of this one expired are left to it
+        if not QueuedOrders.objects.select_for_update().filter(pk=queued.pk, claim=queued.claim).exists():
+            return
+
+        try:
+            serializer.is_valid(raise_exception=True)
+            order = serializer.save(customer_id=queued.customer_id)
+        except serializers.ValidationError as error:
+            queued.status = QueuedOrders.Statuses.FAILED
+            queued.errors = json.loads(json.dumps(error.detail, cls=JSONEncoder))
+        else:
+            queued.status = QueuedOrders.Statuses.PLACED
+            queued.order_id = order.id
+        queued.save(update_fields=["status", "order_id", "errors"])
+
+    if queued.status == QueuedOrders.Statuses.FAILED:
+        put_back_queued_tokens(queued)
+
+
+def process_group(group_size: int = None) -> int:
+    """
+    Function to claim a group of queued orders and place them
+
+    Args:
+        group_size (int): Maximum number of orders placed, defaults to `ORDER_INTAKE["GROUP_SIZE"]`
+
+    Returns:
+        int: Number of processed orders
+    """
+
+    group = claim_group(group_size or settings.ORDER_INTAKE["GROUP_SIZE"])
+    for queued in group:
+        try:
+            place_queued_order(queued)
+        except Exception:
+            logger.exception("Placing queued order %s failed", queued.pk)
+            # Rolled back with its transaction, the order is not placed again
+            if QueuedOrders.objects.filter(pk=queued.pk, claim=queued.claim).update(
+                status=QueuedOrders.Statuses.FAILED, errors=PLACEMENT_ERROR
+            ):
+                put_back_queued_tokens(queued)
+    return len(group)
@@ -0,0 +1,30 @@
+"""
+Command to move delivered and cancelled orders to the archive
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Move delivered and cancelled orders not updated for ORDER_ARCHIVE['AFTER_DAYS'] days to the archive tables "
+        "in batches, adding them to the report rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Defaults to ORDER_ARCHIVE['AFTER_DAYS'].")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause after every batch.")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else settings.ORDER_ARCHIVE["AFTER_DAYS"]
+        archived = archive_orders(
+            timezone.now() - timedelta(days=days), batch_size=options["batch_size"], sleep=options["sleep"]
+        )
+        self.stdout.write(f"Archived {archived} orders")
@@ -0,0 +1,59 @@
+"""
+Command to place the orders queued by the asynchronous intake with a pool of workers
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from orders.intake import process_group
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Place the orders queued by the asynchronous intake with ORDER_INTAKE['WORKERS'] worker threads, each "
+        "claiming up to ORDER_INTAKE['GROUP_SIZE'] orders of a restaurant at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Defaults to ORDER_INTAKE['WORKERS'].")
+        parser.add_argument("--group-size", type=int, default=None, help="Defaults to ORDER_INTAKE['GROUP_SIZE'].")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        workers = options["workers"] or settings.ORDER_INTAKE["WORKERS"]
+        processed = [0] * workers
+
+        def work(worker: int) -> None:
+            try:
+                while True:
+                    try:
+                        count = process_group(options["group_size"])
+                    except Exception:
+                        # Orders claimed before the error are claimed again once their lease expired
+                        logger.exception("Worker %s failed to process a group", worker)
+                        close_old_connections()
+                        count = 0
+                    processed[worker] += count
+                    if not count:
+                        if options["once"]:
+                            return
+                        time.sleep(settings.ORDER_INTAKE["POLL_INTERVAL"])
+            finally:
+                if worker:
+                    connections.close_all()
+
+        # The first worker runs in this thread
+        threads = [threading.Thread(target=work, args=(worker,), daemon=True) for worker in range(1, workers)]
+        for thread in threads:
+            thread.start()
+        work(0)
+        for thread in threads:
+            thread.join()
+        self.stdout.write(f"Processed {sum(processed)} orders")
@@ -0,0 +1,19 @@
+"""
+Command to delete expired idempotency keys of order placements
+"""
+
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys older than IDEMPOTENCY_KEYS['TTL'] seconds in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause after every batch.")
+
+    def handle(self, *args, **options):
+        purged = purge_expired_keys(batch_size=options["batch_size"], sleep=options["sleep"])
+        self.stdout.write(f"Purged {purged} idempotency keys")
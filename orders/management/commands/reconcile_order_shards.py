@@ -0,0 +1,27 @@
+"""
+Command to repair orders of the shards whose changes were rolled back in the default database
+"""
+
+from django.core.management.base import BaseCommand
+
+from orders.reconciliation import reconcile_order_shards, reconcile_refunds
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancel orders of the shards whose OrderShards row is missing and credit refunds left pending by "
+        "cancellations, see orders.reconciliation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-seconds", type=int, default=300, help="Skip orders younger than this.")
+        parser.add_argument("--hours", type=int, default=24, help="Check orders placed within this many hours.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cancelled = reconcile_order_shards(
+            grace_seconds=options["grace_seconds"], hours=options["hours"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"Cancelled {cancelled} orphan orders")
+        credited = reconcile_refunds(grace_seconds=options["grace_seconds"], batch_size=options["batch_size"])
+        self.stdout.write(f"Credited {credited} pending refunds")
@@ -0,0 +1,31 @@
+"""
+Command to send the order events of the outbox to the configured sink
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.outbox import get_sink, relay_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the order events of the outbox of every shard to ORDER_OUTBOX['SINK'] in batches, "
+        "waiting ORDER_OUTBOX['POLL_INTERVAL'] seconds whenever the outbox is empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Defaults to ORDER_OUTBOX['BATCH_SIZE'].")
+        parser.add_argument("--once", action="store_true", help="Exit once the outbox is empty.")
+
+    def handle(self, *args, **options):
+        sink = get_sink()
+        while True:
+            sent = relay_outbox(sink, options["batch_size"])
+            if options["once"]:
+                self.stdout.write(f"Sent {sent} events")
+                return
+            if not sent:
+                time.sleep(settings.ORDER_OUTBOX["POLL_INTERVAL"])
@@ -0,0 +1,29 @@
+"""
+Command to give the stock held by expired cart items back to their menu items
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.carts import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Release cart items held longer than ORDER_CARTS['HOLD_SECONDS'] in batches, "
+        "checking again every ORDER_CARTS['SWEEP_INTERVAL'] seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Defaults to ORDER_CARTS['BATCH_SIZE'].")
+        parser.add_argument("--once", action="store_true", help="Exit once expired cart items are released.")
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_holds(options["batch_size"])
+            if options["once"]:
+                self.stdout.write(f"Released {released} cart items")
+                return
+            time.sleep(settings.ORDER_CARTS["SWEEP_INTERVAL"])
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:34
+
+from django.db import migrations, models
+from django.db.models import F
+
+from orderNow.data_migrations import FileCheckpoint, batched_update
+
+
+def backfill_updated_at(apps, schema_editor):
+    Orders = apps.get_model("orders", "Orders")
+
+    batched_update(
+        Orders.objects.using(schema_editor.connection.alias).filter(updated_at__isnull=True),
+        {"updated_at": F("order_datetime")},
+        checkpoint=FileCheckpoint("orders.0002_orders_updated_at", schema_editor.connection),
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orders',
+            name='updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orders',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='orders',
+            index=models.Index(fields=['customer', 'updated_at'], name='orders_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orders',
+            index=models.Index(fields=['restaurant', 'updated_at'], name='orders_restaurant_updated_idx'),
+        ),
+    ]
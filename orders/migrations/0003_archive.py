@@ -0,0 +1,71 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('restaurants', '0004_auto_20240119_1302'),
+        ('orders', '0002_orders_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSpendRollups',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('orders', models.PositiveIntegerField()),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='restaurants.restaurants')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CustomerItemRollups',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_items', models.PositiveIntegerField()),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='restaurants.menus')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='restaurants.restaurants')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrders',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('In Progress', 'In Progress'), ('Dispatched', 'Dispatched'), ('Delivered', 'Delivered'), ('Cancelled', 'Cancelled')], max_length=12)),
+                ('order_datetime', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('address', models.CharField(max_length=256)),
+                ('contact', models.CharField(max_length=10)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='restaurants.restaurants')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItems',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('quantity', models.PositiveIntegerField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='restaurants.menus')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='items', to='orders.archivedorders')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='customerspendrollups',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'day', 'customer'), name='customer_spend_rollups_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='customeritemrollups',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'customer', 'item'), name='customer_item_rollups_unique'),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:48
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+import django.db.models.deletion
+
+from orderNow.data_migrations import FileCheckpoint, run_in_batches
+
+
+def register_order_ids(apps, schema_editor):
+    # Existing orders are in the default database, ids are allocated there
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS:
+        return
+
+    OrderShards = apps.get_model("orders", "OrderShards")
+
+    def register(batch):
+        OrderShards.objects.bulk_create(
+            [OrderShards(id=pk, shard=DEFAULT_DB_ALIAS) for pk in batch.values_list("pk", flat=True)],
+            ignore_conflicts=True,
+        )
+
+    for model_name in ["Orders", "ArchivedOrders"]:
+        run_in_batches(
+            apps.get_model("orders", model_name).objects.all(),
+            register,
+            checkpoint=FileCheckpoint(f"orders.0004_order_shards.{model_name}", schema_editor.connection),
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('restaurants', '0004_auto_20240119_1302'),
+        ('orders', '0003_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderShards',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.RunPython(register_order_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedorderitems',
+            name='item',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, to='restaurants.menus'),
+        ),
+        migrations.AlterField(
+            model_name='archivedorders',
+            name='customer',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='archivedorders',
+            name='restaurant',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='restaurants.restaurants'),
+        ),
+        migrations.AlterField(
+            model_name='customeritemrollups',
+            name='customer',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='customeritemrollups',
+            name='item',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='restaurants.menus'),
+        ),
+        migrations.AlterField(
+            model_name='customeritemrollups',
+            name='restaurant',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='restaurants.restaurants'),
+        ),
+        migrations.AlterField(
+            model_name='customerspendrollups',
+            name='customer',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='customerspendrollups',
+            name='restaurant',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='restaurants.restaurants'),
+        ),
+        migrations.AlterField(
+            model_name='orderitems',
+            name='item',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, to='restaurants.menus'),
+        ),
+        migrations.AlterField(
+            model_name='orders',
+            name='customer',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='orders',
+            name='restaurant',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='restaurants.restaurants'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:54
+
+import django.core.serializers.json
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvents',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('event_type', models.CharField(max_length=64)),
+                ('order_id', models.BigIntegerField()),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:56
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0005_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKeys',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField(null=True)),
+                ('response', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykeys',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='idempotency_keys_unique'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('restaurants', '0004_auto_20240119_1302'),
+        ('orders', '0006_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedOrders',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('handle', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Processing', 'Processing'), ('Placed', 'Placed'), ('Failed', 'Failed')], default='Pending', max_length=12)),
+                ('claim', models.UUIDField(null=True)),
+                ('claimed_at', models.DateTimeField(null=True)),
+                ('order_id', models.BigIntegerField(null=True)),
+                ('errors', models.JSONField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurants.restaurants')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='queuedorders',
+            index=models.Index(fields=['status', 'restaurant'], name='queued_orders_status_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('restaurants', '0005_menus_flash_sale'),
+        ('orders', '0007_queued_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CartItems',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_items', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='restaurants.menus')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='cartitems',
+            constraint=models.UniqueConstraint(fields=('customer', 'item'), name='cart_items_unique'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0008_cart_items'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Refunds',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField(unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PendingRefunds',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField(unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('customer', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -2,7 +2,10 @@
 Models for Orders
 """
 
-from django.db import models
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router
 
 from restaurants.models import Menus, Restaurants
 from users.models import Users
@@ -11,6 +14,9 @@ from users.models import Users
 class Orders(models.Model):
     """
     Model class for orders
+
+    Orders are sharded by restaurant, see `orders.shards`. Their references to users, restaurants
+    and menus of the default database are not enforced by the shards.
     """
 
     class OrderStatuses(models.TextChoices):
@@ -20,20 +26,211 @@ class Orders(models.Model):
         CANCELLED = "Cancelled"
 
     status = models.CharField(max_length=12, choices=OrderStatuses.choices, default=OrderStatuses.IN_PROGRESS)
-    restaurant = models.ForeignKey(Restaurants, related_name="orders", on_delete=models.PROTECT)
-    customer = models.ForeignKey(Users, related_name="orders", on_delete=models.PROTECT)
+    restaurant = models.ForeignKey(Restaurants, related_name="orders", on_delete=models.PROTECT, db_constraint=False)
+    customer = models.ForeignKey(Users, related_name="orders", on_delete=models.PROTECT, db_constraint=False)
     order_datetime = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     total_amount = models.DecimalField(max_digits=9, decimal_places=2)
     address = models.CharField(max_length=256)
     contact = models.CharField(max_length=10)
 
+    class Meta:
+        indexes = [
+            # Delta sync of customers and restaurant owners, by (updated_at, id)
+            models.Index(fields=["customer", "updated_at"], name="orders_customer_updated_idx"),
+            models.Index(fields=["restaurant", "updated_at"], name="orders_restaurant_updated_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Ids of new orders are allocated by OrderShards, so they are unique over all shards
+        if self.id is None:
+            shard = kwargs.get("using") or router.db_for_write(Orders, instance=self)
+            self.id = OrderShards.objects.create(shard=shard).pk
+            kwargs["force_insert"] = True
+        super().save(*args, **kwargs)
+
 
 class OrderItems(models.Model):
     """
     Model class for order items
     """
 
-    item = models.ForeignKey(Menus, on_delete=models.PROTECT)
+    item = models.ForeignKey(Menus, on_delete=models.PROTECT, db_constraint=False)
     price = models.DecimalField(max_digits=9, decimal_places=2)
     quantity = models.PositiveIntegerField()
     order = models.ForeignKey(Orders, related_name="items", on_delete=models.PROTECT)
+
+
+class ArchivedOrders(models.Model):
+    """
+    Model class for delivered and cancelled orders moved out of `Orders` by `orders.archive`, keeping their ids
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    status = models.CharField(max_length=12, choices=Orders.OrderStatuses.choices)
+    restaurant = models.ForeignKey(
+        Restaurants, related_name="archived_orders", on_delete=models.PROTECT, db_constraint=False
+    )
+    customer = models.ForeignKey(Users, related_name="archived_orders", on_delete=models.PROTECT, db_constraint=False)
+    order_datetime = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    total_amount = models.DecimalField(max_digits=9, decimal_places=2)
+    address = models.CharField(max_length=256)
+    contact = models.CharField(max_length=10)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+
+class ArchivedOrderItems(models.Model):
+    """
+    Model class for items of archived orders
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    item = models.ForeignKey(Menus, on_delete=models.PROTECT, db_constraint=False)
+    price = models.DecimalField(max_digits=9, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+    order = models.ForeignKey(ArchivedOrders, related_name="items", on_delete=models.PROTECT)
+
+
+class CustomerSpendRollups(models.Model):
+    """
+    Model class for daily spends of a customer at a restaurant, totalled over archived orders
+    """
+
+    restaurant = models.ForeignKey(Restaurants, related_name="+", on_delete=models.PROTECT, db_constraint=False)
+    customer = models.ForeignKey(Users, related_name="+", on_delete=models.PROTECT, db_constraint=False)
+    day = models.DateField()
+    orders = models.PositiveIntegerField()
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["restaurant", "day", "customer"], name="customer_spend_rollups_unique"),
+        ]
+
+
+class CustomerItemRollups(models.Model):
+    """
+    Model class for the number of times a customer ordered an item, counted over archived orders
+    """
+
+    restaurant = models.ForeignKey(Restaurants, related_name="+", on_delete=models.PROTECT, db_constraint=False)
+    customer = models.ForeignKey(Users, related_name="+", on_delete=models.PROTECT, db_constraint=False)
+    item = models.ForeignKey(Menus, related_name="+", on_delete=models.PROTECT, db_constraint=False)
+    order_items = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["restaurant", "customer", "item"], name="customer_item_rollups_unique"),
+        ]
+
+
+class OrderShards(models.Model):
+    """
+    Model class allocating order ids, with the database alias of the shard holding each order
+    """
+
+    shard = models.CharField(max_length=64)
+
+
+class OutboxEvents(models.Model):
+    """
+    Model class for order events written in the transaction changing the order, until `orders.outbox` dispatches them
+    """
+
+    key = models.UUIDField(default=uuid.uuid4, unique=True)
+    event_type = models.CharField(max_length=64)
+    order_id = models.BigIntegerField()
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class PendingRefunds(models.Model):
+    """
+    Model class for refunds of cancelled orders, written on the shard of the order with its cancellation
+
+    Rows are deleted once the refund committed in the default database, see `orders.refunds`.
+    """
+
+    order_id = models.BigIntegerField(unique=True)
+    customer = models.ForeignKey(Users, related_name="+", on_delete=models.PROTECT, db_constraint=False)
+    amount = models.DecimalField(max_digits=9, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class Refunds(models.Model):
+    """
+    Model class for refunds credited to the balance of customers, at most one per order
+    """
+
+    order_id = models.BigIntegerField(unique=True)
+    customer = models.ForeignKey(Users, related_name="+", on_delete=models.PROTECT)
+    amount = models.DecimalField(max_digits=9, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class IdempotencyKeys(models.Model):
+    """
+    Model class for the responses of order placements, stored by the idempotency key of their request
+    """
+
+    user = models.ForeignKey(Users, related_name="+", on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="idempotency_keys_unique"),
+        ]
+
+
+class QueuedOrders(models.Model):
+    """
+    Model class for orders accepted by the asynchronous intake, until the workers of `orders.intake` place them
+    """
+
+    class Statuses(models.TextChoices):
+        PENDING = "Pending"
+        PROCESSING = "Processing"
+        PLACED = "Placed"
+        FAILED = "Failed"
+
+    handle = models.UUIDField(default=uuid.uuid4, unique=True)
+    customer = models.ForeignKey(Users, related_name="+", on_delete=models.CASCADE)
+    restaurant = models.ForeignKey(Restaurants, related_name="+", on_delete=models.CASCADE)
+    payload = models.JSONField()
+    status = models.CharField(max_length=12, choices=Statuses.choices, default=Statuses.PENDING)
+    claim = models.UUIDField(null=True)
+    claimed_at = models.DateTimeField(null=True)
+    order_id = models.BigIntegerField(null=True)
+    errors = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest pending orders of a restaurant
+            models.Index(fields=["status", "restaurant"], name="queued_orders_status_idx"),
+        ]
+
+
+class CartItems(models.Model):
+    """
+    Model class for the items of customer carts, each holding its quantity of the stock of the item until it expires
+
+    Held quantities are taken from `Menus.quantity` when added, and given back when removed or released
+    by `manage.py release_cart_holds` once expired, see `orders.carts`.
+    """
+
+    customer = models.ForeignKey(Users, related_name="cart_items", on_delete=models.CASCADE)
+    item = models.ForeignKey(Menus, related_name="+", on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=9, decimal_places=2)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "item"], name="cart_items_unique"),
+        ]
@@ -0,0 +1,179 @@
+"""
+Orders outbox module
+
+Events of order changes are written to `OutboxEvents` in the transaction changing the order, on its
+shard, so an event exists exactly when its change was committed. `manage.py relay_outbox` reads
+the outbox of every shard in id order, sends the events to the sink configured by
+`ORDER_OUTBOX["SINK"]` and deletes them once the sink accepted them.
+
+Delivery is at least once, a relay stopping between sending and deleting a batch sends it again.
+Consumers drop duplicates by the `key` of events. Events of an order are sent in the order they
+were committed, run a single relay so batches are not sent concurrently.
+
+The outbox metrics read every shard, scrapes of `/metrics` read them again once their values are
+older than `ORDER_OUTBOX["METRICS_TTL"]` seconds only.
+"""
+
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from orderNow.metrics import registry
+from orders.events import order_event_data
+from orders.models import OutboxEvents
+from orders.shards import shard_aliases
+
+outbox_lag = registry.gauge(
+    "ordernow_outbox_lag_seconds", "Age of the oldest order event not dispatched yet, per shard.", ("shard",)
+)
+outbox_pending = registry.gauge("ordernow_outbox_pending", "Order events not dispatched yet, per shard.", ("shard",))
+
+
+def add_to_outbox(order, event_type: str) -> None:
+    """
+    Function to write an event of an order to the outbox of its shard, in the transaction changing the order
+
+    Args:
+        order (Orders): Created or updated order
+        event_type (str): Type of the event
+    """
+
+    outbox_event(order, event_type).save(using=order._state.db)
+
+
+def outbox_event(order, event_type: str) -> OutboxEvents:
+    return OutboxEvents(
+        event_type=event_type,
+        order_id=order.id,
+        payload={**order_event_data(order), "restaurant_id": order.restaurant_id},
+    )
+
+
+def to_message(event: OutboxEvents) -> dict:
+    return {
+        "key": str(event.key),
+        "type": event.event_type,
+        "order_id": event.order_id,
+        "created_at": event.created_at.isoformat(),
+        "data": event.payload,
+    }
+
+
+class InMemorySink:
+    """
+    Sink keeping the messages it received, dropping duplicates like an idempotent consumer
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages = []
+        self.keys = set()
+
+    def send(self, messages: list) -> None:
+        with self.lock:
+            for message in messages:
+                if message["key"] not in self.keys:
+                    self.keys.add(message["key"])
+                    self.messages.append(message)
+
+
+class FileSink:
+    """
+    Sink appending messages to the JSONL file at `ORDER_OUTBOX["PATH"]`
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def send(self, messages: list) -> None:
+        lines = "".join(json.dumps(message, separators=(",", ":")) + "\n" for message in messages)
+        with self.lock, open(settings.ORDER_OUTBOX["PATH"], "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+def get_sink():
+    return import_string(settings.ORDER_OUTBOX["SINK"])()
+
+
+def relay_batch(shard: str, sink, batch_size: int) -> int:
+    """
+    Function to send the oldest events of the outbox of a shard to a sink, deleting them once sent
+
+    Args:
+        shard (str): Database alias of the shard
+        sink: Sink of the events, raising if it did not accept them
+        batch_size (int): Maximum number of events sent
+
+    Returns:
+        int: Number of events sent
+    """
+
+    events = list(OutboxEvents.objects.using(shard).order_by("id")[:batch_size])
+    if not events:
+        return 0
+
+    sink.send([to_message(event) for event in events])
+    OutboxEvents.objects.using(shard).filter(pk__in=[event.pk for event in events]).delete()
+    return len(events)
+
+
+def relay_outbox(sink=None, batch_size: int = None) -> int:
+    """
+    Function to send every event of the outbox of every shard
+
+    Args:
+        sink: Sink of the events, defaults to the one configured by `ORDER_OUTBOX["SINK"]`
+        batch_size (int): Number of events read per query, defaults to `ORDER_OUTBOX["BATCH_SIZE"]`
+
+    Returns:
+        int: Number of events sent
+    """
+
+    sink = sink or get_sink()
+    batch_size = batch_size or settings.ORDER_OUTBOX["BATCH_SIZE"]
+    sent = 0
+    for shard in shard_aliases():
+        while True:
+            count = relay_batch(shard, sink, batch_size)
+            sent += count
+            if count < batch_size:
+                break
+    return sent
+
+
+class OutboxLagCollector:
+    """
+    Collector of the outbox metrics, reading the outbox of every shard at most once per `ORDER_OUTBOX["METRICS_TTL"]`
+
+    Scrapes in between keep the pending counts read last, the lag is computed again from the oldest
+    event read last.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.oldest = {}
+        self.expires_at = 0.0
+
+    def reset(self) -> None:
+        with self.lock:
+            self.expires_at = 0.0
+
+    def __call__(self) -> None:
+        with self.lock:
+            if time.monotonic() >= self.expires_at:
+                for shard in shard_aliases():
+                    outbox = OutboxEvents.objects.using(shard)
+                    self.oldest[shard] = outbox.order_by("id").values_list("created_at", flat=True).first()
+                    outbox_pending.set((shard,), outbox.count())
+                self.expires_at = time.monotonic() + settings.ORDER_OUTBOX["METRICS_TTL"]
+
+            now = timezone.now()
+            for shard, oldest in self.oldest.items():
+                outbox_lag.set((shard,), (now - oldest).total_seconds() if oldest else 0.0)
+
+
+collect_outbox_lag = registry.collector(OutboxLagCollector())
@@ -4,6 +4,8 @@ Custom permissions for Orders
 
 from rest_framework import permissions
 
+from restaurants.ownership import is_restaurant_owner
+
 
 class IsOwnerOrCustomer(permissions.BasePermission):
     """
@@ -15,4 +17,6 @@ class IsOwnerOrCustomer(permissions.BasePermission):
         Function to check if user has permission for orders object
         """
 
-        return obj.customer == request.user or obj.restaurant.owner == request.user
+        return obj.customer_id == request.user.id or is_restaurant_owner(
+            request.user, obj.restaurant_id, active_only=False
+        )
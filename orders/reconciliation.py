@@ -0,0 +1,123 @@
+"""
+Order shards reconciliation module
+
+An order of a shard other than the default database is written in a transaction of its shard,
+nested in the transaction of the default database which debits the customer, takes the stock of
+the menu items and allocates the id of the order in `OrderShards`. The shard transaction commits
+first. When it fails, the default transaction is rolled back with it. When the default commit fails
+after it, the order, its items and its created event stay on the shard, without the payment and
+stock they were placed with and without their `OrderShards` row. The ORM has no two-phase commit
+making both commits atomic.
+
+`manage.py reconcile_order_shards` finds those orphan orders, orders of a shard without an
+`OrderShards` row naming that shard, once they are older than a grace period covering default
+transactions still committing. Orphans are cancelled with a status event, so consumers which
+received their created event see them end, and their `OrderShards` row is restored so they are
+found by id again. Orphans whose id was allocated again to an order of another shard are logged.
+
+Cancellations have the same commit order, their status commits on the shard before the refund in
+the default database. The command also credits the refunds they left pending, see `orders.refunds`.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from orders.events import ORDER_STATUS_CHANGED, publish_on_commit
+from orders.models import Orders, OrderShards
+from orders.outbox import add_to_outbox
+from orders.refunds import apply_pending_refunds
+from orders.shards import shard_aliases
+
+logger = logging.getLogger(__name__)
+
+
+def find_orphan_orders(shard: str, since, before, batch_size: int = 1000) -> list:
+    """
+    Function to find the orders of a shard placed in a period whose `OrderShards` row is missing
+
+    Args:
+        shard (str): Database alias of the shard
+        since (datetime): Start of the period
+        before (datetime): End of the period
+        batch_size (int): Number of orders looked up per query
+
+    Returns:
+        list: Ids of the orphan orders
+    """
+
+    order_ids = list(
+        Orders.objects.using(shard)
+        .filter(order_datetime__gte=since, order_datetime__lt=before)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    orphans = []
+    for start in range(0, len(order_ids), batch_size):
+        batch = order_ids[start : start + batch_size]
+        allocated = dict(OrderShards.objects.filter(pk__in=batch).values_list("pk", "shard"))
+        for order_id in batch:
+            if order_id not in allocated:
+                orphans.append(order_id)
+            elif allocated[order_id] != shard:
+                logger.error(
+                    "Order %s of shard %s has its id allocated to shard %s", order_id, shard, allocated[order_id]
+                )
+    return orphans
+
+
+def cancel_orphan_order(shard: str, order_id: int) -> None:
+    """
+    Function to cancel an orphan order, restoring its `OrderShards` row
+    """
+
+    with transaction.atomic(), transaction.atomic(using=shard):
+        order = Orders.objects.using(shard).select_for_update().get(pk=order_id)
+        OrderShards.objects.create(pk=order_id, shard=shard)
+        logger.warning("Cancelling order %s of shard %s, the rest of its placement was rolled back", order_id, shard)
+        order.status = Orders.OrderStatuses.CANCELLED
+        order.save(update_fields=["status", "updated_at"])
+        add_to_outbox(order, ORDER_STATUS_CHANGED)
+        publish_on_commit(order, ORDER_STATUS_CHANGED)
+
+
+def reconcile_order_shards(grace_seconds: int = 300, hours: int = 24, batch_size: int = 1000) -> int:
+    """
+    Function to cancel the orphan orders of every shard
+
+    Args:
+        grace_seconds (int): Age of the newest orders checked, placements still committing being younger
+        hours (int): Age of the oldest orders checked
+        batch_size (int): Number of orders looked up per query
+
+    Returns:
+        int: Number of cancelled orders
+    """
+
+    before = timezone.now() - timedelta(seconds=grace_seconds)
+    since = before - timedelta(hours=hours)
+    cancelled = 0
+    # Orders of the default database commit with the rest of their placement
+    for shard in [alias for alias in shard_aliases() if alias != DEFAULT_DB_ALIAS]:
+        for order_id in find_orphan_orders(shard, since, before, batch_size):
+            cancel_orphan_order(shard, order_id)
+            cancelled += 1
+    return cancelled
+
+
+def reconcile_refunds(grace_seconds: int = 300, batch_size: int = 1000) -> int:
+    """
+    Function to credit the refunds left pending by cancellations of every shard
+
+    Args:
+        grace_seconds (int): Age of the newest pending refunds settled, cancellations still committing being younger
+        batch_size (int): Number of pending refunds read per query
+
+    Returns:
+        int: Number of credited refunds
+    """
+
+    before = timezone.now() - timedelta(seconds=grace_seconds)
+    return sum(apply_pending_refunds(shard, before, batch_size) for shard in shard_aliases())
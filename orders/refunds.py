@@ -0,0 +1,91 @@
+"""
+Order refunds module
+
+A cancelled order is refunded to the balance of its customer in the default database, while its
+status is written on its shard, whose transaction commits first. The cancellation therefore writes a
+`PendingRefunds` row on the shard along with the status, and a `Refunds` row in the default
+database along with the credit. Pending refunds are deleted once the default transaction committed.
+
+Pending refunds left behind by a failing default commit are credited by
+`manage.py reconcile_order_shards`, the unique order of `Refunds` making sure an order is refunded
+once, whether its default transaction committed or not.
+"""
+
+from django.db import IntegrityError, models, transaction
+
+from orders.models import PendingRefunds, Refunds
+from users.authentication import invalidate_cached_user
+from users.models import Users
+
+
+def record_refunds(shard: str, orders: list) -> None:
+    """
+    Function to record the refunds of orders cancelled in the transactions of their shard and of the default database
+
+    Args:
+        shard (str): Database alias of the shard of the orders
+        orders (list): Cancelled orders, whose customers are credited by the caller
+    """
+
+    if not orders:
+        return
+    PendingRefunds.objects.using(shard).bulk_create(
+        [
+            PendingRefunds(order_id=order.id, customer_id=order.customer_id, amount=order.total_amount)
+            for order in orders
+        ]
+    )
+    Refunds.objects.bulk_create(
+        [Refunds(order_id=order.id, customer_id=order.customer_id, amount=order.total_amount) for order in orders]
+    )
+    order_ids = [order.id for order in orders]
+    # Registered on the default database, so it runs once both transactions committed
+    transaction.on_commit(lambda: PendingRefunds.objects.using(shard).filter(order_id__in=order_ids).delete())
+
+
+def apply_pending_refund(shard: str, pending: PendingRefunds) -> bool:
+    """
+    Function to credit a pending refund unless its order was refunded already, deleting it
+
+    Returns:
+        bool: `True` if the refund was credited, `False` if it was credited before
+    """
+
+    try:
+        with transaction.atomic():
+            Refunds.objects.create(order_id=pending.order_id, customer_id=pending.customer_id, amount=pending.amount)
+            Users.objects.filter(pk=pending.customer_id).update(balance=models.F("balance") + pending.amount)
+            transaction.on_commit(lambda: invalidate_cached_user(pending.customer_id))
+        credited = True
+    except IntegrityError:
+        credited = False
+    PendingRefunds.objects.using(shard).filter(pk=pending.pk).delete()
+    return credited
+
+
+def apply_pending_refunds(shard: str, before, batch_size: int = 1000) -> int:
+    """
+    Function to settle the pending refunds of a shard recorded before a date
+
+    Args:
+        shard (str): Database alias of the shard
+        before (datetime): Refunds recorded later are left to the transactions still committing them
+        batch_size (int): Number of pending refunds read per query
+
+    Returns:
+        int: Number of credited refunds
+    """
+
+    credited = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            PendingRefunds.objects.using(shard)
+            .filter(created_at__lt=before, pk__gt=last_pk)
+            .order_by("pk")[:batch_size]
+        )
+        for pending in batch:
+            credited += apply_pending_refund(shard, pending)
+        if len(batch) < batch_size:
+            return credited
+        last_pk = batch[-1].pk
@@ -2,14 +2,41 @@
 Serializers module
 """
 
+from contextlib import ExitStack
+
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
-from orders.models import OrderItems, Orders
+from orders.events import ORDER_CREATED, ORDER_STATUS_CHANGED, publish_on_commit
+from orders.models import ArchivedOrders, CartItems, OrderItems, Orders
+from orders.outbox import add_to_outbox
+from orders.refunds import record_refunds
+from orders.shards import shard_for_restaurant
 from restaurants.models import Menus
+from restaurants.ownership import is_restaurant_owner
 from users.models import Users
 
 
+def check_profile(customer) -> None:
+    """
+    Function to check a customer has the contact details needed to place an order
+    """
+
+    if not customer.phone_number:
+        raise serializers.ValidationError({"Profile": "Phone number is required for placing order. Please update it."})
+    required_address_fields = ["street_address", "state", "city", "zipcode"]
+    missing_fields = [field for field in required_address_fields if not getattr(customer, field)]
+    if missing_fields:
+        raise serializers.ValidationError(
+            {"Profile": f"Please update complete address first. Missing fields: {', '.join(missing_fields)}."}
+        )
+
+
+def delivery_address(customer) -> str:
+    return f"{customer.street_address}, {customer.city}, {customer.state}, {customer.zipcode}"
+
+
 class OrderItemsSerializer(serializers.ModelSerializer):
     """
     Serializer class for order items
@@ -58,41 +85,48 @@ class OrdersSerializer(serializers.ModelSerializer):
             Orders: Created order object
         """
 
-        request = self.context.get("request")
+        # Orders placed by the intake workers have no request, their customer is given to `save`
+        customer_id = validated_data.pop("customer_id", None) or self.context["request"].user.id
         items_data = validated_data.pop("items", [])
 
         try:
-            with transaction.atomic():
-                customer = Users.objects.select_for_update().get(pk=request.user.id)
-                if not customer.phone_number:
-                    raise serializers.ValidationError(
-                        {"Profile": "Phone number is required for placing order. Please update it."}
-                    )
-                required_address_fields = ["street_address", "state", "city", "zipcode"]
-                missing_fields = [field for field in required_address_fields if not getattr(customer, field)]
-                if missing_fields:
-                    raise serializers.ValidationError(
-                        {
-                            "Profile": f"Please update complete address first. Missing fields: {', '.join(missing_fields)}."
-                        }
-                    )
+            # The order is written to the shard of its restaurant, whose transaction commits before the default one,
+            # orders left on their shard by a failing default commit are cancelled by orders.reconciliation
+            with transaction.atomic(), ExitStack() as shard_transaction:
+                customer = Users.objects.select_for_update().get(pk=customer_id)
+                check_profile(customer)
 
                 total_amount = 0
                 restaurant = None
                 order = None
+                # Items are locked with a single query, in primary key order
+                menu_items = {
+                    menu_item.pk: menu_item
+                    for menu_item in Menus.objects.select_for_update()
+                    .select_related("restaurant")
+                    .filter(pk__in=[item_data.get("id") for item_data in items_data])
+                    .order_by("pk")
+                }
 
                 for item_data in items_data:
                     item_id = item_data.get("id")
                     quantity = item_data.get("quantity")
 
-                    menu_item = Menus.objects.select_for_update().get(pk=item_id)
+                    menu_item = menu_items.get(item_id)
+                    if menu_item is None:
+                        raise Menus.DoesNotExist
 
                     if not restaurant:
                         restaurant = menu_item.restaurant
                         if not restaurant.is_active:
                             raise serializers.ValidationError({"Items": f"Invalid item id: {item_id}"})
-                        order = Orders.objects.create(
-                            **validated_data, total_amount=0, customer=customer, restaurant=restaurant
+                        shard = shard_for_restaurant(restaurant.id)
+                        shard_transaction.enter_context(transaction.atomic(using=shard))
+                        order = Orders.objects.using(shard).create(
+                            **validated_data,
+                            total_amount=0,
+                            customer=customer,
+                            restaurant=restaurant,
                         )
                     elif restaurant != menu_item.restaurant:
                         raise serializers.ValidationError({"Items": "Select all items from same restaurant"})
@@ -102,7 +136,7 @@ class OrdersSerializer(serializers.ModelSerializer):
                             {"Items": f"Not enough quantity available for item: {menu_item.name}"}
                         )
 
-                    order_item = OrderItems.objects.create(
+                    order_item = OrderItems.objects.using(shard).create(
                         order=order,
                         item=menu_item,
                         price=menu_item.price,
@@ -116,16 +150,19 @@ class OrdersSerializer(serializers.ModelSerializer):
 
                 order.total_amount = total_amount
                 order.contact = customer.phone_number
-                order.address = f"{customer.street_address}, {customer.city}, {customer.state}, {customer.zipcode}"
+                order.address = delivery_address(customer)
                 order.save()
 
                 if customer.balance < total_amount:
                     raise serializers.ValidationError({"Profile": f"Not enough balance"})
                 customer.balance -= total_amount
                 customer.save()
+                add_to_outbox(order, ORDER_CREATED)
+                publish_on_commit(order, ORDER_CREATED)
         except Menus.DoesNotExist:
             raise serializers.ValidationError({"Items": f"Invalid item id: {item_id}"})
 
+        prefetch_related_objects([order], "items__item")
         return order
 
 
@@ -157,7 +194,7 @@ class OrdersUpdateSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         instance = self.instance
 
-        if request.user != instance.restaurant.owner:
+        if not is_restaurant_owner(request.user, instance.restaurant_id, active_only=False):
             if instance.status != Orders.OrderStatuses.IN_PROGRESS:
                 raise serializers.ValidationError(f"Order cannot be updated. Current status is: {instance.status}")
             elif status != Orders.OrderStatuses.CANCELLED:
@@ -179,21 +216,61 @@ class OrdersUpdateSerializer(serializers.ModelSerializer):
 
         status = validated_data["status"]
 
-        with transaction.atomic():
-            order_instance = Orders.objects.select_for_update().get(pk=instance.id)
+        shard = instance._state.db
+        with transaction.atomic(), transaction.atomic(using=shard):
+            order_instance = Orders.objects.using(shard).select_for_update().get(pk=instance.id)
             if order_instance.status in [Orders.OrderStatuses.CANCELLED, Orders.OrderStatuses.DELIVERED]:
                 raise serializers.ValidationError(
                     {"status": [f"Order cannot be updated. Current status is: {order_instance.status}"]}
                 )
 
             if status == Orders.OrderStatuses.CANCELLED:
-                customer = Users.objects.select_for_update().get(pk=instance.customer.id)
+                customer = Users.objects.select_for_update().get(pk=order_instance.customer_id)
                 customer.balance += order_instance.total_amount
                 customer.save()
+                order_instance.customer = customer
                 order_instance.status = status
                 order_instance.save()
+                # The status commits on the shard first, the refund is completed by reconciliation if default fails
+                record_refunds(shard, [order_instance])
             else:
                 order_instance.status = status
                 order_instance.save()
+            add_to_outbox(order_instance, ORDER_STATUS_CHANGED)
+            publish_on_commit(order_instance, ORDER_STATUS_CHANGED)
 
         return order_instance
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    """
+    Serializer class for bulk order status updates
+    """
+
+    ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=500)
+    status = serializers.ChoiceField(choices=Orders.OrderStatuses.choices)
+
+
+class CartItemsSerializer(serializers.ModelSerializer):
+    """
+    Serializer class for cart items
+    """
+
+    id = serializers.IntegerField(source="item_id")
+    item = serializers.SlugRelatedField(read_only=True, slug_field="name")
+    quantity = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = CartItems
+        fields = ["id", "item", "quantity", "price", "expires_at"]
+        read_only_fields = ["price", "expires_at"]
+
+
+class ArchivedOrdersSerializer(OrdersSerializer):
+    """
+    Serializer class for archived orders, read only with the representation of live orders
+    """
+
+    class Meta:
+        model = ArchivedOrders
+        exclude = ["archived_at"]
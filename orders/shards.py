@@ -0,0 +1,128 @@
+"""
+Order shards module
+
+Orders, their items, the archive, the report rollups, the outbox and the pending refunds are
+sharded by restaurant over the database aliases in `ORDER_SHARDS["ALIASES"]`. Users, restaurants
+and menus stay in the default database, every shard keeps a copy of them maintained by
+replication, which is only read by the joins of order filters, search, ordering, exports and
+reports. Foreign keys of sharded models therefore do not enforce database constraints.
+
+Order ids are allocated by `OrderShards` in the default database, so ids are unique over all
+shards and the shard of an order is found from its id. Queries of sharded models must name their
+shard with `on_shard`. The router only keeps related lookups on the shard of their instance.
+"""
+
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.models import OrderShards
+
+SHARDED_MODELS = {
+    "orders.orders",
+    "orders.orderitems",
+    "orders.archivedorders",
+    "orders.archivedorderitems",
+    "orders.customerspendrollups",
+    "orders.customeritemrollups",
+    "orders.outboxevents",
+    "orders.pendingrefunds",
+}
+
+
+def shard_aliases() -> list:
+    return settings.ORDER_SHARDS["ALIASES"]
+
+
+def shard_for_restaurant(restaurant_id) -> str:
+    """
+    Function to get the database alias holding the orders of a restaurant
+
+    Args:
+        restaurant_id: Id of the restaurant
+
+    Returns:
+        str: Database alias
+    """
+
+    aliases = shard_aliases()
+    return aliases[int(restaurant_id) % len(aliases)]
+
+
+def shard_for_order(order_id):
+    """
+    Function to get the database alias holding an order
+
+    Args:
+        order_id: Id of the order
+
+    Returns:
+        str: Database alias, `None` if the order is unknown
+    """
+
+    aliases = shard_aliases()
+    if len(aliases) == 1:
+        return aliases[0]
+    try:
+        return OrderShards.objects.filter(pk=int(order_id)).values_list("shard", flat=True).first()
+    except (TypeError, ValueError):
+        return None
+
+
+def on_shard(queryset, shard: str):
+    """
+    Function to run a queryset of a sharded model on a shard
+
+    Querysets of the default shard are left to the routers, so they may read from replicas.
+    """
+
+    if shard == DEFAULT_DB_ALIAS:
+        return queryset
+    return queryset.using(shard)
+
+
+def scatter_gather(queryset, key, limit: int = None) -> list:
+    """
+    Function to run a queryset on every shard and merge the results
+
+    Args:
+        queryset: Queryset ordered by `key`, and filtered to a keyset page if paginated
+        key: Callable returning the sort key of a row
+        limit (int): Maximum number of rows returned, `None` for all rows
+
+    Returns:
+        list: Rows of every shard ordered by `key`
+    """
+
+    shards = [on_shard(queryset, alias) for alias in shard_aliases()]
+    if limit is not None:
+        shards = [rows[:limit] for rows in shards]
+    return list(islice(heapq.merge(*shards, key=key), limit))
+
+
+class ShardRouter:
+    """
+    Router keeping lookups of sharded models related to an instance on the shard of the instance
+    """
+
+    def db_for_read(self, model, **hints):
+        return self.instance_shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.instance_shard(model, hints)
+
+    def instance_shard(self, model, hints: dict):
+        instance = hints.get("instance")
+        if instance is None or model._meta.label_lower not in SHARDED_MODELS:
+            return None
+        if instance._meta.label_lower in SHARDED_MODELS:
+            return instance._state.db
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Sharded models refer to users, restaurants and menus of the default database
+        if {obj1._meta.label_lower, obj2._meta.label_lower} & SHARDED_MODELS:
+            return True
+        return None
@@ -0,0 +1,138 @@
+"""
+Order streams module
+
+Server-sent event streams of the orders of a restaurant, for kitchen tablets which would otherwise
+poll the order list. Streams are served by a plain ASGI application wrapped around the Django one,
+since Django 3.2 iterates streaming responses synchronously and would hold a thread per open stream.
+
+Each event carries an `id`, which browsers send back in the `Last-Event-ID` header when they
+reconnect. Events missed in between are replayed, or a `reset` event tells the client to reload the
+order list when they are no longer known. A client not reading its events fast enough has its
+stream closed once its queue is drained, and resumes from the last event it received.
+"""
+
+import asyncio
+import json
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework import exceptions
+from rest_framework.utils.encoders import JSONEncoder
+
+from orderNow.async_views import run_sync
+from orderNow.renderers import envelope
+from orders.events import Event, get_broker, restaurant_channel
+from restaurants.ownership import is_restaurant_owner
+from users.authentication import CachedJWTAuthentication
+
+STREAM_PATH = re.compile(r"^/restaurants/(?P<restaurant_id>\d+)/events/$")
+
+STREAM_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    # Disables response buffering of nginx
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def format_event(event: Event) -> bytes:
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n".encode()
+
+
+async def send_error(send, status_code: int, data) -> None:
+    body = json.dumps(envelope(data, status_code), cls=JSONEncoder).encode()
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": [(b"content-type", b"application/json")]}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_body(send, body: bytes) -> None:
+    await send({"type": "http.response.body", "body": body, "more_body": True})
+
+
+async def wait_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def order_events(scope, receive, send, restaurant_id: int) -> None:
+    """
+    ASGI application streaming the order events of a restaurant to its owner
+
+    Args:
+        scope (dict): Scope of the request
+        receive: Awaitable returning messages of the client
+        send: Awaitable sending messages to the client
+        restaurant_id (int): Id of the restaurant
+    """
+
+    request = ASGIRequest(scope, BytesIO())
+    if request.method != "GET":
+        return await send_error(send, 405, {"detail": f'Method "{request.method}" not allowed.'})
+
+    try:
+        authenticated = await CachedJWTAuthentication().authenticate_async(request)
+    except exceptions.APIException as exc:
+        return await send_error(send, 401, exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail})
+    if authenticated is None:
+        return await send_error(send, 401, {"detail": "Authentication credentials were not provided."})
+    if not await run_sync(is_restaurant_owner, authenticated[0], restaurant_id):
+        return await send_error(send, 403, {"detail": "You do not have permission to perform this action."})
+
+    config = settings.ORDER_EVENTS
+    broker = get_broker()
+    channel = restaurant_channel(restaurant_id)
+    subscription, missed = broker.subscribe(channel, request.headers.get("Last-Event-ID"))
+    disconnected = asyncio.ensure_future(wait_disconnect(receive))
+    received = None
+    try:
+        await send({"type": "http.response.start", "status": 200, "headers": STREAM_HEADERS})
+        if missed is None:
+            await send_body(send, f"id: {broker.last_event_id(channel)}\nevent: reset\ndata: {{}}\n\n".encode())
+        for event in missed or ():
+            await send_body(send, format_event(event))
+
+        while not (subscription.overflowed and subscription.queue.empty()):
+            if received is None:
+                received = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {received, disconnected}, timeout=config["HEARTBEAT_INTERVAL"], return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                return
+            if received in done:
+                await send_body(send, format_event(received.result()))
+                received = None
+            else:
+                # Comment line keeping proxies from closing an idle stream
+                await send_body(send, b": heartbeat\n\n")
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        broker.unsubscribe(subscription)
+        for task in (received, disconnected):
+            if task is not None:
+                task.cancel()
+
+
+def with_order_streams(application):
+    """
+    Function to wrap an ASGI application, serving order event streams and passing other requests to it
+
+    Args:
+        application: ASGI application
+
+    Returns:
+        ASGI application
+    """
+
+    async def router(scope, receive, send):
+        if scope["type"] == "http":
+            match = STREAM_PATH.match(scope["path"])
+            if match:
+                return await order_events(scope, receive, send, int(match["restaurant_id"]))
+        return await application(scope, receive, send)
+
+    return router
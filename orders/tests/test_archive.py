@@ -0,0 +1,120 @@
+"""
+Orders archive test module
+"""
+
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from ddf import G
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.archive import archive_orders
+from orders.models import (
+    ArchivedOrderItems,
+    ArchivedOrders,
+    CustomerItemRollups,
+    CustomerSpendRollups,
+    OrderItems,
+    Orders,
+)
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+
+class ArchiveOrdersTests(QueryBudgetTestCase):
+    """
+    Class to test archival of orders in a final status
+    """
+
+    def setUp(self):
+        self.customer = G(Users)
+        self.owner = G(Users)
+        self.restaurant = G(Restaurants, owner=self.owner)
+        self.item1 = G(Menus, restaurant=self.restaurant)
+        self.item2 = G(Menus, restaurant=self.restaurant)
+
+        self.old = timezone.now() - timedelta(days=120)
+        self.delivered = self.create_order(Orders.OrderStatuses.DELIVERED, [self.item1, self.item2], Decimal("10"))
+        self.cancelled = self.create_order(Orders.OrderStatuses.CANCELLED, [self.item1], Decimal("5"))
+        self.in_progress = self.create_order(Orders.OrderStatuses.IN_PROGRESS, [self.item2], Decimal("7"))
+        Orders.objects.update(order_datetime=self.old, updated_at=self.old)
+        self.recent = self.create_order(Orders.OrderStatuses.DELIVERED, [self.item2], Decimal("3"))
+
+    def create_order(self, status: str, items: list, total_amount: Decimal) -> Orders:
+        order = G(Orders, restaurant=self.restaurant, customer=self.customer, status=status, total_amount=total_amount)
+        for item in items:
+            G(OrderItems, order=order, item=item)
+        return order
+
+    def get(self, url: str, user: Users, **params):
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    def test_archive_orders_success(self):
+        """
+        Testcase for testing old orders in a final status are moved to the archive with their items.
+        """
+
+        output = io.StringIO()
+        call_command("archive_orders", "--batch-size", "1", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Archived 2 orders\n")
+        self.assertCountEqual(
+            ArchivedOrders.objects.values_list("id", flat=True), [self.delivered.id, self.cancelled.id]
+        )
+        self.assertCountEqual(Orders.objects.values_list("id", flat=True), [self.in_progress.id, self.recent.id])
+        self.assertEqual(ArchivedOrderItems.objects.filter(order_id=self.delivered.id).count(), 2)
+        self.assertFalse(OrderItems.objects.filter(order_id__in=[self.delivered.id, self.cancelled.id]).exists())
+
+        spend = CustomerSpendRollups.objects.get()
+        self.assertEqual((spend.orders, spend.total_amount, spend.day), (2, Decimal("15"), self.old.date()))
+        self.assertEqual(
+            dict(CustomerItemRollups.objects.values_list("item", "order_items")), {self.item1.id: 2, self.item2.id: 1}
+        )
+
+    def test_archived_order_retrieve_and_export(self):
+        """
+        Testcase for testing archived orders are still served by order retrieve and export.
+        """
+
+        url = reverse("orders:orders-detail", kwargs={"pk": self.delivered.id})
+        live = self.get(url, self.customer).json()
+        archive_orders()
+
+        response = self.get(url, self.customer)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), live)
+        self.assertEqual(self.get(url, G(Users)).status_code, 404)
+        self.assertEqual(self.get(url, self.owner, restaurant_id=self.restaurant.id).status_code, 200)
+
+        response = self.get(reverse("orders:orders-export"), self.customer)
+        orders = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [order["id"] for order in orders],
+            [self.delivered.id, self.cancelled.id, self.in_progress.id, self.recent.id],
+        )
+
+    def test_reports_include_archived_orders(self):
+        """
+        Testcase for testing reports are the same before and after archival.
+        """
+
+        reports = [
+            "restaurants:reports-customer-spends-report",
+            "restaurants:reports-item-popularity-report",
+            "restaurants:reports-customer-favorites-report",
+        ]
+        urls = [reverse(report, kwargs={"restaurant_id": self.restaurant.id}) for report in reports]
+        date_range = {"from_date": self.old.date() - timedelta(days=1), "to_date": timezone.now().date()}
+
+        before = [self.get(url, self.owner).json() for url in urls]
+        before_range = self.get(urls[0], self.owner, **date_range).json()
+        archive_orders()
+
+        self.assertEqual([self.get(url, self.owner).json() for url in urls], before)
+        self.assertEqual(self.get(urls[0], self.owner, **date_range).json(), before_range)
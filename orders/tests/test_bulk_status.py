@@ -0,0 +1,111 @@
+"""
+Bulk order status test module
+"""
+
+from ddf import G
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.models import Orders, OutboxEvents
+from restaurants.models import Restaurants
+from users.models import Users
+
+
+class BulkStatusTests(QueryBudgetTestCase):
+    """
+    Class to test owners moving orders of their restaurants to a status in bulk
+    """
+
+    def setUp(self):
+        self.owner = G(Users)
+        self.restaurant = G(Restaurants, owner=self.owner)
+        self.customer1 = G(Users, balance=0)
+        self.customer2 = G(Users, balance=0)
+
+    def create_order(self, customer: Users, total_amount: int = 10, **kwargs) -> Orders:
+        return G(Orders, restaurant=self.restaurant, customer=customer, total_amount=total_amount, **kwargs)
+
+    def bulk_status(self, ids: list, status: str, user: Users = None):
+        return self.client.post(
+            reverse("orders:orders-bulk-status"),
+            data={"ids": ids, "status": status},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user or self.owner).access_token}",
+        )
+
+    def test_orders_dispatched_with_results(self):
+        """
+        Testcase for testing valid transitions are applied and every order gets its result.
+        """
+
+        orders = [self.create_order(self.customer1) for _ in range(10)]
+        delivered = self.create_order(self.customer1, status=Orders.OrderStatuses.DELIVERED)
+        other = G(Orders, restaurant=G(Restaurants, owner=G(Users)), customer=self.customer1, total_amount=10)
+        ids = [order.id for order in orders] + [delivered.id, other.id]
+
+        with self.assertQueryBudget(10):
+            response = self.bulk_status(ids, "Dispatched")
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["data"]
+        self.assertEqual([result["id"] for result in results], ids)
+        self.assertEqual(results[0], {"id": orders[0].id, "status": "Dispatched", "error": None})
+        self.assertEqual(
+            results[-2],
+            {
+                "id": delivered.id,
+                "status": "Delivered",
+                "error": "Order cannot be updated. Current status is: Delivered",
+            },
+        )
+        self.assertEqual(results[-1], {"id": other.id, "status": None, "error": "Not found."})
+
+        self.assertEqual(Orders.objects.filter(status=Orders.OrderStatuses.DISPATCHED).count(), 10)
+        self.assertGreater(Orders.objects.get(pk=orders[0].id).updated_at, orders[0].updated_at)
+        self.assertEqual(OutboxEvents.objects.filter(event_type="order.status_changed").count(), 10)
+
+    def test_cancellation_refunds_added_up_per_customer(self):
+        """
+        Testcase for testing cancelled orders refund their customers, once per customer.
+        """
+
+        orders = [
+            self.create_order(self.customer1, 10),
+            self.create_order(self.customer1, 15),
+            self.create_order(self.customer2, 20),
+            self.create_order(self.customer2, 30, status=Orders.OrderStatuses.CANCELLED),
+        ]
+
+        response = self.bulk_status([order.id for order in orders], "Cancelled")
+
+        self.assertEqual([result["error"] is None for result in response.json()["data"]], [True, True, True, False])
+        self.customer1.refresh_from_db()
+        self.customer2.refresh_from_db()
+        self.assertEqual((self.customer1.balance, self.customer2.balance), (25, 20))
+
+    def test_bulk_status_for_owners_only(self):
+        """
+        Testcase for testing users owning no restaurant cannot update orders in bulk, and statuses are validated.
+        """
+
+        order = self.create_order(self.customer1)
+        self.assertEqual(self.bulk_status([order.id], "Cancelled", user=self.customer1).status_code, 403)
+        self.assertEqual(self.bulk_status([order.id], "Eaten").status_code, 400)
+        self.assertEqual(self.bulk_status([], "Dispatched").status_code, 400)
+        self.assertEqual(Orders.objects.get(pk=order.id).status, Orders.OrderStatuses.IN_PROGRESS)
+
+    def test_bulk_status_only_routed_for_orders(self):
+        """
+        Testcase for testing bulk status updates are not routed under carts.
+        """
+
+        order = self.create_order(self.customer1)
+        response = self.client.post(
+            "/cart/bulk-status/",
+            data={"ids": [order.id], "status": "Cancelled"},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.owner).access_token}",
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Orders.objects.get(pk=order.id).status, Orders.OrderStatuses.IN_PROGRESS)
@@ -0,0 +1,162 @@
+"""
+Carts test module
+"""
+
+import io
+from datetime import timedelta
+
+from ddf import G
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.carts import hold_item, release_item
+from orders.models import CartItems, OrderItems, Orders
+from restaurants.flash_sale import CACHE_KEY, stock_tokens
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+
+class CartTests(QueryBudgetTestCase):
+    """
+    Class to test carts holding the stock of their items until checkout
+    """
+
+    def setUp(self):
+        self.customer = G(Users, balance=100, phone_number="9999999999")
+        self.authorization = f"Bearer {RefreshToken.for_user(self.customer).access_token}"
+        self.restaurant = G(Restaurants, owner=G(Users))
+        self.menu1 = G(Menus, restaurant=self.restaurant, quantity=5, price=10)
+        self.menu2 = G(Menus, restaurant=self.restaurant, quantity=5, price=20)
+
+    def add_item(self, menu: Menus, quantity: int = 1):
+        return self.client.post(
+            reverse("orders:cart-list"),
+            data={"id": menu.id, "quantity": quantity},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=self.authorization,
+        )
+
+    def checkout(self):
+        return self.client.post(reverse("orders:cart-checkout"), HTTP_AUTHORIZATION=self.authorization)
+
+    def test_added_items_hold_stock(self):
+        """
+        Testcase for testing added items take their quantity from the stock, and give it back when removed.
+        """
+
+        response = self.add_item(self.menu1, 2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["quantity"], 2)
+        self.add_item(self.menu1, 2)
+        self.menu1.refresh_from_db()
+        self.assertEqual(self.menu1.quantity, 1)
+
+        response = self.add_item(self.menu1, 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["data"], {"Items": f"Not enough quantity available for item: {self.menu1.name}"}
+        )
+        other_menu = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=5, price=10)
+        self.assertEqual(self.add_item(other_menu).status_code, 400)
+
+        cart = self.client.get(reverse("orders:cart-list"), HTTP_AUTHORIZATION=self.authorization).json()["data"]
+        self.assertEqual([(item["id"], item["quantity"]) for item in cart], [(self.menu1.id, 4)])
+
+        url = reverse("orders:cart-detail", kwargs={"item_id": self.menu1.id})
+        self.assertEqual(self.client.delete(url, HTTP_AUTHORIZATION=self.authorization).status_code, 204)
+        self.assertEqual(self.client.delete(url, HTTP_AUTHORIZATION=self.authorization).status_code, 404)
+        self.menu1.refresh_from_db()
+        self.assertEqual(self.menu1.quantity, 5)
+
+    def test_checkout_converts_held_items(self):
+        """
+        Testcase for testing checkout places an order with the held items and empties the cart.
+        """
+
+        self.add_item(self.menu1, 2)
+        self.add_item(self.menu2, 1)
+
+        with self.assertQueryBudget(17):
+            response = self.checkout()
+
+        self.assertEqual(response.status_code, 201)
+        order = Orders.objects.get()
+        self.assertEqual(response.json()["data"]["id"], order.id)
+        self.assertEqual(order.total_amount, 40)
+        self.assertEqual(
+            sorted(OrderItems.objects.values_list("item_id", "quantity")), [(self.menu1.id, 2), (self.menu2.id, 1)]
+        )
+        self.assertFalse(CartItems.objects.exists())
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 60)
+        self.menu1.refresh_from_db()
+        self.assertEqual(self.menu1.quantity, 3)
+
+        self.assertEqual(self.checkout().json()["data"], {"Cart": "Cart is empty"})
+
+    def test_checkout_failure_keeps_cart(self):
+        """
+        Testcase for testing a checkout failing on the balance keeps the items held.
+        """
+
+        self.add_item(self.menu1, 1)
+        self.add_item(self.menu2, 5)
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"], {"Profile": "Not enough balance"})
+        self.assertEqual(sorted(CartItems.objects.values_list("quantity", flat=True)), [1, 5])
+        self.assertFalse(Orders.objects.exists())
+
+    def test_expired_holds_released(self):
+        """
+        Testcase for testing the sweeper gives the stock of expired cart items back.
+        """
+
+        self.add_item(self.menu1, 2)
+        self.add_item(self.menu2, 3)
+        CartItems.objects.filter(item=self.menu1).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        output = io.StringIO()
+        call_command("release_cart_holds", "--once", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Released 1 cart items\n")
+        self.assertEqual(list(CartItems.objects.values_list("item_id", flat=True)), [self.menu2.id])
+        self.menu1.refresh_from_db()
+        self.menu2.refresh_from_db()
+        self.assertEqual((self.menu1.quantity, self.menu2.quantity), (5, 2))
+
+    def test_flash_sale_tokens_follow_holds(self):
+        """
+        Testcase for testing holds of flash sale items take their tokens, and give back only the ones they took.
+        """
+
+        cache.clear()
+        self.menu1.quantity = 3
+        self.menu1.flash_sale = True
+        self.menu1.save()
+        stock_tokens(self.menu1)
+        key = CACHE_KEY.format(item_id=self.menu1.id)
+
+        for _ in range(5):
+            with self.captureOnCommitCallbacks(execute=True):
+                hold_item(self.customer, self.menu1.id, 2)
+            with self.captureOnCommitCallbacks(execute=True):
+                release_item(self.customer, self.menu1.id)
+        self.menu1.refresh_from_db()
+        self.assertEqual((self.menu1.quantity, cache.get(key)), (3, 3))
+
+        self.assertEqual(self.add_item(self.menu1, 3).status_code, 201)
+        response = self.add_item(self.menu1, 1)
+        self.assertEqual(response.json()["data"], {"Items": f"Item sold out: {self.menu1.id}"})
+
+        CartItems.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("release_cart_holds", "--once", stdout=io.StringIO())
+        self.menu1.refresh_from_db()
+        self.assertEqual((self.menu1.quantity, cache.get(key)), (3, 3))
+        cache.clear()
@@ -0,0 +1,76 @@
+"""
+Multi-restaurant checkout test module
+"""
+
+from ddf import G
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.models import OrderItems, Orders
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+
+class CheckoutTests(QueryBudgetTestCase):
+    """
+    Class to test checkouts placing items of several restaurants as one order per restaurant
+    """
+
+    def setUp(self):
+        self.customer = G(Users, balance=100, phone_number="9999999999")
+        self.restaurant1 = G(Restaurants, owner=G(Users))
+        self.restaurant2 = G(Restaurants, owner=G(Users))
+        self.menu1 = G(Menus, restaurant=self.restaurant1, quantity=5, price=10)
+        self.menu2 = G(Menus, restaurant=self.restaurant2, quantity=5, price=20)
+        self.menu3 = G(Menus, restaurant=self.restaurant1, quantity=5, price=5)
+
+    def checkout(self, items: list):
+        return self.client.post(
+            reverse("orders:orders-checkout"),
+            data={"items": [{"id": menu.id, "quantity": quantity} for menu, quantity in items]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.customer).access_token}",
+        )
+
+    def test_checkout_split_by_restaurant(self):
+        """
+        Testcase for testing a checkout places an order per restaurant and debits their total once.
+        """
+
+        with self.assertQueryBudget(20):
+            response = self.checkout([(self.menu1, 2), (self.menu2, 1), (self.menu3, 2)])
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()["data"]
+        self.assertEqual([order["restaurant"] for order in data], [self.restaurant1.name, self.restaurant2.name])
+        self.assertEqual([order["total_amount"] for order in data], [30, 20])
+        self.assertEqual([len(order["items"]) for order in data], [2, 1])
+        self.assertEqual(sorted(Orders.objects.values_list("id", flat=True)), sorted(order["id"] for order in data))
+        self.assertEqual(OrderItems.objects.count(), 3)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 50)
+        self.assertEqual(
+            list(Menus.objects.order_by("pk").values_list("quantity", flat=True)),
+            [3, 4, 3],
+        )
+
+    def test_checkout_failure_places_nothing(self):
+        """
+        Testcase for testing a checkout failing for one restaurant places none of its orders.
+        """
+
+        response = self.checkout([(self.menu1, 1), (self.menu2, 6)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["data"], {"Items": f"Not enough quantity available for item: {self.menu2.name}"}
+        )
+
+        response = self.checkout([(self.menu1, 5), (self.menu2, 3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"], {"Profile": "Not enough balance"})
+
+        self.assertFalse(Orders.objects.exists())
+        self.menu1.refresh_from_db()
+        self.assertEqual(self.menu1.quantity, 5)
@@ -0,0 +1,217 @@
+"""
+Order events test module
+"""
+
+import asyncio
+import json
+
+from ddf import G
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.events import ORDER_STATUS_CHANGED, InProcessBroker, get_broker, restaurant_channel
+from orders.models import Orders
+from orders.streams import with_order_streams
+from restaurants.models import Restaurants
+from users.models import Users
+
+ORDER_EVENTS = {"BROKER": "orders.events.InProcessBroker", "QUEUE_SIZE": 2, "REPLAY_SIZE": 3, "HEARTBEAT_INTERVAL": 15}
+
+
+@override_settings(ORDER_EVENTS=ORDER_EVENTS)
+class BrokerTests(QueryBudgetTestCase):
+    """
+    Class to test the in process broker of order events
+    """
+
+    async def test_publish_delivers_to_channel_subscribers(self):
+        """
+        Testcase for testing published events reach subscribers of their channel only.
+        """
+
+        broker = InProcessBroker()
+        subscription, missed = broker.subscribe("restaurant:1")
+        other, _ = broker.subscribe("restaurant:2")
+
+        event = broker.publish("restaurant:1", ORDER_STATUS_CHANGED, {"id": 1})
+        await asyncio.sleep(0)
+
+        self.assertEqual(missed, [])
+        self.assertEqual(await subscription.queue.get(), event)
+        self.assertEqual(event.data, '{"id":1}')
+        self.assertTrue(other.queue.empty())
+
+    async def test_subscribe_resumes_from_last_event_id(self):
+        """
+        Testcase for testing subscribers resuming get the events they missed, or none when they are no longer kept.
+        """
+
+        broker = InProcessBroker()
+        events = [broker.publish("restaurant:1", ORDER_STATUS_CHANGED, {"id": i}) for i in range(5)]
+
+        _, missed = broker.subscribe("restaurant:1", events[1].id)
+        self.assertEqual(missed, events[2:])
+
+        _, missed = broker.subscribe("restaurant:1", events[4].id)
+        self.assertEqual(missed, [])
+
+        _, missed = broker.subscribe("restaurant:1", events[0].id)
+        self.assertIsNone(missed)
+
+        _, missed = broker.subscribe("restaurant:1", f"restarted:{events[4].id.split(':')[1]}")
+        self.assertIsNone(missed)
+
+    async def test_slow_subscriber_overflows(self):
+        """
+        Testcase for testing a subscriber with a full queue is marked overflowed instead of buffering more events.
+        """
+
+        broker = InProcessBroker()
+        subscription, _ = broker.subscribe("restaurant:1")
+
+        for i in range(3):
+            broker.publish("restaurant:1", ORDER_STATUS_CHANGED, {"id": i})
+        await asyncio.sleep(0)
+
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 2)
+
+
+@override_settings(ASYNC_READS={"THREAD_SENSITIVE": True})
+class OrderEventStreamTests(QueryBudgetTestCase):
+    """
+    Class to test server-sent event streams of restaurant orders
+    """
+
+    def setUp(self):
+        self.owner = G(Users)
+        self.token = str(RefreshToken.for_user(self.owner).access_token)
+        self.other_token = str(RefreshToken.for_user(G(Users)).access_token)
+        self.restaurant = G(Restaurants, owner=self.owner)
+        self.application = with_order_streams(None)
+
+    async def open_stream(self, token: str = None, last_event_id: str = None):
+        """
+        Function to open the event stream of the restaurant
+
+        Returns:
+            tuple: Task serving the stream, messages sent to the client and queue of messages from the client
+        """
+
+        headers = [(b"authorization", f"Bearer {token or self.token}".encode())]
+        if last_event_id:
+            headers.append((b"last-event-id", last_event_id.encode()))
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": f"/restaurants/{self.restaurant.id}/events/",
+            "query_string": b"",
+            "headers": headers,
+        }
+        messages = []
+        incoming = asyncio.Queue()
+        await incoming.put({"type": "http.request", "body": b"", "more_body": False})
+
+        async def send(message):
+            messages.append(message)
+
+        task = asyncio.ensure_future(self.application(scope, incoming.get, send))
+        for _ in range(100):
+            if messages:
+                break
+            await asyncio.sleep(0.01)
+        return task, messages, incoming
+
+    async def close_stream(self, task, incoming):
+        await incoming.put({"type": "http.disconnect"})
+        await asyncio.wait_for(task, 1)
+
+    async def test_stream_success(self):
+        """
+        Testcase for testing the stream of a restaurant sends its order events.
+        """
+
+        task, messages, incoming = await self.open_stream()
+        event = get_broker().publish(restaurant_channel(self.restaurant.id), ORDER_STATUS_CHANGED, {"id": 1})
+        await asyncio.sleep(0.01)
+        await self.close_stream(task, incoming)
+
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), messages[0]["headers"])
+        self.assertEqual(
+            messages[1]["body"], f'id: {event.id}\nevent: {ORDER_STATUS_CHANGED}\ndata: {{"id":1}}\n\n'.encode()
+        )
+
+    async def test_stream_resume(self):
+        """
+        Testcase for testing a resumed stream replays missed events, or asks the client to reset.
+        """
+
+        channel = restaurant_channel(self.restaurant.id)
+        first = get_broker().publish(channel, ORDER_STATUS_CHANGED, {"id": 1})
+        second = get_broker().publish(channel, ORDER_STATUS_CHANGED, {"id": 2})
+
+        task, messages, incoming = await self.open_stream(last_event_id=first.id)
+        await asyncio.sleep(0.01)
+        await self.close_stream(task, incoming)
+
+        self.assertEqual([message.get("body", b"")[:4] for message in messages], [b"", b"id: "])
+        self.assertIn(second.id.encode(), messages[1]["body"])
+
+        task, messages, incoming = await self.open_stream(last_event_id="unknown:1")
+        await asyncio.sleep(0.01)
+        await self.close_stream(task, incoming)
+
+        self.assertEqual(messages[1]["body"], f"id: {second.id}\nevent: reset\ndata: {{}}\n\n".encode())
+
+    async def test_stream_not_owned_restaurant(self):
+        """
+        Testcase for testing streams are refused without a token or to users not owning the restaurant.
+        """
+
+        task, messages, _ = await self.open_stream(token="invalid")
+        await task
+        self.assertEqual(messages[0]["status"], 401)
+
+        task, messages, _ = await self.open_stream(token=self.other_token)
+        await task
+        self.assertEqual(messages[0]["status"], 403)
+        self.assertEqual(
+            json.loads(messages[1]["body"]),
+            {"data": None, "status": "error", "message": "You do not have permission to perform this action."},
+        )
+
+
+class OrderEventPublishTests(QueryBudgetTestCase):
+    """
+    Class to test order changes publish events once committed
+    """
+
+    def test_status_change_published_on_commit(self):
+        """
+        Testcase for testing an order status change is published to the restaurant channel after commit.
+        """
+
+        owner = G(Users)
+        restaurant = G(Restaurants, owner=owner)
+        order = G(Orders, restaurant=restaurant, status=Orders.OrderStatuses.IN_PROGRESS)
+        broker = get_broker()
+        channel = restaurant_channel(restaurant.id)
+        last_event_id = broker.last_event_id(channel)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.patch(
+                reverse("orders:orders-detail", kwargs={"pk": order.id}),
+                data={"status": "Dispatched"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(owner).access_token}",
+            )
+            self.assertEqual(broker.missed_events(channel, last_event_id), [])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(callbacks), 1)
+        [event] = broker.missed_events(channel, last_event_id)
+        self.assertEqual(event.type, ORDER_STATUS_CHANGED)
+        self.assertEqual(json.loads(event.data)["status"], "Dispatched")
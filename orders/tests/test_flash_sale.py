@@ -0,0 +1,120 @@
+"""
+Flash sale admission test module
+"""
+
+from ddf import G
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.models import Orders
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+
+class FlashSaleTests(QueryBudgetTestCase):
+    """
+    Class to test orders of flash sale items are admitted with reservation tokens
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.owner = G(Users)
+        self.customer = G(Users, balance=100, phone_number="9999999999")
+        self.restaurant = G(Restaurants, owner=self.owner)
+        self.menu = G(Menus, restaurant=self.restaurant, quantity=10, price=10)
+
+    def tearDown(self):
+        cache.clear()
+
+    def start_sale(self, quantity: int):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse("restaurants:menus-detail", kwargs={"restaurant_id": self.restaurant.id, "pk": self.menu.id}),
+                data={"quantity": quantity, "flash_sale": True},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.owner).access_token}",
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def place_order(self, quantity: int = 1):
+        return self.client.post(
+            reverse("orders:orders-list"),
+            data={"items": [{"id": self.menu.id, "quantity": quantity}]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.customer).access_token}",
+        )
+
+    def test_orders_without_tokens_rejected_before_locking(self):
+        """
+        Testcase for testing orders are rejected without querying menus once the tokens of the item ran out.
+        """
+
+        self.start_sale(3)
+        self.assertEqual(self.place_order(2).status_code, 201)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.place_order(2)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"], {"Items": f"Item sold out: {self.menu.id}"})
+        self.assertFalse(any("restaurants_menus" in query["sql"] for query in context.captured_queries))
+        self.assertEqual(self.place_order(1).status_code, 201)
+        self.assertEqual(Orders.objects.count(), 2)
+
+    def test_tokens_of_failed_orders_put_back(self):
+        """
+        Testcase for testing tokens of orders failing in the database are available to the next orders.
+        """
+
+        self.start_sale(2)
+        self.customer.balance = 10
+        self.customer.save()
+        self.assertEqual(self.place_order(2).status_code, 400)
+
+        self.customer.balance = 100
+        self.customer.save()
+        self.assertEqual(self.place_order(2).status_code, 201)
+        self.menu.refresh_from_db()
+        self.assertEqual(self.menu.quantity, 0)
+
+    def test_orders_of_items_not_on_sale_admitted(self):
+        """
+        Testcase for testing items leaving the sale are ordered without tokens.
+        """
+
+        self.start_sale(0)
+        self.assertEqual(self.place_order().status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("restaurants:menus-detail", kwargs={"restaurant_id": self.restaurant.id, "pk": self.menu.id}),
+                data={"quantity": 5, "flash_sale": False},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.owner).access_token}",
+            )
+        self.assertEqual(self.place_order().status_code, 201)
+
+    def test_missing_tokens_stocked_from_quantity(self):
+        """
+        Testcase for testing tokens lost by the cache are stocked again from the quantity of the item.
+        """
+
+        self.start_sale(3)
+        cache.clear()
+
+        with self.assertLogs("restaurants.flash_sale", "WARNING") as logs:
+            self.assertEqual(self.place_order(2).status_code, 201)
+        self.assertIn(f"Stocking missing flash sale tokens of item {self.menu.id}", logs.output[0])
+        self.assertEqual(self.place_order(2).json()["data"], {"Items": f"Item sold out: {self.menu.id}"})
+
+    def test_process_local_cache_reported(self):
+        """
+        Testcase for testing deploy checks report a cache flash sale tokens are not shared by.
+        """
+
+        self.assertIn("restaurants.W001", [message.id for message in run_checks(include_deployment_checks=True)])
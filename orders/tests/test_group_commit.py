@@ -0,0 +1,196 @@
+"""
+Order group commit test module
+"""
+
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+from ddf import G
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetClient, QueryBudgetTestCase
+from orders import group_commit
+from orders.group_commit import GroupCommitter, Placement, commit_group
+from orders.models import OrderItems, Orders, OrderShards, OutboxEvents
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+GROUP_COMMIT = {"ENABLED": True, "WINDOW_MS": 5, "MAX_GROUP_SIZE": 50}
+
+
+class PlaceGroupTests(QueryBudgetTestCase):
+    """
+    Class to test the orders of a group are validated and placed together
+    """
+
+    def setUp(self):
+        self.customer1 = G(Users, balance=100, phone_number="9999999999")
+        self.customer2 = G(Users, balance=100, phone_number="8888888888")
+        self.restaurant = G(Restaurants, owner=G(Users))
+        self.menu1 = G(Menus, restaurant=self.restaurant, quantity=5, price=10)
+        self.menu2 = G(Menus, restaurant=self.restaurant, quantity=5, price=30)
+        self.other_menu = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=5, price=10)
+
+    def test_orders_succeed_or_fail_on_their_own(self):
+        """
+        Testcase for testing invalid orders of a group fail with the errors of a single placement, the others are placed.
+        """
+
+        group = [
+            Placement(self.customer1.id, [{"id": self.menu1.id, "quantity": 2}, {"id": self.menu2.id, "quantity": 1}]),
+            Placement(
+                self.customer1.id, [{"id": self.menu1.id, "quantity": 1}, {"id": self.other_menu.id, "quantity": 1}]
+            ),
+            Placement(self.customer2.id, [{"id": 0, "quantity": 1}]),
+            Placement(self.customer2.id, [{"id": self.menu1.id, "quantity": 3}]),
+        ]
+        commit_group(group)
+
+        self.assertTrue(all(placement.done.is_set() for placement in group))
+        self.assertEqual(group[1].error.detail, {"Items": "Select all items from same restaurant"})
+        self.assertEqual(group[2].error.detail, {"Items": "Invalid item id: 0"})
+        placed = [group[0].order, group[3].order]
+        self.assertEqual(sorted(Orders.objects.values_list("id", flat=True)), sorted(order.id for order in placed))
+        self.assertEqual([order.total_amount for order in placed], [50, 30])
+        self.assertEqual(OrderItems.objects.filter(order=group[0].order).count(), 2)
+        self.assertEqual(OutboxEvents.objects.count(), 2)
+
+        self.menu1.refresh_from_db()
+        self.customer1.refresh_from_db()
+        self.assertEqual(self.menu1.quantity, 0)
+        self.assertEqual(self.customer1.balance, 50)
+
+    def test_orders_share_stock_and_balance(self):
+        """
+        Testcase for testing orders of a group see the stock and balance left by the orders before them.
+        """
+
+        group = [Placement(self.customer1.id, [{"id": self.menu2.id, "quantity": 2}]) for _ in range(2)]
+        group.append(Placement(self.customer2.id, [{"id": self.menu1.id, "quantity": 6}]))
+        commit_group(group)
+
+        self.assertIsNotNone(group[0].order)
+        self.assertEqual(group[1].error.detail, {"Profile": "Not enough balance"})
+        self.assertEqual(group[2].error.detail, {"Items": f"Not enough quantity available for item: {self.menu1.name}"})
+        self.menu2.refresh_from_db()
+        self.assertEqual(self.menu2.quantity, 3)
+
+    def test_unexpected_error_fails_every_order(self):
+        """
+        Testcase for testing an unexpected error of the group fails the orders it rolled back, keeping validation errors.
+        """
+
+        group = [
+            Placement(self.customer1.id, [{"id": self.menu1.id, "quantity": 1}]),
+            Placement(self.customer2.id, [{"id": 0, "quantity": 1}]),
+        ]
+        with patch.object(group_commit, "insert_orders", side_effect=RuntimeError):
+            commit_group(group)
+
+        self.assertTrue(all(placement.done.is_set() for placement in group))
+        self.assertIsNone(group[0].order)
+        self.assertIsInstance(group[0].error, RuntimeError)
+        self.assertEqual(group[1].error.detail, {"Items": "Invalid item id: 0"})
+        self.assertEqual(Orders.objects.count(), 0)
+
+    @skipUnless(connection.features.can_return_rows_from_bulk_insert, "Ids of bulk inserts are not returned")
+    def test_order_ids_allocated_in_one_query(self):
+        """
+        Testcase for testing the ids of the orders of a group are allocated with a single insert.
+        """
+
+        group = [Placement(self.customer1.id, [{"id": self.menu1.id, "quantity": 1}]) for _ in range(3)]
+        with CaptureQueriesContext(connection) as context:
+            commit_group(group)
+
+        inserts = [query["sql"] for query in context.captured_queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len([sql for sql in inserts if OrderShards._meta.db_table in sql.split("(")[0]]), 1)
+        self.assertEqual(
+            set(OrderShards.objects.values_list("pk", flat=True)), {placement.order.id for placement in group}
+        )
+
+
+@override_settings(ORDER_GROUP_COMMIT=GROUP_COMMIT)
+class GroupCommitTests(TransactionTestCase):
+    """
+    Class to test concurrent placements are committed together
+    """
+
+    client_class = QueryBudgetClient
+
+    def setUp(self):
+        self.customer = G(Users, balance=100, phone_number="9999999999")
+        self.menu = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=10, price=10)
+
+    def test_order_placed_with_group(self):
+        """
+        Testcase for testing orders placed through the API are committed with a group.
+        """
+
+        committer = GroupCommitter()
+        with patch.object(group_commit, "_committer", committer), patch.object(
+            group_commit, "place_group", wraps=group_commit.place_group
+        ) as place_group:
+            response = self.client.post(
+                reverse("orders:orders-list"),
+                data={"items": [{"id": self.menu.id, "quantity": 2}]},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.customer).access_token}",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["items"][0]["item"], self.menu.name)
+        self.assertEqual(response.json()["data"]["id"], Orders.objects.get().id)
+        self.assertEqual(place_group.call_count, 1)
+
+    @override_settings(ORDERNOW_SERVER="asgi")
+    def test_order_placed_alone_under_asgi(self):
+        """
+        Testcase for testing orders are placed without waiting for a group when served over ASGI.
+        """
+
+        with patch.object(group_commit, "place_group") as place_group:
+            response = self.client.post(
+                reverse("orders:orders-list"),
+                data={"items": [{"id": self.menu.id, "quantity": 2}]},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.customer).access_token}",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(place_group.call_count, 0)
+        self.assertEqual(Orders.objects.count(), 1)
+
+    def test_concurrent_placements_share_a_group(self):
+        """
+        Testcase for testing placements arriving together are committed by a single group transaction.
+        """
+
+        committer = GroupCommitter()
+        orders = []
+
+        def place():
+            try:
+                orders.append(committer.place(self.customer.id, [{"id": self.menu.id, "quantity": 1}]))
+            finally:
+                connection.close()
+
+        with override_settings(
+            ORDER_GROUP_COMMIT={**GROUP_COMMIT, "WINDOW_MS": 5000, "MAX_GROUP_SIZE": 3}
+        ), patch.object(group_commit, "place_group", wraps=group_commit.place_group) as place_group:
+            threads = [threading.Thread(target=place) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(place_group.call_count, 1)
+        self.assertEqual(len(orders), 3)
+        self.assertEqual(Orders.objects.count(), 3)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 70)
@@ -0,0 +1,108 @@
+"""
+Order placement idempotency test module
+"""
+
+import io
+from datetime import timedelta
+
+from ddf import G
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.models import IdempotencyKeys, Orders
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+
+class IdempotencyKeyTests(QueryBudgetTestCase):
+    """
+    Class to test retries of order placements with an idempotency key
+    """
+
+    def setUp(self):
+        self.user = G(Users, balance=100, phone_number="9999999999")
+        self.authorization = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        self.menu = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=10, price=10)
+
+    def place_order(self, key: str, quantity: int = 1):
+        return self.client.post(
+            reverse("orders:orders-list"),
+            data={"items": [{"id": self.menu.id, "quantity": quantity}]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=self.authorization,
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_answered_from_store(self):
+        """
+        Testcase for testing a retry gets the stored response without placing the order or reading menus again.
+        """
+
+        response = self.place_order("key-1")
+        self.assertEqual(response.status_code, 201)
+
+        with CaptureQueriesContext(connection) as context:
+            retry = self.place_order("key-1")
+
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), response.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse(any("restaurants_menus" in query["sql"] for query in context.captured_queries))
+        self.assertEqual(Orders.objects.count(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, 90)
+
+        self.assertEqual(self.place_order("key-2").status_code, 201)
+        self.assertEqual(Orders.objects.count(), 2)
+
+    def test_key_reused_for_different_request(self):
+        """
+        Testcase for testing a key cannot be reused for a different order.
+        """
+
+        self.place_order("key-1")
+        response = self.place_order("key-1", quantity=2)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Idempotency-Key", response.json()["data"])
+        self.assertEqual(Orders.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        """
+        Testcase for testing failed placements are not stored, so their retries run again.
+        """
+
+        self.menu.quantity = 0
+        self.menu.save()
+        self.assertEqual(self.place_order("key-1").status_code, 400)
+        self.assertFalse(IdempotencyKeys.objects.exists())
+
+        self.menu.quantity = 10
+        self.menu.save()
+        self.assertEqual(self.place_order("key-1").status_code, 201)
+
+    def test_expired_key_runs_again_and_is_purged(self):
+        """
+        Testcase for testing expired keys place a new order, and are deleted by the purge command.
+        """
+
+        self.place_order("key-1")
+        IdempotencyKeys.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.place_order("key-1")
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(Orders.objects.count(), 2)
+
+        IdempotencyKeys.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        G(IdempotencyKeys, user=self.user, key="key-2", expires_at=timezone.now() + timedelta(hours=1))
+        output = io.StringIO()
+        call_command("purge_idempotency_keys", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Purged 1 idempotency keys\n")
+        self.assertEqual(list(IdempotencyKeys.objects.values_list("key", flat=True)), ["key-2"])
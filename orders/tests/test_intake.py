@@ -0,0 +1,191 @@
+"""
+Asynchronous order intake test module
+"""
+
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from ddf import G
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.intake import claim_group, process_group
+from orders.models import Orders, QueuedOrders
+from orders.serializers import OrdersSerializer
+from restaurants.flash_sale import CACHE_KEY, stock_tokens
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+INTAKE = {"ASYNC": True, "WORKERS": 1, "GROUP_SIZE": 20, "LEASE_SECONDS": 60, "POLL_INTERVAL": 0}
+
+
+@override_settings(ORDER_INTAKE=INTAKE)
+class OrderIntakeTests(QueryBudgetTestCase):
+    """
+    Class to test orders queued by the asynchronous intake and placed by its workers
+    """
+
+    def setUp(self):
+        self.user = G(Users, balance=100, phone_number="9999999999")
+        self.authorization = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        self.menu1 = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=10, price=10)
+        self.menu2 = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=10, price=10)
+
+    def place_order(self, menu: Menus, quantity: int = 1):
+        return self.client.post(
+            reverse("orders:orders-list"),
+            data={"items": [{"id": menu.id, "quantity": quantity}]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=self.authorization,
+        )
+
+    def get_status(self, handle: str, authorization: str = None):
+        return self.client.get(
+            reverse("orders:orders-intake", kwargs={"handle": handle}),
+            HTTP_AUTHORIZATION=authorization or self.authorization,
+        )
+
+    def test_order_queued_then_placed(self):
+        """
+        Testcase for testing a queued order is answered with 202 and placed by a worker.
+        """
+
+        response = self.place_order(self.menu1)
+        self.assertEqual(response.status_code, 202)
+        handle = response.json()["data"]["handle"]
+        self.assertEqual(response.json()["data"]["status"], "Pending")
+        self.assertFalse(Orders.objects.exists())
+
+        output = io.StringIO()
+        call_command("process_order_intake", "--once", stdout=output)
+        self.assertEqual(output.getvalue(), "Processed 1 orders\n")
+
+        data = self.get_status(handle).json()["data"]
+        self.assertEqual(data["status"], "Placed")
+        self.assertEqual(Orders.objects.get().id, data["order_id"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, 90)
+
+        other = f"Bearer {RefreshToken.for_user(G(Users)).access_token}"
+        self.assertEqual(self.get_status(handle, other).status_code, 404)
+
+    def test_failed_order_reports_errors(self):
+        """
+        Testcase for testing invalid items are rejected when queued, and failed placements report their errors.
+        """
+
+        for items in ([], [{"id": 0, "quantity": 1}]):
+            response = self.client.post(
+                reverse("orders:orders-list"),
+                data={"items": items},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=self.authorization,
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(QueuedOrders.objects.exists())
+
+        handle = self.place_order(self.menu1, quantity=20).json()["data"]["handle"]
+        process_group()
+
+        data = self.get_status(handle).json()["data"]
+        self.assertEqual(data["status"], "Failed")
+        self.assertIn("Items", data["errors"])
+
+    def test_order_failing_with_database_error_marked_failed(self):
+        """
+        Testcase for testing an order failing with an unexpected error is marked failed, and the next ones are placed.
+        """
+
+        handles = [self.place_order(self.menu1).json()["data"]["handle"] for _ in range(2)]
+        save = OrdersSerializer.save
+        calls = []
+
+        def failing_save(serializer, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise DatabaseError("Deadlock found")
+            return save(serializer, **kwargs)
+
+        with patch.object(OrdersSerializer, "save", failing_save), self.assertLogs("orders.intake", "ERROR") as logs:
+            self.assertEqual(process_group(), 2)
+
+        self.assertIn("Placing queued order", logs.output[0])
+        first, second = (self.get_status(handle).json()["data"] for handle in handles)
+        self.assertEqual((first["status"], first["order_id"]), ("Failed", None))
+        self.assertEqual(first["errors"], {"Order": "Order could not be placed."})
+        self.assertEqual(second["status"], "Placed")
+        self.assertEqual(Orders.objects.get().id, second["order_id"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, 90)
+
+    def test_worker_survives_failing_group(self):
+        """
+        Testcase for testing a worker logs a group failing as a whole and keeps processing.
+        """
+
+        self.place_order(self.menu1)
+        output = io.StringIO()
+        with patch("orders.management.commands.process_order_intake.process_group", side_effect=DatabaseError):
+            with self.assertLogs("orders.management.commands.process_order_intake", "ERROR"):
+                call_command("process_order_intake", "--once", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Processed 0 orders\n")
+        call_command("process_order_intake", "--once", stdout=output)
+        self.assertEqual(QueuedOrders.objects.get().status, "Placed")
+
+    def test_flash_sale_tokens_taken_when_queued(self):
+        """
+        Testcase for testing queued orders take flash sale tokens, put back when their placement fails.
+        """
+
+        self.menu1.flash_sale = True
+        self.menu1.quantity = 3
+        self.menu1.save()
+        stock_tokens(self.menu1)
+        self.addCleanup(cache.clear)
+        key = CACHE_KEY.format(item_id=self.menu1.id)
+
+        self.assertEqual(self.place_order(self.menu1, quantity=2).status_code, 202)
+        self.assertEqual(cache.get(key), 1)
+        response = self.place_order(self.menu1, quantity=2)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"], {"Items": f"Item sold out: {self.menu1.id}"})
+        self.assertEqual(QueuedOrders.objects.count(), 1)
+
+        process_group()
+        self.menu1.refresh_from_db()
+        self.assertEqual((self.menu1.quantity, cache.get(key)), (1, 1))
+
+        self.user.balance = 0
+        self.user.save()
+        self.assertEqual(self.place_order(self.menu1).status_code, 202)
+        self.assertEqual(cache.get(key), 0)
+        process_group()
+        self.assertEqual(QueuedOrders.objects.filter(status="Failed").count(), 1)
+        self.assertEqual(cache.get(key), 1)
+
+    def test_workers_claim_orders_of_one_restaurant(self):
+        """
+        Testcase for testing a worker claims the orders of a single restaurant, and not the ones of a busy restaurant.
+        """
+
+        for menu in (self.menu1, self.menu2, self.menu1):
+            self.place_order(menu)
+
+        group = claim_group(10)
+        self.assertEqual([queued.restaurant_id for queued in group], [self.menu1.restaurant_id] * 2)
+        self.assertEqual([queued.restaurant_id for queued in claim_group(10)], [self.menu2.restaurant_id])
+        self.assertEqual(claim_group(10), [])
+
+        # Orders of a worker whose lease expired are claimed again
+        QueuedOrders.objects.filter(restaurant=self.menu1.restaurant).update(
+            claimed_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(len(claim_group(10)), 2)
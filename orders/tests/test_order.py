@@ -2,20 +2,26 @@
 Order test module
 """
 
+import csv
+import io
+import json
+from datetime import timedelta
 from decimal import Decimal
-from unittest.mock import ANY
+from unittest.mock import ANY, patch
 
 from ddf import G
-from django.test import TestCase
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from orderNow.testing import QueryBudgetTestCase
+from orders.delta import decode_since
 from orders.models import OrderItems, Orders
+from orders.views import OrderViewSet
 from restaurants.models import Menus, Restaurants
 from users.models import Users
 
 
-class CreateOrderTests(TestCase):
+class CreateOrderTests(QueryBudgetTestCase):
     """
     Class to test create order view
     """
@@ -59,6 +65,7 @@ class CreateOrderTests(TestCase):
                         }
                     ],
                     "order_datetime": ANY,
+                    "updated_at": ANY,
                     "restaurant": f"{self.restaurant.id}",
                     "status": "In Progress",
                     "total_amount": Decimal(self.menu_item1.price * data["items"][0]["quantity"]),
@@ -269,7 +276,7 @@ class CreateOrderTests(TestCase):
         )
 
 
-class GetOrdersListTests(TestCase):
+class GetOrdersListTests(QueryBudgetTestCase):
     """
     Class to test get orders view
     """
@@ -317,6 +324,7 @@ class GetOrdersListTests(TestCase):
                             }
                         ],
                         "order_datetime": ANY,
+                        "updated_at": ANY,
                         "restaurant": f"{self.restaurant.id}",
                         "status": order1.status,
                         "total_amount": order1.total_amount,
@@ -341,6 +349,7 @@ class GetOrdersListTests(TestCase):
                             },
                         ],
                         "order_datetime": ANY,
+                        "updated_at": ANY,
                         "restaurant": f"{self.restaurant.id}",
                         "status": order2.status,
                         "total_amount": order2.total_amount,
@@ -351,6 +360,21 @@ class GetOrdersListTests(TestCase):
             },
         )
 
+    def test_get_users_orders_query_budget(self):
+        """
+        Testcase for fetching user's orders list within query budget regardless of number of orders.
+        """
+
+        for _ in range(5):
+            order = G(Orders, restaurant=self.restaurant, customer=self.user)
+            G(OrderItems, order=order, n=2)
+
+        with self.assertQueryBudget(5):
+            response = self.client.get(reverse("orders:orders-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 5)
+
     def test_get_order_list_for_restaurant_owner(self):
         """
         Testcase for fetching orders list success case for restaurant owner.
@@ -394,6 +418,7 @@ class GetOrdersListTests(TestCase):
                             }
                         ],
                         "order_datetime": ANY,
+                        "updated_at": ANY,
                         "restaurant": f"{self.restaurant.id}",
                         "status": order1.status,
                         "total_amount": order1.total_amount,
@@ -418,6 +443,7 @@ class GetOrdersListTests(TestCase):
                             },
                         ],
                         "order_datetime": ANY,
+                        "updated_at": ANY,
                         "restaurant": f"{self.restaurant.id}",
                         "status": order2.status,
                         "total_amount": order2.total_amount,
@@ -429,7 +455,7 @@ class GetOrdersListTests(TestCase):
         )
 
 
-class UpdateOrderTests(TestCase):
+class UpdateOrderTests(QueryBudgetTestCase):
     """
     Class to test update orders view
     """
@@ -474,6 +500,7 @@ class UpdateOrderTests(TestCase):
                         }
                     ],
                     "order_datetime": ANY,
+                    "updated_at": ANY,
                     "restaurant": f"{self.restaurant.id}",
                     "status": "Cancelled",
                     "total_amount": order.total_amount,
@@ -613,6 +640,7 @@ class UpdateOrderTests(TestCase):
                         }
                     ],
                     "order_datetime": ANY,
+                    "updated_at": ANY,
                     "restaurant": f"{self.restaurant.id}",
                     "status": "Dispatched",
                     "total_amount": order.total_amount,
@@ -623,7 +651,176 @@ class UpdateOrderTests(TestCase):
         )
 
 
-class TestCustom404(TestCase):
+class DeltaOrdersTests(QueryBudgetTestCase):
+    """
+    Class to test delta sync of orders list view
+    """
+
+    def setUp(self):
+        self.user = G(Users)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.restaurant = G(Restaurants, owner=G(Users))
+        self.orders = [G(Orders, restaurant=self.restaurant, customer=self.user) for _ in range(3)]
+        G(Orders, restaurant=self.restaurant)
+
+    def sync(self, since: str):
+        response = self.client.get(
+            reverse("orders:orders-list"), data={"since": since}, HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    @patch.object(OrderViewSet, "delta_safety_window", timedelta(0))
+    def test_delta_sync_success(self):
+        """
+        Testcase for testing delta sync returns orders changed after the since token.
+        """
+
+        data = self.sync("0")
+        self.assertEqual([order["id"] for order in data["orders"]], [order.id for order in self.orders])
+        self.assertFalse(data["has_more"])
+        self.assertEqual(self.sync(data["next_since"])["orders"], [])
+
+        response = self.client.patch(
+            reverse("orders:orders-detail", args=[self.orders[1].id]),
+            data={"status": Orders.OrderStatuses.CANCELLED},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        changes = self.sync(data["next_since"])
+        self.assertEqual([order["id"] for order in changes["orders"]], [self.orders[1].id])
+        self.assertEqual(changes["orders"][0]["status"], Orders.OrderStatuses.CANCELLED)
+
+    @patch.object(OrderViewSet, "delta_safety_window", timedelta(0))
+    @patch.object(OrderViewSet, "delta_page_size", 2)
+    def test_delta_sync_pages(self):
+        """
+        Testcase for testing delta sync returns changes in pages.
+        """
+
+        data = self.sync("0")
+        self.assertEqual([order["id"] for order in data["orders"]], [order.id for order in self.orders[:2]])
+        self.assertTrue(data["has_more"])
+
+        data = self.sync(data["next_since"])
+        self.assertEqual([order["id"] for order in data["orders"]], [self.orders[2].id])
+        self.assertFalse(data["has_more"])
+
+    def test_delta_sync_holds_back_recent_changes(self):
+        """
+        Testcase for testing changes within the safety window are returned again by the next sync.
+        """
+
+        data = self.sync("0")
+        since = decode_since(data["next_since"])
+
+        self.assertLess(since[0], self.orders[0].updated_at)
+        self.assertEqual(len(self.sync(data["next_since"])["orders"]), 3)
+
+    def test_delta_sync_invalid_token(self):
+        """
+        Testcase for testing delta sync with an invalid since token.
+        """
+
+        response = self.client.get(
+            reverse("orders:orders-list"), data={"since": "yesterday"}, HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"data": {"since": ["Invalid since token."]}, "status": "error", "message": None}
+        )
+
+
+class ExportOrdersTests(QueryBudgetTestCase):
+    """
+    Class to test orders export view
+    """
+
+    def setUp(self):
+        self.user = G(Users)
+        self.restaurant_owner = G(Users)
+        self.token = str(RefreshToken.for_user(self.restaurant_owner).access_token)
+        self.restaurant = G(Restaurants, owner=self.restaurant_owner)
+        self.orders = [G(Orders, restaurant=self.restaurant, customer=self.user) for _ in range(5)]
+        for order in self.orders:
+            G(OrderItems, order=order)
+            G(OrderItems, order=order)
+        G(Orders, restaurant=G(Restaurants, owner=self.user), customer=self.user)
+
+    def export(self, **params):
+        return self.client.get(
+            reverse("orders:orders-export"),
+            data={"restaurant_id": self.restaurant.id, **params},
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+    def test_export_ndjson_success(self):
+        """
+        Testcase for testing ndjson export streams orders as the list endpoint serializes them.
+        """
+
+        with patch.object(OrderViewSet, "export_chunk_size", 2):
+            response = self.export()
+            # Query finding no archived orders, three chunks of orders and items, and the query finding no more orders
+            with self.assertNumQueries(8):
+                content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="orders.ndjson"')
+        orders = self.client.get(
+            reverse("orders:orders-list"),
+            data={"restaurant_id": self.restaurant.id},
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        ).json()["data"]
+        self.assertEqual([json.loads(line) for line in content.splitlines()], orders)
+
+    def test_export_csv_success(self):
+        """
+        Testcase for testing csv export has a row per order item.
+        """
+
+        response = self.export(export_format="csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(rows), 10)
+        item = self.orders[0].items.order_by("pk").first()
+        self.assertEqual(rows[0]["order_id"], str(self.orders[0].id))
+        self.assertEqual(rows[0]["item_id"], str(item.id))
+        self.assertEqual(rows[0]["item"], item.item.name)
+        self.assertEqual(Decimal(rows[0]["price"]), item.price)
+
+    def test_export_not_owned_restaurant(self):
+        """
+        Testcase for testing export of a restaurant not owned by the user is empty.
+        """
+
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        response = self.export()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_export_invalid_format(self):
+        """
+        Testcase for testing export with an unsupported format.
+        """
+
+        response = self.export(export_format="xml")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {"data": {"export_format": ["Supported formats: ndjson, csv."]}, "status": "error", "message": None},
+        )
+
+
+class TestCustom404(QueryBudgetTestCase):
     def test_custom_404_success(self):
         """
         Test custom 404.
@@ -0,0 +1,143 @@
+"""
+Orders outbox test module
+"""
+
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from ddf import G
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.events import ORDER_CREATED, ORDER_STATUS_CHANGED
+from orders.models import OutboxEvents
+from orders.outbox import InMemorySink, collect_outbox_lag, relay_outbox
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+
+class CountingSink(InMemorySink):
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def send(self, messages: list) -> None:
+        self.sent += len(messages)
+        super().send(messages)
+
+
+class OutboxTests(QueryBudgetTestCase):
+    """
+    Class to test order events are written to the outbox and relayed to sinks
+    """
+
+    def setUp(self):
+        self.user = G(Users, balance=100, phone_number="9999999999")
+        self.authorization = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        self.menu = G(Menus, restaurant=G(Restaurants, owner=G(Users)), quantity=10, price=10)
+
+    def place_order(self, quantity: int = 1):
+        return self.client.post(
+            reverse("orders:orders-list"),
+            data={"items": [{"id": self.menu.id, "quantity": quantity}]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=self.authorization,
+        )
+
+    def place_and_cancel_order(self) -> int:
+        order_id = self.place_order().json()["data"]["id"]
+        self.client.patch(
+            reverse("orders:orders-detail", kwargs={"pk": order_id}),
+            data={"status": "Cancelled"},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=self.authorization,
+        )
+        return order_id
+
+    def test_order_changes_written_to_outbox(self):
+        """
+        Testcase for testing committed order changes are written to the outbox, and failed ones are not.
+        """
+
+        self.assertEqual(self.place_order(quantity=20).status_code, 400)
+        self.assertFalse(OutboxEvents.objects.exists())
+
+        order_id = self.place_and_cancel_order()
+
+        events = list(OutboxEvents.objects.order_by("id"))
+        self.assertEqual([event.event_type for event in events], [ORDER_CREATED, ORDER_STATUS_CHANGED])
+        self.assertEqual({event.order_id for event in events}, {order_id})
+        self.assertEqual(events[1].payload["status"], "Cancelled")
+        self.assertEqual(events[1].payload["restaurant_id"], self.menu.restaurant_id)
+
+    def test_relay_delivers_in_order_at_least_once(self):
+        """
+        Testcase for testing events are sent in order and sent again when the relay stops before deleting them.
+        """
+
+        order_id = self.place_and_cancel_order()
+        sink = CountingSink()
+
+        with patch("django.db.models.query.QuerySet.delete", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                relay_outbox(sink, batch_size=10)
+        self.assertEqual(OutboxEvents.objects.count(), 2)
+
+        self.assertEqual(relay_outbox(sink, batch_size=1), 2)
+        self.assertEqual(sink.sent, 4)
+        self.assertEqual([message["type"] for message in sink.messages], [ORDER_CREATED, ORDER_STATUS_CHANGED])
+        self.assertEqual({message["order_id"] for message in sink.messages}, {order_id})
+        self.assertFalse(OutboxEvents.objects.exists())
+        self.assertEqual(relay_outbox(sink), 0)
+
+    def test_relay_command_and_lag_metrics(self):
+        """
+        Testcase for testing the relay command appends events to the file sink, and pending events are measured.
+        """
+
+        self.place_and_cancel_order()
+        keys = [str(key) for key in OutboxEvents.objects.order_by("id").values_list("key", flat=True)]
+
+        collect_outbox_lag.reset()
+        content = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('ordernow_outbox_pending{shard="default"} 2', content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "outbox.jsonl")
+            config = {"SINK": "orders.outbox.FileSink", "PATH": path, "BATCH_SIZE": 100, "POLL_INTERVAL": 1}
+            output = io.StringIO()
+            with override_settings(ORDER_OUTBOX=config):
+                call_command("relay_outbox", "--once", stdout=output)
+
+            self.assertEqual(output.getvalue(), "Sent 2 events\n")
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual([json.loads(line)["key"] for line in file], keys)
+
+        collect_outbox_lag.reset()
+        content = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('ordernow_outbox_pending{shard="default"} 0', content)
+        self.assertIn('ordernow_outbox_lag_seconds{shard="default"} 0.0', content)
+
+    def test_lag_metrics_cached(self):
+        """
+        Testcase for testing scrapes within the metrics ttl do not read the outbox again.
+        """
+
+        collect_outbox_lag.reset()
+        self.client.get(reverse("metrics"))
+        self.place_order()
+
+        with self.assertNumQueries(0):
+            content = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('ordernow_outbox_pending{shard="default"} 0', content)
+
+        collect_outbox_lag.reset()
+        content = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('ordernow_outbox_pending{shard="default"} 1', content)
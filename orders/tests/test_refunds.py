@@ -0,0 +1,65 @@
+"""
+Order refunds test module
+"""
+
+import io
+from datetime import timedelta
+
+from ddf import G
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetTestCase
+from orders.models import Orders, PendingRefunds, Refunds
+from restaurants.models import Restaurants
+from users.models import Users
+
+
+class RefundsTests(QueryBudgetTestCase):
+    """
+    Class to test refunds of cancelled orders are recorded, and pending ones credited once by reconciliation
+    """
+
+    def setUp(self):
+        self.customer = G(Users, balance=0)
+        self.restaurant = G(Restaurants, owner=G(Users))
+
+    def test_cancellation_records_refund(self):
+        """
+        Testcase for testing a cancelled order is refunded once, and its pending refund deleted once committed.
+        """
+
+        order = G(Orders, restaurant=self.restaurant, customer=self.customer, total_amount=25)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse("orders:orders-detail", kwargs={"pk": order.id}),
+                data={"status": "Cancelled"},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.customer).access_token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Refunds.objects.values_list("order_id", "amount")), [(order.id, 25)])
+        self.assertFalse(PendingRefunds.objects.exists())
+
+    def test_pending_refunds_credited_once(self):
+        """
+        Testcase for testing reconciliation credits pending refunds whose default transaction did not commit only.
+        """
+
+        G(Refunds, order_id=1, customer=self.customer, amount=10)
+        for order_id in (1, 2):
+            G(PendingRefunds, order_id=order_id, customer=self.customer, amount=10)
+        G(PendingRefunds, order_id=3, customer=self.customer, amount=10)
+        PendingRefunds.objects.exclude(order_id=3).update(created_at=timezone.now() - timedelta(minutes=10))
+
+        output = io.StringIO()
+        call_command("reconcile_order_shards", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Cancelled 0 orphan orders\nCredited 1 pending refunds\n")
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 10)
+        self.assertEqual(sorted(Refunds.objects.values_list("order_id", flat=True)), [1, 2])
+        self.assertEqual(list(PendingRefunds.objects.values_list("order_id", flat=True)), [3])
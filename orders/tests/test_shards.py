@@ -0,0 +1,271 @@
+"""
+Order shards test module
+"""
+
+import io
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from ddf import G
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orderNow.testing import QueryBudgetClient
+from orders.archive import archive_orders
+from orders.bulk_status import update_statuses
+from orders.models import ArchivedOrders, OrderItems, Orders, OrderShards, OutboxEvents
+from orders.reconciliation import reconcile_refunds
+from orders.serializers import OrdersUpdateSerializer
+from orders.shards import on_shard, shard_for_order, shard_for_restaurant
+from orders.views import OrderViewSet
+from restaurants.models import Menus, Restaurants
+from users.models import Users
+
+SHARDS = {"ALIASES": ["default", "shard1"]}
+HAS_SHARD = "shard1" in settings.DATABASES
+
+
+@override_settings(ORDER_SHARDS=SHARDS)
+class ShardMappingTests(SimpleTestCase):
+    """
+    Class to test restaurants and orders are mapped to shards
+    """
+
+    def test_shard_for_restaurant(self):
+        """
+        Testcase for testing restaurants are spread over the shards by id.
+        """
+
+        self.assertEqual(
+            [shard_for_restaurant(restaurant_id) for restaurant_id in (1, "2", 3)], ["shard1", "default", "shard1"]
+        )
+        self.assertEqual(on_shard(Orders.objects.all(), "shard1").db, "shard1")
+
+    @override_settings(ORDER_SHARDS={"ALIASES": ["default"]})
+    def test_single_shard_order_lookup(self):
+        """
+        Testcase for testing orders need no lookup while there is a single shard.
+        """
+
+        self.assertEqual(shard_for_order(1), "default")
+
+
+@skipUnless(HAS_SHARD, "Needs a `shard1` alias in DATABASES")
+@override_settings(ORDER_SHARDS=SHARDS)
+class ShardedOrdersTests(TransactionTestCase):
+    """
+    Class to test orders are placed, updated and read on the shard of their restaurant
+
+    Runs with a `shard1` alias in DATABASES, a database of its own.
+    """
+
+    # Test runners set up every database of the collected test cases, skipped ones included
+    databases = {"default", "shard1"} if HAS_SHARD else {"default"}
+    client_class = QueryBudgetClient
+
+    def setUp(self):
+        self.customer = G(Users, balance=1000, phone_number="9999999999")
+        self.owner = G(Users)
+        restaurants = [G(Restaurants, owner=self.owner), G(Restaurants, owner=self.owner)]
+        self.restaurants = {shard_for_restaurant(restaurant.id): restaurant for restaurant in restaurants}
+        self.menus = {
+            shard: G(Menus, restaurant=restaurant, quantity=10, price=10)
+            for shard, restaurant in self.restaurants.items()
+        }
+        # Shards keep copies of the reference tables
+        for model in (Users, Restaurants, Menus):
+            model.objects.using("shard1").bulk_create(list(model.objects.all()))
+
+    def request(self, method: str, url: str, user: Users, **kwargs):
+        authorization = f"Bearer {RefreshToken.for_user(user).access_token}"
+        return getattr(self.client, method)(url, HTTP_AUTHORIZATION=authorization, **kwargs)
+
+    def create_order(self, shard: str) -> Orders:
+        return Orders.objects.using(shard).create(
+            restaurant=self.restaurants[shard], customer=self.customer, total_amount=10
+        )
+
+    def test_order_placed_and_updated_on_shard(self):
+        """
+        Testcase for testing orders are written to the shard of their restaurant and found by id.
+        """
+
+        response = self.request(
+            "post",
+            reverse("orders:orders-list"),
+            self.customer,
+            data={"items": [{"id": self.menus["shard1"].id, "quantity": 1}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        order_id = response.json()["data"]["id"]
+
+        self.assertFalse(Orders.objects.filter(pk=order_id).exists())
+        self.assertEqual(OrderItems.objects.using("shard1").filter(order_id=order_id).count(), 1)
+        self.assertEqual(OrderShards.objects.get(pk=order_id).shard, "shard1")
+
+        url = reverse("orders:orders-detail", kwargs={"pk": order_id})
+        response = self.request(
+            "patch", url, self.customer, data={"status": "Cancelled"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Orders.objects.using("shard1").get(pk=order_id).status, Orders.OrderStatuses.CANCELLED)
+        self.assertEqual(self.request("get", url, self.customer).json()["data"]["status"], "Cancelled")
+        self.assertEqual(self.request("get", url, G(Users)).status_code, 404)
+        self.assertEqual(
+            self.request(
+                "get", reverse("orders:orders-detail", kwargs={"pk": order_id + 1}), self.customer
+            ).status_code,
+            404,
+        )
+
+    def test_checkout_placed_on_every_shard(self):
+        """
+        Testcase for testing a checkout spanning shards writes each order to the shard of its restaurant.
+        """
+
+        response = self.request(
+            "post",
+            reverse("orders:orders-checkout"),
+            self.customer,
+            data={"items": [{"id": menu.id, "quantity": 1} for menu in self.menus.values()]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        for order in response.json()["data"]:
+            shard = OrderShards.objects.get(pk=order["id"]).shard
+            self.assertEqual(order["restaurant"], self.restaurants[shard].name)
+            self.assertEqual(len(order["items"]), 1)
+            self.assertEqual(OrderItems.objects.using(shard).filter(order_id=order["id"]).count(), 1)
+
+    def test_bulk_status_on_every_shard(self):
+        """
+        Testcase for testing bulk status updates find the orders of every shard, and refund their customers once.
+        """
+
+        orders = [self.create_order(shard) for shard in ("default", "shard1")]
+        response = self.request(
+            "post",
+            reverse("orders:orders-bulk-status"),
+            self.owner,
+            data={"ids": [order.id for order in orders], "status": "Cancelled"},
+            content_type="application/json",
+        )
+
+        self.assertEqual([result["status"] for result in response.json()["data"]], ["Cancelled", "Cancelled"])
+        for order in orders:
+            self.assertEqual(Orders.objects.using(order._state.db).get(pk=order.id).status, "Cancelled")
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 1020)
+
+    def test_history_merges_shards(self):
+        """
+        Testcase for testing the order history of a customer is merged from every shard, newest first.
+        """
+
+        orders = [self.create_order(shard) for shard in ("default", "shard1", "shard1", "default", "shard1")]
+        expected = [order.id for order in reversed(orders)]
+
+        pages, before = [], None
+        with patch.object(OrderViewSet, "history_page_size", 2):
+            while True:
+                params = {} if before is None else {"before": before}
+                page = self.request("get", reverse("orders:orders-history"), self.customer, data=params).json()["data"]
+                pages.append([order["id"] for order in page["orders"]])
+                before = page["next_before"]
+                if before is None:
+                    break
+
+        self.assertEqual(pages, [expected[:2], expected[2:4], expected[4:]])
+        response = self.request("get", reverse("orders:orders-list"), self.customer)
+        self.assertEqual([order["id"] for order in response.json()["data"]], sorted(expected))
+
+        response = self.request(
+            "get", reverse("orders:orders-list"), self.owner, data={"restaurant_id": self.restaurants["shard1"].id}
+        )
+        self.assertEqual([order["id"] for order in response.json()["data"]], [orders[1].id, orders[2].id, orders[4].id])
+
+    def test_reports_and_archive_read_shard(self):
+        """
+        Testcase for testing reports read the shard of their restaurant, which archives its own orders.
+        """
+
+        order = self.create_order("shard1")
+        Orders.objects.using("shard1").filter(pk=order.id).update(status=Orders.OrderStatuses.DELIVERED)
+        url = reverse(
+            "restaurants:reports-customer-spends-report", kwargs={"restaurant_id": self.restaurants["shard1"].id}
+        )
+
+        before = self.request("get", url, self.owner).json()
+        self.assertEqual(len(before["data"]), 1)
+
+        self.assertEqual(archive_orders(before=timezone.now()), 1)
+        self.assertTrue(ArchivedOrders.objects.using("shard1").filter(pk=order.id).exists())
+        self.assertEqual(self.request("get", url, self.owner).json(), before)
+
+    def test_orphan_orders_cancelled(self):
+        """
+        Testcase for testing orders of a shard whose placement was rolled back in the default database are cancelled.
+        """
+
+        orphan, placed, recent = [self.create_order("shard1") for _ in range(3)]
+        default_order = self.create_order("default")
+        OrderShards.objects.filter(pk__in=[orphan.id, recent.id, default_order.id]).delete()
+        Orders.objects.using("shard1").exclude(pk=recent.id).update(
+            order_datetime=timezone.now() - timedelta(minutes=10)
+        )
+
+        output = io.StringIO()
+        with self.assertLogs("orders.reconciliation", "WARNING"):
+            call_command("reconcile_order_shards", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Cancelled 1 orphan orders\nCredited 0 pending refunds\n")
+        statuses = dict(Orders.objects.using("shard1").values_list("pk", "status"))
+        self.assertEqual(statuses, {orphan.id: "Cancelled", placed.id: "In Progress", recent.id: "In Progress"})
+        self.assertEqual(OrderShards.objects.get(pk=orphan.id).shard, "shard1")
+        self.assertTrue(
+            OutboxEvents.objects.using("shard1").filter(order_id=orphan.id, event_type="order.status_changed").exists()
+        )
+
+    def test_refund_of_cancellation_failing_in_default_credited(self):
+        """
+        Testcase for testing the refund of a cancellation committed on its shard only is credited by reconciliation.
+        """
+
+        order = self.create_order("shard1")
+        with patch.object(connections["default"], "commit", side_effect=DatabaseError), self.assertRaises(
+            DatabaseError
+        ):
+            OrdersUpdateSerializer().update(order, {"status": "Cancelled"})
+
+        self.assertEqual(Orders.objects.using("shard1").get(pk=order.id).status, "Cancelled")
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 1000)
+
+        self.assertEqual(reconcile_refunds(grace_seconds=0), 1)
+        self.assertEqual(reconcile_refunds(grace_seconds=0), 0)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 1010)
+
+    def test_refunds_of_bulk_cancellation_failing_in_default_credited(self):
+        """
+        Testcase for testing refunds of bulk cancellations committed on their shard only are credited by reconciliation.
+        """
+
+        orders = [self.create_order("shard1") for _ in range(2)]
+        with patch.object(connections["default"], "commit", side_effect=DatabaseError), self.assertRaises(
+            DatabaseError
+        ):
+            update_statuses(self.owner, [order.id for order in orders], Orders.OrderStatuses.CANCELLED)
+
+        self.assertEqual(Orders.objects.using("shard1").filter(status="Cancelled").count(), 2)
+        self.assertEqual(reconcile_refunds(grace_seconds=0), 2)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, 1020)
@@ -5,12 +5,13 @@ Routes Module
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from orders.views import OrderViewSet
+from orders.views import CartViewSet, OrderViewSet
 
 app_name = "orders"
 
 router = DefaultRouter()
 router.register(r"orders", OrderViewSet, basename="orders")
+router.register(r"cart", CartViewSet, basename="cart")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -2,14 +2,48 @@
 Orders view module
 """
 
-from rest_framework import filters, permissions, viewsets
+from datetime import timedelta
+from functools import partial
+from itertools import chain
+from operator import attrgetter
 
-from orders.models import Orders
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection
+from django.db.models import prefetch_related_objects
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import filters, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+
+from orderNow.db_routers import ReplicaReadMixin
+from orders.bulk_status import update_statuses
+from orders.carts import checkout_cart, hold_item, release_item
+from orders.checkout import place_checkout
+from orders.delta import changed_since, decode_since, encode_since
+from orders.exports import EXPORT_FORMATS, iter_orders
+from orders.group_commit import get_group_committer, group_commit_enabled
+from orders.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from orders.intake import enqueue_order, intake_status
+from orders.models import ArchivedOrders, CartItems, Orders, QueuedOrders
 from orders.permissions import IsOwnerOrCustomer
-from orders.serializers import OrdersSerializer, OrdersUpdateSerializer
+from orders.serializers import (
+    ArchivedOrdersSerializer,
+    BulkStatusSerializer,
+    CartItemsSerializer,
+    OrdersSerializer,
+    OrdersUpdateSerializer,
+)
+from orders.shards import on_shard, scatter_gather, shard_aliases, shard_for_order, shard_for_restaurant
+from restaurants.flash_sale import reserved_stock
+from restaurants.ownership import get_owned_restaurants
+
+UUID_PATTERN = "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Order viewset class
     """
@@ -29,6 +63,15 @@ class OrderViewSet(viewsets.ModelViewSet):
         "restaurant__name",
         "items__item__name",
     ]
+    replica_actions = ("list", "history")
+    # Orders read per query by exports
+    export_chunk_size = 1000
+    # Maximum number of orders returned by a delta sync request
+    delta_page_size = 500
+    # Maximum number of orders returned by an order history request
+    history_page_size = 50
+    # Changes committed this long after their updated_at are still returned by delta syncs
+    delta_safety_window = timedelta(seconds=5)
 
     def get_serializer_class(self):
         """
@@ -39,14 +82,283 @@ class OrderViewSet(viewsets.ModelViewSet):
             return OrdersUpdateSerializer
         return OrdersSerializer
 
+    def create(self, request, *args, **kwargs):
+        place = self.enqueue if settings.ORDER_INTAKE["ASYNC"] else super().create
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return place(request, *args, **kwargs)
+        # Retries of the placement are answered with its stored response
+        return idempotent(request, key, partial(place, request, *args, **kwargs))
+
+    def enqueue(self, request, *args, **kwargs):
+        """
+        Function to queue an order for the intake workers, answering with the handle of its intake status
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = [{"id": item["id"], "quantity": item["quantity"]} for item in serializer.validated_data["items"]]
+        # Tokens are taken when queued, so sold out items are rejected before their orders wait in the queue
+        with reserved_stock(items) as tokens:
+            queued = enqueue_order(request.user, serializer.validated_data, tokens)
+        return Response(intake_status(queued), status=status.HTTP_202_ACCEPTED)
+
+    def perform_create(self, serializer):
+        items = [{"id": item["id"], "quantity": item["quantity"]} for item in serializer.validated_data["items"]]
+        # Orders of flash sale items without reservation tokens are rejected before locking anything
+        with reserved_stock(items):
+            self.place_order(serializer, items)
+
+    def place_order(self, serializer, items: list) -> None:
+        # Placements already in a transaction, like idempotent ones, can not wait for a group to commit
+        if not group_commit_enabled() or connection.in_atomic_block:
+            return super().perform_create(serializer)
+
+        try:
+            order = get_group_committer().place(self.request.user.id, items)
+        except DatabaseError:
+            return super().perform_create(serializer)
+        prefetch_related_objects([order], "items__item")
+        serializer.instance = order
+
+    @action(detail=False, methods=["post"], url_path="bulk-status")
+    def bulk_status(self, request):
+        """
+        Move orders of restaurants of the user to a status, with the result of each order
+        """
+
+        if not get_owned_restaurants(request.user.id):
+            raise PermissionDenied("Only restaurant owners can update orders in bulk.")
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = update_statuses(request.user, serializer.validated_data["ids"], serializer.validated_data["status"])
+        return Response(results)
+
+    @action(detail=False, methods=["post"])
+    def checkout(self, request):
+        """
+        Place items of several restaurants at once, as one order per restaurant debited from the wallet together
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = [{"id": item["id"], "quantity": item["quantity"]} for item in serializer.validated_data["items"]]
+        with reserved_stock(items):
+            orders = place_checkout(request.user.id, items)
+        return Response(self.get_serializer(orders, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["get"], url_path=rf"intake/(?P<handle>{UUID_PATTERN})")
+    def intake(self, request, handle):
+        """
+        Get the status of an order queued by the asynchronous intake, with the id of the order once placed
+        """
+
+        queued = get_object_or_404(QueuedOrders, handle=handle, customer=request.user)
+        return Response(intake_status(queued))
+
+    def reads_from_replica(self, request) -> bool:
+        # Delta sync tokens assume changes are visible within the safety window, which replica lag may exceed
+        return super().reads_from_replica(request) and "since" not in request.query_params
+
+    def get_shard(self):
+        """
+        Function to get the shard of the orders read by the request
+
+        Returns:
+            str: Database alias, `None` for the orders of the user, which are on every shard
+        """
+
+        if self.action in ("retrieve", "partial_update"):
+            shard = shard_for_order(self.kwargs["pk"])
+            if shard is None:
+                raise Http404
+            return shard
+
+        restaurant_id = self.request.GET.get("restaurant_id")
+        if restaurant_id:
+            return shard_for_restaurant(restaurant_id)
+        return None
+
     def get_queryset(self):
+        shard = self.get_shard() or DEFAULT_DB_ALIAS
         if self.action == "partial_update":
-            return Orders.objects.all()
+            return on_shard(Orders.objects.all(), shard)
+
+        queryset = Orders.objects.all()
+        if self.action != "export":
+            queryset = queryset.select_related("restaurant", "customer").prefetch_related("items__item")
+        return on_shard(self.filter_visible(queryset), shard)
+
+    def read_orders(self, queryset, key, limit: int = None) -> list:
+        """
+        Function to read orders from the shard of the request, or from every shard for the orders of the user
+
+        Args:
+            queryset: Orders ordered by `key`
+            key: Callable returning the sort key of an order
+            limit (int): Maximum number of orders read, `None` for all orders
+
+        Returns:
+            list: Orders
+        """
+
+        if self.get_shard() is None and len(shard_aliases()) > 1:
+            return scatter_gather(queryset, key, limit)
+        return list(queryset[:limit])
+
+    def filter_visible(self, queryset):
+        """
+        Function to filter live or archived orders to the ones of the user, or of the restaurant in `restaurant_id`
+        """
 
         restaurant_id = self.request.GET.get("restaurant_id")
         if restaurant_id:
-            return Orders.objects.filter(
+            return queryset.filter(
                 restaurant_id=restaurant_id, restaurant__owner=self.request.user, restaurant__is_active=True
             )
         else:
-            return Orders.objects.filter(customer=self.request.user)
+            return queryset.filter(customer=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Orders no longer live are read from the archive
+            queryset = ArchivedOrders.objects.select_related("restaurant", "customer").prefetch_related("items__item")
+            order = get_object_or_404(on_shard(self.filter_visible(queryset), self.get_shard()), pk=kwargs["pk"])
+            self.check_object_permissions(request, order)
+            return Response(ArchivedOrdersSerializer(order).data)
+
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+        if since is not None:
+            return self.delta(decode_since(since))
+        if self.get_shard() is None and len(shard_aliases()) > 1:
+            # Orders of every shard are merged by id, ordering params only apply to the orders of a restaurant
+            orders = self.read_orders(self.get_queryset().order_by("pk"), key=attrgetter("pk"))
+            return Response(self.get_serializer(orders, many=True).data)
+        return super().list(request, *args, **kwargs)
+
+    def delta(self, since: tuple) -> Response:
+        """
+        Function to list the orders changed after the `since` token, with the token of the returned changes
+
+        The token is held back by `delta_safety_window` once the client is caught up, so changes of
+        transactions committed after later ones are not skipped. Orders changed in the window are
+        returned again by the next request.
+        """
+
+        orders = self.read_orders(
+            changed_since(self.get_queryset(), since),
+            key=attrgetter("updated_at", "pk"),
+            limit=self.delta_page_size + 1,
+        )
+        has_more = len(orders) > self.delta_page_size
+        orders = orders[: self.delta_page_size]
+
+        next_since = (orders[-1].updated_at, orders[-1].pk) if orders else since
+        if not has_more:
+            next_since = max(since, min(next_since, (timezone.now() - self.delta_safety_window, 0)))
+
+        serializer = self.get_serializer(orders, many=True)
+        return Response({"orders": serializer.data, "next_since": encode_since(*next_since), "has_more": has_more})
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream every order of the user, or of the restaurant given by `restaurant_id`, with its items
+
+        The `export_format` query param is either `ndjson`, one order per line, or `csv`, one row per item.
+        """
+
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"export_format": [f"Supported formats: {', '.join(EXPORT_FORMATS)}."]})
+
+        encode, content_type = EXPORT_FORMATS[export_format]
+        shard = self.get_shard()
+        shards = shard_aliases() if shard is None else [shard]
+        # Archived orders come first, they are older than live ones
+        orders = chain(
+            *(
+                iter_orders(on_shard(queryset, alias), self.export_chunk_size)
+                for queryset in (self.filter_visible(ArchivedOrders.objects.all()), self.get_queryset())
+                for alias in shards
+            )
+        )
+        response = StreamingHttpResponse(encode(orders), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="orders.{export_format}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def history(self, request):
+        """
+        List a page of the orders of the user, or of the restaurant given by `restaurant_id`, newest first
+
+        Pages are keyset paginated, the `before` query param is the `next_before` of the previous page.
+        Orders of the user are merged from every shard.
+        """
+
+        queryset = self.get_queryset().order_by("-pk")
+        before = request.query_params.get("before")
+        if before is not None:
+            try:
+                queryset = queryset.filter(pk__lt=int(before))
+            except ValueError:
+                raise ValidationError({"before": ["Invalid order id."]})
+
+        orders = self.read_orders(queryset, key=lambda order: -order.pk, limit=self.history_page_size + 1)
+        has_more = len(orders) > self.history_page_size
+        orders = orders[: self.history_page_size]
+
+        serializer = self.get_serializer(orders, many=True)
+        return Response({"orders": serializer.data, "next_before": orders[-1].pk if has_more else None})
+
+
+class CartViewSet(viewsets.GenericViewSet):
+    """
+    Cart viewset class
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CartItemsSerializer
+    lookup_field = "item_id"
+    lookup_value_regex = r"\d+"
+
+    def get_queryset(self):
+        return CartItems.objects.filter(customer=self.request.user).select_related("item").order_by("pk")
+
+    def list(self, request):
+        """
+        Get the items of the cart of the user, with the time their stock is held until
+        """
+
+        return Response(self.get_serializer(self.get_queryset(), many=True).data)
+
+    def create(self, request):
+        """
+        Add an item to the cart of the user, holding its quantity of the stock
+        """
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cart_item = hold_item(request.user, serializer.validated_data["item_id"], serializer.validated_data["quantity"])
+        return Response(self.get_serializer(cart_item).data, status=status.HTTP_201_CREATED)
+
+    def destroy(self, request, item_id):
+        """
+        Remove an item from the cart of the user, giving its stock back
+        """
+
+        if not release_item(request.user, int(item_id)):
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["post"])
+    def checkout(self, request):
+        """
+        Place an order with the items of the cart of the user
+        """
+
+        order = checkout_cart(request.user.id)
+        return Response(OrdersSerializer(order).data, status=status.HTTP_201_CREATED)
@@ -8,3 +8,7 @@ from django.apps import AppConfig
 class RestaurantsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "restaurants"
+
+    def ready(self) -> None:
+        import restaurants.checks
+        import restaurants.signals
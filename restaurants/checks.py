@@ -0,0 +1,24 @@
+"""
+System checks for Restaurants
+"""
+
+from django.core.checks import Warning, register
+
+from restaurants.flash_sale import is_process_local
+
+
+@register(deploy=True)
+def check_flash_sale_cache(app_configs, **kwargs) -> list:
+    """
+    Check the default cache is shared by the processes, as flash sale tokens must be
+    """
+
+    if not is_process_local():
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process, flash sale tokens are not shared and do not limit orders.",
+            hint="Configure a shared cache backend, such as redis or the database cache, in CACHES.",
+            id="restaurants.W001",
+        )
+    ]
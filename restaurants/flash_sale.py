@@ -0,0 +1,149 @@
+"""
+Flash sale module for Menus
+
+The stock of a menu item flagged with `flash_sale` is split into reservation tokens kept in the
+cache, one per unit, stocked whenever the owner saves the item. An order of flash sale items takes
+its tokens before its transaction is opened, and is rejected without touching the database when
+they ran out, so only the orders which can be served wait on the lock of the item. Tokens of orders
+which fail are put back, tokens of placed orders are consumed with the stock.
+
+Every process must admit against the same pool, so the pool needs a cache shared by the processes
+whose `decr` goes below zero, like the database or redis caches. Stocking tokens in a process-local
+cache logs a warning, and `manage.py check --deploy` reports it. Items whose entry is missing, after
+a restart or an eviction, are looked up once: tokens of flash sale items are stocked again from
+their quantity, other items are remembered as not on sale for `NOT_ON_SALE_TTL` seconds.
+"""
+
+import logging
+from contextlib import contextmanager
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import serializers
+
+from restaurants.models import Menus
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "restaurants:flash_sale:{item_id}"
+NOT_ON_SALE = "off"
+NOT_ON_SALE_TTL = 60
+
+
+def is_process_local() -> bool:
+    return isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def set_tokens(item_id: int, quantity: int, replace: bool = True) -> None:
+    if is_process_local():
+        logger.warning(
+            "Flash sale tokens of item %s are kept in a process-local cache, other processes admit every order",
+            item_id,
+        )
+    key = CACHE_KEY.format(item_id=item_id)
+    if replace:
+        cache.set(key, quantity, None)
+    else:
+        cache.add(key, quantity, None)
+
+
+def stock_tokens(menu: Menus) -> None:
+    """
+    Function to stock the reservation tokens of a menu item with its quantity, or drop them if it left the sale
+
+    Args:
+        menu (Menus): Saved menu item
+    """
+
+    if menu.flash_sale:
+        set_tokens(menu.id, menu.quantity)
+    else:
+        cache.set(CACHE_KEY.format(item_id=menu.id), NOT_ON_SALE, NOT_ON_SALE_TTL)
+
+
+def pooled_tokens(item_ids) -> dict:
+    """
+    Function to get the token pools of menu items, stocking the missing ones from the database
+
+    Args:
+        item_ids: Ids of the menu items
+
+    Returns:
+        dict: Cache key of the pool per item id, for the items on flash sale
+    """
+
+    keys = {item_id: CACHE_KEY.format(item_id=item_id) for item_id in item_ids}
+    cached = cache.get_many(keys.values())
+    missing = [item_id for item_id, key in keys.items() if key not in cached]
+    if missing:
+        for item_id, flash_sale, quantity in Menus.objects.filter(pk__in=missing).values_list(
+            "id", "flash_sale", "quantity"
+        ):
+            if flash_sale:
+                logger.warning("Stocking missing flash sale tokens of item %s from its quantity", item_id)
+                # Another process may have stocked them in the meantime
+                set_tokens(item_id, quantity, replace=False)
+                cached[keys[item_id]] = quantity
+            else:
+                cache.set(keys[item_id], NOT_ON_SALE, NOT_ON_SALE_TTL)
+    return {item_id: key for item_id, key in keys.items() if isinstance(cached.get(key), int)}
+
+
+def put_back_tokens(taken: dict) -> None:
+    # Missing pools are left to be stocked from the quantity, which includes the quantity put back
+    keys = {item_id: CACHE_KEY.format(item_id=item_id) for item_id in taken}
+    cached = cache.get_many(keys.values())
+    for item_id, key in keys.items():
+        if not isinstance(cached.get(key), int):
+            continue
+        try:
+            cache.incr(key, taken[item_id])
+        except ValueError:
+            # Dropped in the meantime
+            pass
+
+
+def take_tokens(items: list) -> dict:
+    """
+    Function to take the reservation tokens of the flash sale items of an order
+
+    Args:
+        items (list): Items of the order, with `id` and `quantity`
+
+    Returns:
+        dict: Number of tokens taken per item id
+
+    Raises:
+        ValidationError: If an item has not enough tokens left, none being taken then
+    """
+
+    quantities = {}
+    for item_data in items:
+        quantities[item_data["id"]] = quantities.get(item_data["id"], 0) + item_data["quantity"]
+
+    taken = {}
+    for item_id, key in pooled_tokens(quantities).items():
+        try:
+            left = cache.decr(key, quantities[item_id])
+        except ValueError:
+            continue
+        taken[item_id] = quantities[item_id]
+        if left < 0:
+            put_back_tokens(taken)
+            raise serializers.ValidationError({"Items": f"Item sold out: {item_id}"})
+    return taken
+
+
+@contextmanager
+def reserved_stock(items: list):
+    """
+    Context manager taking the reservation tokens of an order, put back if its block raises
+    """
+
+    taken = take_tokens(items)
+    try:
+        yield taken
+    except BaseException:
+        put_back_tokens(taken)
+        raise
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0004_auto_20240119_1302'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menus',
+            name='flash_sale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
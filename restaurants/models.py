@@ -34,4 +34,6 @@ class Menus(models.Model):
         validators=[MinValueValidator(0)],
     )
     quantity = models.PositiveIntegerField()
+    # Orders of flash sale items are only placed with a reservation token, see `restaurants.flash_sale`
+    flash_sale = models.BooleanField(default=False)
     restaurant = models.ForeignKey(Restaurants, related_name="menu", on_delete=models.PROTECT)
@@ -0,0 +1,70 @@
+"""
+Ownership registry for Restaurants
+
+Keeps a process-local, TTL bound map of the restaurants owned by each user so permission
+checks on the hot path do not have to query the database. Entries are invalidated by signals
+whenever a restaurant or its owner is saved.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from restaurants.models import Restaurants
+
+CACHE_KEY = "restaurants:owned:{user_id}"
+
+
+def get_owned_restaurants(user_id: int) -> dict:
+    """
+    Function to fetch restaurants owned by a user
+
+    Args:
+        user_id (int): Id of the owner
+
+    Returns:
+        dict: Mapping of restaurant id to its `is_active` flag
+    """
+
+    key = CACHE_KEY.format(user_id=user_id)
+    owned = cache.get(key)
+    if owned is None:
+        owned = dict(Restaurants.objects.filter(owner_id=user_id).values_list("id", "is_active"))
+        cache.set(key, owned, settings.OWNERSHIP_CACHE_TTL)
+    return owned
+
+
+def is_restaurant_owner(user, restaurant_id, active_only: bool = True) -> bool:
+    """
+    Function to check if user owns a restaurant
+
+    Args:
+        user: User to check
+        restaurant_id: Id of the restaurant, as received in url or query params
+        active_only (bool): Whether the restaurant must also be active
+
+    Returns:
+        bool: `True` if user owns the restaurant, `False` otherwise.
+    """
+
+    if not user or not user.is_authenticated:
+        return False
+    try:
+        restaurant_id = int(restaurant_id)
+    except (TypeError, ValueError):
+        return False
+
+    owned = get_owned_restaurants(user.id)
+    if active_only:
+        return owned.get(restaurant_id, False)
+    return restaurant_id in owned
+
+
+def invalidate_owner(user_id: int) -> None:
+    """
+    Function to drop cached ownership of a user
+
+    Args:
+        user_id (int): Id of the owner
+    """
+
+    cache.delete(CACHE_KEY.format(user_id=user_id))
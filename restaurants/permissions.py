@@ -4,7 +4,7 @@ Custom permissions for Restaurants
 
 from rest_framework import permissions
 
-from restaurants.models import Restaurants
+from restaurants.ownership import is_restaurant_owner
 
 
 class ReadOnlyPermission(permissions.BasePermission):
@@ -24,7 +24,7 @@ class IsOwner(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        return obj.owner_id == request.user.id
 
 
 class IsRestaurantOwner(permissions.BasePermission):
@@ -33,9 +33,4 @@ class IsRestaurantOwner(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        restaurant_id = view.kwargs["restaurant_id"]
-        try:
-            restaurant = Restaurants.objects.get(pk=restaurant_id)
-        except Restaurants.DoesNotExist:
-            return False
-        return restaurant.is_active and restaurant.owner == request.user
+        return is_restaurant_owner(request.user, view.kwargs["restaurant_id"])
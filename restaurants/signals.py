@@ -0,0 +1,27 @@
+"""
+Signals module
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from restaurants.models import Restaurants
+from restaurants.ownership import invalidate_owner
+from users.models import Users
+
+
+def _invalidate(user_id: int) -> None:
+    invalidate_owner(user_id)
+    # Invalidate again once committed, so a concurrent read of the old rows is not cached for the full TTL
+    transaction.on_commit(lambda: invalidate_owner(user_id))
+
+
+@receiver(post_save, sender=Restaurants)
+def invalidate_restaurant_owner(sender, instance, *args, **kwargs):
+    _invalidate(instance.owner_id)
+
+
+@receiver(post_save, sender=Users)
+def invalidate_user_restaurants(sender, instance, *args, **kwargs):
+    _invalidate(instance.id)
@@ -6,15 +6,15 @@ from decimal import Decimal
 from unittest.mock import ANY
 
 from ddf import G, N
-from django.test import TestCase
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from orderNow.testing import QueryBudgetTestCase
 from restaurants.models import Menus, Restaurants
 from users.models import Users
 
 
-class MenuAddItemTests(TestCase):
+class MenuAddItemTests(QueryBudgetTestCase):
     """
     Class to test menu add item view
     """
@@ -40,7 +40,7 @@ class MenuAddItemTests(TestCase):
             HTTP_AUTHORIZATION=f"Bearer {self.token}",
         )
 
-        expected_data = {**data, "price": Decimal(data["price"]), "id": ANY}
+        expected_data = {**data, "price": Decimal(data["price"]), "id": ANY, "flash_sale": False}
 
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json(), {"data": expected_data, "status": "success", "message": None})
@@ -97,7 +97,7 @@ class MenuAddItemTests(TestCase):
         )
 
 
-class MenuDeleteItemTests(TestCase):
+class MenuDeleteItemTests(QueryBudgetTestCase):
     """
     Class to test menu delete item view
     """
@@ -127,7 +127,7 @@ class MenuDeleteItemTests(TestCase):
         )
 
 
-class GetMenuItemsListTests(TestCase):
+class GetMenuItemsListTests(QueryBudgetTestCase):
     """
     Class to test get menu items list view
     """
@@ -151,13 +151,41 @@ class GetMenuItemsListTests(TestCase):
         )
 
         expected_data = [
-            {"id": self.item1.id, "name": self.item1.name, "price": self.item1.price, "quantity": self.item1.quantity},
-            {"id": self.item2.id, "name": self.item2.name, "price": self.item2.price, "quantity": self.item2.quantity},
+            {
+                "id": self.item1.id,
+                "name": self.item1.name,
+                "price": self.item1.price,
+                "quantity": self.item1.quantity,
+                "flash_sale": self.item1.flash_sale,
+            },
+            {
+                "id": self.item2.id,
+                "name": self.item2.name,
+                "price": self.item2.price,
+                "quantity": self.item2.quantity,
+                "flash_sale": self.item2.flash_sale,
+            },
         ]
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"data": expected_data, "status": "success", "message": None})
 
+    def test_get_menu_list_query_budget(self):
+        """
+        Testcase for testing get menu list within query budget.
+        """
+
+        G(Menus, restaurant=self.restaurant, n=5)
+
+        with self.assertQueryBudget(2):
+            response = self.client.get(
+                reverse("restaurants:menus-list", kwargs={"restaurant_id": self.restaurant.id}),
+                HTTP_AUTHORIZATION=f"Bearer {self.token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 7)
+
     def test_get_menu_list_for_invalid_restaurant_id(self):
         """
         Testcase for testing get menu list invalid id.
@@ -189,15 +217,27 @@ class GetMenuItemsListTests(TestCase):
         )
 
         expected_data = [
-            {"id": self.item1.id, "name": self.item1.name, "price": self.item1.price, "quantity": self.item1.quantity},
-            {"id": self.item2.id, "name": self.item2.name, "price": self.item2.price, "quantity": self.item2.quantity},
+            {
+                "id": self.item1.id,
+                "name": self.item1.name,
+                "price": self.item1.price,
+                "quantity": self.item1.quantity,
+                "flash_sale": self.item1.flash_sale,
+            },
+            {
+                "id": self.item2.id,
+                "name": self.item2.name,
+                "price": self.item2.price,
+                "quantity": self.item2.quantity,
+                "flash_sale": self.item2.flash_sale,
+            },
         ]
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"data": expected_data, "status": "success", "message": None})
 
 
-class UpdateMenuItemTests(TestCase):
+class UpdateMenuItemTests(QueryBudgetTestCase):
     """
     Class to test update menu item view
     """
@@ -221,7 +261,13 @@ class UpdateMenuItemTests(TestCase):
             HTTP_AUTHORIZATION=f"Bearer {self.token}",
         )
 
-        expected_data = {"id": self.item.id, "name": self.item.name, "price": 890.8, "quantity": 567}
+        expected_data = {
+            "id": self.item.id,
+            "name": self.item.name,
+            "price": 890.8,
+            "quantity": 567,
+            "flash_sale": False,
+        }
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"data": expected_data, "status": "success", "message": None})
@@ -247,3 +293,30 @@ class UpdateMenuItemTests(TestCase):
             response.json(),
             {"data": None, "status": "error", "message": "You do not have permission to perform this action."},
         )
+
+    def test_update_menu_item_failure_after_restaurant_deleted(self):
+        """
+        Testcase for testing update menu failure once restaurant is deleted after a successful update.
+        """
+
+        url = reverse("restaurants:menus-detail", kwargs={"restaurant_id": self.restaurant.id, "pk": self.item.id})
+        response = self.client.patch(
+            url, data={"quantity": 5}, content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.delete(
+            reverse("restaurants:restaurants-detail", kwargs={"pk": self.restaurant.id}),
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(response.status_code, 204)
+
+        response = self.client.patch(
+            url, data={"quantity": 6}, content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            response.json(),
+            {"data": None, "status": "error", "message": "You do not have permission to perform this action."},
+        )
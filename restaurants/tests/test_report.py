@@ -7,16 +7,16 @@ from decimal import Decimal
 from random import randint
 
 from ddf import G
-from django.test import TestCase
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from orderNow.testing import QueryBudgetTestCase
 from orders.models import Orders
 from restaurants.models import Menus, Restaurants
 from users.models import Users
 
 
-class ReportsViewTests(TestCase):
+class ReportsViewTests(QueryBudgetTestCase):
     """
     Class to test restaurant reports viewset
     """
@@ -5,14 +5,14 @@ Restaurants test module
 from unittest.mock import ANY
 
 from ddf import G, N
-from django.test import TestCase
 from django.urls import reverse
 
+from orderNow.testing import QueryBudgetTestCase
 from restaurants.models import Restaurants
 from users.models import Users
 
 
-class RestaurantCreationTests(TestCase):
+class RestaurantCreationTests(QueryBudgetTestCase):
     """
     Class to test restaurant creation view
     """
@@ -73,7 +73,7 @@ class RestaurantCreationTests(TestCase):
         )
 
 
-class RestaurantRetrieveListTests(TestCase):
+class RestaurantRetrieveListTests(QueryBudgetTestCase):
     """
     Class to test restaurant retrieve list view
     """
@@ -107,6 +107,21 @@ class RestaurantRetrieveListTests(TestCase):
             },
         )
 
+    def test_restaurant_retrieve_list_query_budget(self):
+        """
+        Testcase for testing restaurant retrieve list within query budget.
+        """
+
+        G(Restaurants, owner=self.user, n=5)
+
+        with self.assertQueryBudget(2):
+            response = self.client.get(
+                reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 5)
+
     def test_restaurant_retrieve_list_auth_error(self):
         """
         Testcase for testing restaurant retrieve list without auth token case.
@@ -121,7 +136,7 @@ class RestaurantRetrieveListTests(TestCase):
         )
 
 
-class RestaurantRetrieveTests(TestCase):
+class RestaurantRetrieveTests(QueryBudgetTestCase):
     """
     Class to test restaurant retrieve view
     """
@@ -191,7 +206,7 @@ class RestaurantRetrieveTests(TestCase):
         )
 
 
-class RestaurantDeleteTests(TestCase):
+class RestaurantDeleteTests(QueryBudgetTestCase):
     """
     Class to test restaurant delete view
     """
@@ -257,7 +272,7 @@ class RestaurantDeleteTests(TestCase):
         )
 
 
-class RestaurantUpdateTests(TestCase):
+class RestaurantUpdateTests(QueryBudgetTestCase):
     """
     Class to test restaurant update view
     """
@@ -2,13 +2,20 @@
 Restaurants view module
 """
 
-from django.db import connection, models
+from collections import Counter
+from itertools import chain
+
+from django.db import connections, models, transaction
 from django.db.models.functions import RowNumber
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from orders.models import Orders
+from orderNow.db_routers import ReplicaReadMixin
+from orders.archive import archived_customer_spends
+from orders.models import CustomerItemRollups, OrderItems, Orders
+from orders.shards import on_shard, shard_for_restaurant
+from restaurants.flash_sale import stock_tokens
 from restaurants.models import Menus, Restaurants
 from restaurants.permissions import IsOwner, IsRestaurantOwner, ReadOnlyPermission
 from restaurants.serializers import (
@@ -17,24 +24,29 @@ from restaurants.serializers import (
     MenuUpdateSerializer,
     RestaurantSerializer,
 )
+from users.authentication import StatelessReadJWTAuthentication
 from users.models import Users
 
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+class RestaurantViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Restaurant viewset class
     """
 
+    replica_actions = ("list", "retrieve")
+    authentication_classes = [StatelessReadJWTAuthentication]
     queryset = Restaurants.objects.filter(is_active=True)
     serializer_class = RestaurantSerializer
     permission_classes = [permissions.IsAuthenticated, ReadOnlyPermission | IsOwner]
 
 
-class MenuViewSet(viewsets.ModelViewSet):
+class MenuViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Menu viewset class
     """
 
+    replica_actions = ("list", "retrieve")
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, ReadOnlyPermission | IsRestaurantOwner]
 
     def get_serializer_class(self):
@@ -50,17 +62,30 @@ class MenuViewSet(viewsets.ModelViewSet):
         restaurant_id = self.kwargs["restaurant_id"]
         return Menus.objects.filter(restaurant__pk=restaurant_id, restaurant__is_active=True)
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.restock_flash_sale(serializer.instance)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.restock_flash_sale(serializer.instance)
+
+    def restock_flash_sale(self, menu: Menus) -> None:
+        # Owners restock flash sale items by saving them, the tokens follow the committed quantity
+        transaction.on_commit(lambda: stock_tokens(menu))
+
     def destroy(self, request, *args, **kwargs):
         return Response(
             {"detail": "DELETE method is not allowed for this resource."}, status=status.HTTP_405_METHOD_NOT_ALLOWED
         )
 
 
-class ReportsViewset(viewsets.ViewSet):
+class ReportsViewset(ReplicaReadMixin, viewsets.ViewSet):
     """
     Restaurant reports view
     """
 
+    replica_actions = ("customer_spends_report", "item_popularity_report", "customer_favorites_report")
     permission_classes = [permissions.IsAuthenticated, IsRestaurantOwner]
 
     @action(detail=False, methods=["get"], url_path="customer-spends")
@@ -72,31 +97,64 @@ class ReportsViewset(viewsets.ViewSet):
         from_date = serializer.validated_data.get("from_date")
         to_date = serializer.validated_data.get("to_date")
 
-        orders_query = Orders.objects.filter(restaurant_id=restaurant_id)
+        orders_query = on_shard(Orders.objects.filter(restaurant_id=restaurant_id), shard_for_restaurant(restaurant_id))
         if from_date and to_date:
             orders_query = orders_query.filter(order_datetime__range=[from_date, to_date])
 
-        customer_spends = orders_query.values(user_email=models.F("customer__email")).annotate(
+        customer_spends = {}
+        live_spends = orders_query.values("customer", user_email=models.F("customer__email")).annotate(
             total_amount_spent=models.Sum("total_amount")
         )
+        for spend in chain(live_spends, archived_customer_spends(restaurant_id, from_date, to_date)):
+            customer = spend.pop("customer")
+            if customer in customer_spends:
+                customer_spends[customer]["total_amount_spent"] += spend["total_amount_spent"]
+            else:
+                customer_spends[customer] = spend
 
-        return Response(customer_spends)
+        # Rows are merged here rather than grouped by the database, so they are ordered by customer explicitly
+        return Response([customer_spends[customer] for customer in sorted(customer_spends)])
 
     @action(detail=False, methods=["get"], url_path="item-popularity")
     def item_popularity_report(self, request, restaurant_id):
-        orders_query = Orders.objects.filter(restaurant_id=restaurant_id)
-
-        item_popularity = (
-            orders_query.values(item=models.F("items__item__id"))
-            .annotate(orders=models.Count("customer", distinct=True))
-            .order_by("orders")
+        shard = shard_for_restaurant(restaurant_id)
+        orders_query = on_shard(Orders.objects.filter(restaurant_id=restaurant_id), shard)
+        archived = list(
+            on_shard(CustomerItemRollups.objects.filter(restaurant_id=restaurant_id), shard).values_list(
+                "item", "customer"
+            )
         )
+        if not archived:
+            # Evaluated here, responses are rendered once the action no longer reads from a replica
+            item_popularity = list(
+                orders_query.values(item=models.F("items__item__id"))
+                .annotate(orders=models.Count("customer", distinct=True))
+                .order_by("orders")
+            )
+            return Response(item_popularity)
+
+        # Customers of an item are counted once whether they ordered it before or after archival
+        customers = set(orders_query.values_list("items__item__id", "customer").distinct())
+        customers.update(archived)
+        counts = Counter(item for item, _ in customers)
+        item_popularity = [
+            {"item": item, "orders": orders}
+            for item, orders in sorted(counts.items(), key=lambda count: (count[1], count[0] is None, count[0] or 0))
+        ]
 
         return Response(item_popularity)
 
     @action(detail=False, methods=["get"], url_path="customer-favorites")
     def customer_favorites_report(self, request, restaurant_id):
-        orders_query = Users.objects.filter(orders__restaurant_id=restaurant_id)
+        shard = shard_for_restaurant(restaurant_id)
+        archived = on_shard(CustomerItemRollups.objects.filter(restaurant_id=restaurant_id), shard).values_list(
+            "customer", "item", "order_items"
+        )
+        if archived:
+            return Response(self.merged_customer_favorites(restaurant_id, archived))
+
+        # Users are joined with the orders on the shard, which keeps a copy of them
+        orders_query = on_shard(Users.objects.filter(orders__restaurant_id=restaurant_id), shard)
         customer_orders = (
             orders_query.annotate(item_count=models.Count("orders__items__item"))
             .annotate(row=models.Window(RowNumber(), partition_by="email", order_by=models.F("item_count").desc()))
@@ -104,7 +162,7 @@ class ReportsViewset(viewsets.ViewSet):
         )
 
         raw_sql = f"SELECT * from ({customer_orders.query}) AS subquery WHERE `row` = 1;"
-        with connection.cursor() as cursor:
+        with connections[customer_orders.db].cursor() as cursor:
             cursor.execute(raw_sql)
             rows = cursor.fetchall()
 
@@ -113,3 +171,36 @@ class ReportsViewset(viewsets.ViewSet):
             result.append({"email": row[0], "item_id": row[1], "item_count": row[2]})
 
         return Response(result)
+
+    def merged_customer_favorites(self, restaurant_id, archived) -> list:
+        """
+        Function to find the item each customer ordered the most, over live orders and archive rollups
+
+        Args:
+            restaurant_id: Id of the restaurant
+            archived: Number of order items by customer and item of archived orders
+
+        Returns:
+            list: Favorite item of each customer, with `email`, `item_id` and `item_count`
+        """
+
+        counts = Counter()
+        live = (
+            on_shard(OrderItems.objects.filter(order__restaurant_id=restaurant_id), shard_for_restaurant(restaurant_id))
+            .values_list("order__customer", "item")
+            .annotate(order_items=models.Count("id"))
+        )
+        for customer, item, order_items in chain(live, archived):
+            counts[(customer, item)] += order_items
+
+        favorites = {}
+        for (customer, item), item_count in counts.items():
+            if customer not in favorites or item_count > favorites[customer][1]:
+                favorites[customer] = (item, item_count)
+
+        emails = dict(Users.objects.filter(pk__in=favorites).values_list("pk", "email"))
+        result = [
+            {"email": emails[customer], "item_id": item, "item_count": item_count}
+            for customer, (item, item_count) in favorites.items()
+        ]
+        return sorted(result, key=lambda favorite: favorite["email"])
@@ -0,0 +1,150 @@
+"""
+Custom authentication for Users
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from orderNow.async_views import run_sync
+from users.revocation import revocation_registry
+
+USER_CACHE_KEY = "users:auth:{user_id}"
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """
+    Function to drop cached user used for authentication
+
+    Args:
+        user_id (int): Id of the user
+    """
+
+    cache.delete(USER_CACHE_KEY.format(user_id=user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which resolves the user from a short lived cache instead of querying it on every request.
+    """
+
+    def get_validated_token(self, raw_token):
+        """
+        Function to validate the token and reject it if it is revoked
+        """
+
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_registry.is_revoked(validated_token):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+    async def get_request_token_async(self, request):
+        """
+        Function to validate the token of a request without blocking the event loop
+
+        Returns:
+            Validated access token, `None` if request has no token
+        """
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = super().get_validated_token(raw_token)
+        if await revocation_registry.is_revoked_async(validated_token):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+    async def authenticate_async(self, request):
+        """
+        Function to authenticate a request from an async view
+
+        The token is validated on the event loop and the user is fetched in a thread.
+        """
+
+        validated_token = await self.get_request_token_async(request)
+        if validated_token is None:
+            return None
+        return await run_sync(self.get_user, validated_token), validated_token
+
+    def get_user(self, validated_token):
+        """
+        Function to fetch user for the given validated token
+
+        Args:
+            validated_token: Validated access token
+
+        Returns:
+            Users: Authenticated user
+        """
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = USER_CACHE_KEY.format(user_id=user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class StatelessReadJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication which builds a lightweight user from token claims for read only requests.
+
+    It must only be used on views which need nothing but the user id for safe methods,
+    other methods fall back to the cached user lookup. Tokens of deactivated or deleted users are
+    rejected through their revocation, made by `Users.save` when a user gets deactivated.
+    """
+
+    def authenticate(self, request):
+        if request.method not in permissions.SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_token_user(validated_token), validated_token
+
+    async def authenticate_async(self, request):
+        if request.method not in permissions.SAFE_METHODS:
+            return await super().authenticate_async(request)
+
+        validated_token = await self.get_request_token_async(request)
+        if validated_token is None:
+            return None
+        return self.get_token_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
@@ -0,0 +1,212 @@
+"""
+Command to import users in bulk
+"""
+
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from users.models import Users
+
+FIELDS = [
+    "email",
+    "username",
+    "password",
+    "first_name",
+    "last_name",
+    "street_address",
+    "city",
+    "state",
+    "zipcode",
+    "phone_number",
+    "balance",
+]
+
+
+def _init_worker():
+    django.setup()
+
+
+def read_rows(path: Path, file_format: str):
+    """
+    Function to read user rows from a csv or jsonl file
+
+    Args:
+        path (Path): Path of the file
+        file_format (str): Either `csv` or `jsonl`
+
+    Yields:
+        tuple: Number of the row, its line in jsonl files, and row data or the `JSONDecodeError` of the line
+    """
+
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            yield from enumerate(csv.DictReader(file), start=1)
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as error:
+                        row = error
+                    yield line_number, row
+
+
+class Command(BaseCommand):
+    help = "Import users from a csv or jsonl file in chunks, reporting rows which conflict with existing users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--hashed-passwords",
+            action="store_true",
+            help="Passwords are already hashed by a hasher configured in PASSWORD_HASHERS.",
+        )
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            default=None,
+            help="Processes used for hashing plain passwords, 0 hashes in this process. Defaults to cpu count.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ["csv", "jsonl"]:
+            raise CommandError("Unknown file format, please provide --format.")
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        self.hashed_passwords = options["hashed_passwords"]
+        self.seen_emails = set()
+        self.seen_phone_numbers = set()
+        self.imported = 0
+        self.rejected = 0
+
+        pool = None
+        if not self.hashed_passwords and options["hash_workers"] != 0:
+            pool = ProcessPoolExecutor(max_workers=options["hash_workers"], initializer=_init_worker)
+
+        try:
+            rows = read_rows(path, file_format)
+            while chunk := list(islice(rows, options["chunk_size"])):
+                self.import_chunk(chunk, pool)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {self.imported} users, rejected {self.rejected} rows."))
+
+    def reject(self, row_number: int, reason: str) -> None:
+        self.rejected += 1
+        self.stderr.write(f"Row {row_number}: {reason}")
+
+    def build_user(self, row_number: int, row: dict):
+        """
+        Function to build an unsaved user from a row, rejecting invalid and duplicate rows
+
+        Returns:
+            Users: Unsaved user, `None` if row is rejected
+        """
+
+        if isinstance(row, json.JSONDecodeError):
+            self.reject(row_number, f"Invalid JSON: {row.msg}.")
+            return None
+        if not isinstance(row, dict):
+            self.reject(row_number, "Row is not a JSON object.")
+            return None
+
+        data = {field: row[field] for field in FIELDS if row.get(field) not in (None, "")}
+        missing_fields = [field for field in ["email", "username", "password"] if field not in data]
+        if missing_fields:
+            self.reject(row_number, f"Missing fields: {', '.join(missing_fields)}.")
+            return None
+
+        user = Users(**data)
+        user.email = Users.objects.normalize_email(user.email)
+        user.full_name = user.get_full_name()
+        # Phone number is nullable although it is not allowed to be blank
+        exclude = ["password"] if user.phone_number else ["password", "phone_number"]
+        try:
+            user.clean_fields(exclude=exclude)
+        except ValidationError as error:
+            self.reject(row_number, json.dumps(error.message_dict))
+            return None
+
+        if self.hashed_passwords:
+            try:
+                identify_hasher(user.password)
+            except ValueError:
+                self.reject(row_number, "Password is not hashed by a known hasher.")
+                return None
+
+        if user.email in self.seen_emails:
+            self.reject(row_number, f"Duplicate email in file: {user.email}")
+            return None
+        if user.phone_number and user.phone_number in self.seen_phone_numbers:
+            self.reject(row_number, f"Duplicate phone number in file: {user.phone_number}")
+            return None
+
+        self.seen_emails.add(user.email)
+        if user.phone_number:
+            self.seen_phone_numbers.add(user.phone_number)
+        return user
+
+    def import_chunk(self, chunk: list, pool) -> None:
+        """
+        Function to validate, hash and insert a chunk of rows
+        """
+
+        users = []
+        for row_number, row in chunk:
+            user = self.build_user(row_number, row)
+            if user:
+                users.append((row_number, user))
+
+        emails = [user.email for _, user in users]
+        phone_numbers = [user.phone_number for _, user in users if user.phone_number]
+        existing = Users.objects.filter(Q(email__in=emails) | Q(phone_number__in=phone_numbers))
+        existing_emails, existing_phone_numbers = set(), set()
+        for email, phone_number in existing.values_list("email", "phone_number"):
+            existing_emails.add(email)
+            existing_phone_numbers.add(phone_number)
+
+        new_users = []
+        for row_number, user in users:
+            if user.email in existing_emails:
+                self.reject(row_number, Users._meta.get_field("email").error_messages["unique"])
+            elif user.phone_number and user.phone_number in existing_phone_numbers:
+                self.reject(row_number, Users._meta.get_field("phone_number").error_messages["unique"])
+            else:
+                new_users.append((row_number, user))
+
+        if not self.hashed_passwords:
+            passwords = [user.password for _, user in new_users]
+            hashes = pool.map(make_password, passwords, chunksize=32) if pool else map(make_password, passwords)
+            for (_, user), password in zip(new_users, hashes):
+                user.password = password
+
+        try:
+            with transaction.atomic():
+                Users.objects.bulk_create([user for _, user in new_users])
+            self.imported += len(new_users)
+        except IntegrityError:
+            # Rows were added concurrently, insert one by one to find the conflicting rows
+            for row_number, user in new_users:
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                    self.imported += 1
+                except IntegrityError as error:
+                    self.reject(row_number, f"Conflicts with an existing user: {error}")
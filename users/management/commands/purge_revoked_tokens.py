@@ -0,0 +1,19 @@
+"""
+Command to delete revocations of expired tokens
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.revocation import purge_expired_revocations
+
+
+class Command(BaseCommand):
+    help = "Delete token revocations past their expiry, the expiry of the tokens they revoke, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause after every batch.")
+
+    def handle(self, *args, **options):
+        purged = purge_expired_revocations(batch_size=options["batch_size"], sleep=options["sleep"])
+        self.stdout.write(f"Purged {purged} revoked tokens")
@@ -1,17 +1,25 @@
 # Generated by Django 3.2.23 on 2024-01-29 06:52
 
 from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+
+from orderNow.data_migrations import FileCheckpoint, batched_update
 
 
 def add_phone_numbers(apps, schema_editor):
     Users = apps.get_model("users", "Users")
 
-    for user in Users.objects.all():
-        user.full_name = f"{user.first_name} {user.last_name}".strip()
-        user.save()
+    batched_update(
+        Users.objects.using(schema_editor.connection.alias),
+        {"full_name": Trim(Concat("first_name", Value(" "), "last_name"))},
+        checkpoint=FileCheckpoint("users.0008_users_full_name", schema_editor.connection),
+    )
 
 
 class Migration(migrations.Migration):
+    atomic = False
+
     dependencies = [
         ("users", "0007_users_phone_number"),
     ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_users_full_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedTokens',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=255)),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
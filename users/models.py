@@ -5,6 +5,8 @@ Models for Users
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
 
 
 class Users(AbstractUser):
@@ -49,7 +51,65 @@ class Users(AbstractUser):
     )
     full_name = models.CharField(max_length=300, blank=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_active = user.__dict__.get("is_active", True)
+        return user
+
+    def save(self, *args, **kwargs):
+        """
+        Function to save the user, revoking every token issued to it when it gets deactivated
+
+        Read only requests are authenticated from the token without loading the user, so deactivations
+        must go through `save` and not `QuerySet.update` to take effect on them.
+        """
+
+        deactivated = not self._state.adding and not self.is_active and getattr(self, "_loaded_active", True)
+        super().save(*args, **kwargs)
+        if deactivated:
+            RevokedTokens.objects.revoke_user(self.id)
+        self._loaded_active = self.is_active
+
     def delete(self):
         self.is_active = False
         self.restaurants.filter(is_active=True).update(is_active=False)
         self.save()
+
+
+class RevokedTokensManager(models.Manager):
+    """
+    Manager class for revoked tokens
+    """
+
+    def revoke_user(self, user_id: int) -> "RevokedTokens":
+        """
+        Function to revoke every token issued to a user until now
+
+        Args:
+            user_id (int): Id of the user
+
+        Returns:
+            RevokedTokens: Created revocation
+        """
+
+        lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+        return self.create(key=RevokedTokens.user_key(user_id), expires_at=timezone.now() + lifetime)
+
+
+class RevokedTokens(models.Model):
+    """
+    Model class for revoked tokens
+
+    A key names a user, every token issued to the user before `revoked_at` is revoked.
+    """
+
+    key = models.CharField(max_length=255, db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField()
+
+    objects = RevokedTokensManager()
+
+    @staticmethod
+    def user_key(user_id) -> str:
+        return f"user:{user_id}"
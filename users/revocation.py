@@ -0,0 +1,213 @@
+"""
+Token revocation module
+
+Revoked tokens are stored in the `RevokedTokens` table and mirrored into a per process Bloom filter,
+so the common case of a token which is not revoked is answered without any database access. Only
+keys matched by the filter are confirmed against the table, which removes its false positives.
+Expired revocations are removed by `manage.py purge_revoked_tokens`.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from orderNow.async_views import run_sync
+from orderNow.data_migrations import run_in_batches
+from users.models import RevokedTokens
+
+
+class BloomFilter:
+    """
+    Fixed size Bloom filter over string keys, counting the distinct keys added
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> bool:
+        # Keys already matched are not counted, refreshes read overlapping rows again
+        added = False
+        for position in self._positions(key):
+            added |= not self.bits[position >> 3] & (1 << (position & 7))
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += added
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationRegistry:
+    """
+    Per process view of revoked tokens, refreshed incrementally from `RevokedTokens`
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filter = None
+        self.synced_until = None
+        self.next_refresh = 0.0
+        self.next_rebuild = 0.0
+
+    @property
+    def config(self) -> dict:
+        return settings.TOKEN_REVOCATION
+
+    def reset(self) -> None:
+        """
+        Function to start over from an empty filter, refreshed after the next `REFRESH_INTERVAL` only
+
+        Revocations made by this process are still added to the filter, used by tests to keep the
+        queries of their requests independent of refreshes due in previous tests.
+        """
+
+        with self.lock:
+            self.filter = BloomFilter(self.config["CAPACITY"], self.config["ERROR_RATE"])
+            self.synced_until = timezone.now()
+            self.next_refresh = time.monotonic() + self.config["REFRESH_INTERVAL"]
+            self.next_rebuild = time.monotonic() + self.config["REBUILD_INTERVAL"]
+
+    def rebuild(self) -> None:
+        """
+        Function to rebuild the filter from every revocation which has not expired yet
+        """
+
+        now = timezone.now()
+        keys = list(RevokedTokens.objects.filter(expires_at__gt=now).values_list("key", flat=True))
+        capacity = self.config["CAPACITY"]
+        while capacity < len(keys):
+            capacity *= 2
+
+        bloom_filter = BloomFilter(capacity, self.config["ERROR_RATE"])
+        for key in keys:
+            bloom_filter.add(key)
+
+        self.filter = bloom_filter
+        self.synced_until = now
+        self.next_rebuild = time.monotonic() + self.config["REBUILD_INTERVAL"]
+
+    def refresh(self) -> None:
+        """
+        Function to add revocations made by other processes since the last refresh
+        """
+
+        if time.monotonic() < self.next_refresh:
+            return
+
+        with self.lock:
+            if time.monotonic() < self.next_refresh:
+                return
+
+            if self.filter is None or time.monotonic() >= self.next_rebuild:
+                self.rebuild()
+            else:
+                now = timezone.now()
+                # Rows are read with an overlap, so revocations committed late are not skipped
+                since = self.synced_until - timedelta(seconds=self.config["SYNC_OVERLAP"])
+                for key in RevokedTokens.objects.filter(revoked_at__gte=since).values_list("key", flat=True):
+                    self.filter.add(key)
+                self.synced_until = now
+                if self.filter.count > self.filter.capacity:
+                    self.rebuild()
+
+            self.next_refresh = time.monotonic() + self.config["REFRESH_INTERVAL"]
+
+    def add(self, key: str) -> None:
+        """
+        Function to add a revocation made by this process without waiting for the next refresh
+
+        Args:
+            key (str): Key of the revocation
+        """
+
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(key)
+
+    def is_revoked(self, token) -> bool:
+        """
+        Function to check if a token is revoked
+
+        Args:
+            token: Validated simplejwt token
+
+        Returns:
+            bool: `True` if token is revoked, `False` otherwise.
+        """
+
+        self.refresh()
+        candidates = self.candidates(token)
+        return bool(candidates) and self.confirm(token, candidates)
+
+    async def is_revoked_async(self, token) -> bool:
+        """
+        Function to check if a token is revoked without blocking the event loop
+
+        The filter is checked on the event loop, only refreshes and confirmations run in a thread.
+
+        Args:
+            token: Validated simplejwt token
+
+        Returns:
+            bool: `True` if token is revoked, `False` otherwise.
+        """
+
+        if time.monotonic() >= self.next_refresh:
+            await run_sync(self.refresh)
+        candidates = self.candidates(token)
+        return bool(candidates) and await run_sync(self.confirm, token, candidates)
+
+    def candidates(self, token) -> list:
+        """
+        Function to find the revocation keys of a token matched by the filter
+        """
+
+        user_key = RevokedTokens.user_key(token.get(api_settings.USER_ID_CLAIM))
+        return [user_key] if user_key in self.filter else []
+
+    def confirm(self, token, candidates: list) -> bool:
+        """
+        Function to confirm revocation keys matched by the filter against the table
+        """
+
+        revocations = RevokedTokens.objects.filter(key__in=candidates, expires_at__gt=timezone.now())
+        issued_at = datetime_from_epoch(token["iat"]) if "iat" in token else None
+        for revoked_at in revocations.values_list("revoked_at", flat=True):
+            # `iat` has whole seconds, tokens issued in the second of the revocation are revoked too
+            if issued_at is None or issued_at <= revoked_at.replace(microsecond=0):
+                return True
+        return False
+
+
+revocation_registry = RevocationRegistry()
+
+
+def purge_expired_revocations(**kwargs) -> int:
+    """
+    Function to delete revocations of tokens which expired in batches
+
+    Args:
+        **kwargs: Options of `run_in_batches`
+
+    Returns:
+        int: Number of deleted revocations
+    """
+
+    expired = RevokedTokens.objects.filter(expires_at__lte=timezone.now())
+    return run_in_batches(expired, lambda batch: batch.filter(expires_at__lte=timezone.now()).delete(), **kwargs)
@@ -4,9 +4,13 @@ Serializers module
 
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from restaurants.serializers import RestaurantSerializer
 from users.models import Users
+from users.revocation import revocation_registry
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -73,3 +77,14 @@ class UserDetailsSerializer(UserSerializer):
             "restaurants",
         ]
         read_only_fields = ["id"]
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer class for token refresh which rejects revoked refresh tokens
+    """
+
+    def validate(self, attrs: dict) -> dict:
+        if revocation_registry.is_revoked(RefreshToken(attrs["refresh"])):
+            raise InvalidToken("Token is revoked")
+        return super().validate(attrs)
@@ -2,12 +2,30 @@
 Signals module
 """
 
-from django.db.models.signals import pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from users.models import Users
+from users.authentication import invalidate_cached_user
+from users.models import RevokedTokens, Users
+from users.revocation import revocation_registry
 
 
 @receiver(pre_save, sender=Users)
 def add_full_name(sender, instance, *args, **kwargs):
     instance.full_name = instance.get_full_name()
+
+
+@receiver(post_save, sender=Users)
+@receiver(post_delete, sender=Users)
+def invalidate_authenticated_user(sender, instance, *args, **kwargs):
+    invalidate_cached_user(instance.id)
+    # Invalidate again once committed, so a concurrent read of the old row is not cached for the full TTL
+    transaction.on_commit(lambda: invalidate_cached_user(instance.id))
+
+
+@receiver(post_save, sender=RevokedTokens)
+def add_revoked_token(sender, instance, created, *args, **kwargs):
+    # Added before commit as well, a rolled back revocation is only a false positive of the filter
+    if created:
+        revocation_registry.add(instance.key)
@@ -0,0 +1,104 @@
+"""
+Data migration helpers test module
+"""
+
+import tempfile
+from pathlib import Path
+
+from ddf import G
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+
+from orderNow.data_migrations import FileCheckpoint, batched_bulk_update, batched_update
+from orderNow.testing import QueryBudgetTestCase
+from users.models import Users
+
+
+class BatchedUpdateTests(QueryBudgetTestCase):
+    """
+    Class to test batched data migration helpers
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = FileCheckpoint("users", connection, directory=directory.name)
+        self.users = [G(Users, city="old") for _ in range(5)]
+
+    def test_batched_update_success(self):
+        """
+        Testcase for testing set based update over every row in batches.
+        """
+
+        # Per batch: primary keys, savepoint, update and release, then a final empty primary keys query
+        with self.assertNumQueries(13):
+            processed = batched_update(
+                Users.objects.all(),
+                {"city": Concat(F("city"), Value("-new"))},
+                batch_size=2,
+                checkpoint=self.checkpoint,
+            )
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(set(Users.objects.values_list("city", flat=True)), {"old-new"})
+        self.assertIsNone(self.checkpoint.load())
+
+    def test_batched_update_resumes_from_checkpoint(self):
+        """
+        Testcase for testing update resumes after the checkpointed primary key.
+        """
+
+        self.checkpoint.save(self.users[2].pk)
+
+        processed = batched_update(Users.objects.all(), {"city": "new"}, batch_size=2, checkpoint=self.checkpoint)
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(
+            list(Users.objects.order_by("pk").values_list("city", flat=True)), ["old", "old", "old", "new", "new"]
+        )
+
+    def test_batched_bulk_update_success(self):
+        """
+        Testcase for testing update computed in python over filtered rows.
+        """
+
+        def transform(user):
+            user.city = user.city.upper()
+
+        processed = batched_bulk_update(
+            Users.objects.filter(pk__in=[user.pk for user in self.users[:3]]), transform, ["city"], batch_size=2
+        )
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(
+            list(Users.objects.order_by("pk").values_list("city", flat=True)), ["OLD", "OLD", "OLD", "old", "old"]
+        )
+
+
+class FileCheckpointTests(QueryBudgetTestCase):
+    """
+    Class to test data migration checkpoints
+    """
+
+    def test_checkpoint_keyed_by_database(self):
+        """
+        Testcase for testing checkpoints of the same migration on other databases are kept apart.
+        """
+
+        other_connection = connection.copy(alias="shard1")
+        other_connection.settings_dict = {**connection.settings_dict, "NAME": "/var/lib/shard1.sqlite3"}
+
+        checkpoint = FileCheckpoint("users.0008", connection, directory="checkpoints")
+        other_checkpoint = FileCheckpoint("users.0008", other_connection, directory="checkpoints")
+
+        self.assertNotEqual(checkpoint.path, other_checkpoint.path)
+        self.assertEqual(other_checkpoint.path.name, "users.0008.shard1.var_lib_shard1.sqlite3.json")
+
+    def test_checkpoints_of_tests_kept_out_of_project(self):
+        """
+        Testcase for testing migrations of the test databases do not checkpoint into the project directory.
+        """
+
+        self.assertFalse(Path(settings.DATA_MIGRATION_CHECKPOINT_DIR).resolve().is_relative_to(settings.BASE_DIR))
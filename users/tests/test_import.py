@@ -0,0 +1,108 @@
+"""
+Import users command test module
+"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from ddf import G
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+
+from orderNow.testing import QueryBudgetTestCase
+from users.models import Users
+
+
+class ImportUsersCommandTests(QueryBudgetTestCase):
+    """
+    Class to test import users command
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def import_users(self, name: str, content: str, *args):
+        path = Path(self.directory.name) / name
+        path.write_text(content)
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_users", str(path), "--hash-workers", "0", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_users_from_csv_success(self):
+        """
+        Testcase for testing users import from csv with plain passwords.
+        """
+
+        content = (
+            "email,username,password,first_name,last_name,phone_number,balance\n"
+            "user1@test.com,user1,password@1,Test,One,9000000001,250.50\n"
+            "user2@test.com,user2,password@2,Test,Two,,\n"
+        )
+
+        stdout, stderr = self.import_users("users.csv", content, "--chunk-size", "1")
+
+        self.assertIn("Imported 2 users, rejected 0 rows.", stdout)
+        self.assertEqual(stderr, "")
+        user = Users.objects.get(email="user1@test.com")
+        self.assertTrue(user.check_password("password@1"))
+        self.assertEqual(user.full_name, "Test One")
+        self.assertEqual(str(user.balance), "250.50")
+        self.assertEqual(Users.objects.get(email="user2@test.com").phone_number, None)
+
+    def test_import_users_reports_conflicts(self):
+        """
+        Testcase for testing users import reports conflicting rows without aborting the chunk.
+        """
+
+        G(Users, email="existing@test.com", phone_number="9000000009")
+        rows = [
+            {"email": "existing@test.com", "username": "a", "password": make_password("password@1")},
+            {"email": "new1@test.com", "username": "b", "password": make_password("password@1")},
+            {"email": "new2@test.com", "username": "c", "password": make_password("p"), "phone_number": "9000000009"},
+            {"email": "new1@test.com", "username": "d", "password": make_password("password@1")},
+            {"email": "new3@test.com", "username": "e", "password": "plain"},
+        ]
+        content = "\n".join(json.dumps(row) for row in rows)
+
+        stdout, stderr = self.import_users("users.jsonl", content, "--hashed-passwords")
+
+        self.assertIn("Imported 1 users, rejected 4 rows.", stdout)
+        self.assertEqual(
+            stderr.splitlines(),
+            [
+                "Row 4: Duplicate email in file: new1@test.com",
+                "Row 5: Password is not hashed by a known hasher.",
+                "Row 1: A user with that email already exists.",
+                "Row 3: This phone number is already in use.",
+            ],
+        )
+        self.assertTrue(Users.objects.get(email="new1@test.com").check_password("password@1"))
+
+    def test_import_users_rejects_invalid_lines(self):
+        """
+        Testcase for testing users import rejects invalid jsonl lines with their line number and goes on.
+        """
+
+        rows = [
+            json.dumps({"email": "user1@test.com", "username": "a", "password": make_password("password@1")}),
+            "",
+            '{"email": "user2@test.com", "username": ',
+            json.dumps(["user3@test.com", "c", "password@1"]),
+            json.dumps({"email": "user4@test.com", "username": "d", "password": make_password("password@1")}),
+        ]
+        content = "\n".join(rows)
+
+        stdout, stderr = self.import_users("users.jsonl", content, "--hashed-passwords")
+
+        self.assertIn("Imported 2 users, rejected 2 rows.", stdout)
+        self.assertEqual(
+            stderr.splitlines(),
+            [
+                "Row 3: Invalid JSON: Expecting value.",
+                "Row 4: Row is not a JSON object.",
+            ],
+        )
+        self.assertEqual(set(Users.objects.values_list("email", flat=True)), {"user1@test.com", "user4@test.com"})
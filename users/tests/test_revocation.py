@@ -0,0 +1,87 @@
+"""
+Token revocation test module
+"""
+
+import io
+from datetime import timedelta
+
+from ddf import G
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import datetime_to_epoch
+
+from users.models import RevokedTokens, Users
+from users.revocation import BloomFilter, revocation_registry
+
+
+class RevocationTests(TestCase):
+    """
+    Class to test the revocation filter and the purge of expired revocations
+    """
+
+    def test_filter_counts_distinct_keys(self):
+        """
+        Testcase for testing keys added again do not count towards the capacity of the filter.
+        """
+
+        bloom_filter = BloomFilter(10, 0.001)
+        self.assertTrue(bloom_filter.add("user:1"))
+        self.assertFalse(bloom_filter.add("user:1"))
+        self.assertTrue(bloom_filter.add("user:2"))
+        self.assertEqual(bloom_filter.count, 2)
+
+    def test_refresh_reading_overlap_does_not_rebuild(self):
+        """
+        Testcase for testing revocations read again by overlapping refreshes do not rebuild the filter.
+        """
+
+        self.addCleanup(revocation_registry.reset)
+        with self.settings(TOKEN_REVOCATION={**revocation_registry.config, "CAPACITY": 2}):
+            revocation_registry.rebuild()
+            for i in range(2):
+                RevokedTokens.objects.revoke_user(i)
+            bloom_filter = revocation_registry.filter
+
+            for _ in range(3):
+                revocation_registry.next_refresh = 0.0
+                revocation_registry.refresh()
+
+            self.assertIs(revocation_registry.filter, bloom_filter)
+            self.assertEqual(bloom_filter.count, 2)
+
+    def test_revocation_compared_in_whole_seconds(self):
+        """
+        Testcase for testing tokens issued up to the second of a user revocation are revoked, later ones are not.
+        """
+
+        user = G(Users)
+        revocation = RevokedTokens.objects.revoke_user(user.id)
+        RevokedTokens.objects.filter(pk=revocation.pk).update(
+            revoked_at=revocation.revoked_at.replace(microsecond=500000)
+        )
+        revoked_at = revocation.revoked_at.replace(microsecond=0)
+
+        def token(issued_at):
+            access_token = AccessToken.for_user(user)
+            access_token["iat"] = datetime_to_epoch(issued_at)
+            return access_token
+
+        candidates = [RevokedTokens.user_key(user.id)]
+        self.assertTrue(revocation_registry.confirm(token(revoked_at - timedelta(seconds=1)), candidates))
+        self.assertTrue(revocation_registry.confirm(token(revoked_at), candidates))
+        self.assertFalse(revocation_registry.confirm(token(revoked_at + timedelta(seconds=1)), candidates))
+
+    def test_expired_revocations_purged(self):
+        """
+        Testcase for testing the purge command deletes revocations past their expiry only.
+        """
+
+        RevokedTokens.objects.create(key="user:1", expires_at=timezone.now() - timedelta(seconds=1))
+        RevokedTokens.objects.create(key="user:2", expires_at=timezone.now() + timedelta(hours=1))
+        output = io.StringIO()
+        call_command("purge_revoked_tokens", stdout=output)
+
+        self.assertEqual(output.getvalue(), "Purged 1 revoked tokens\n")
+        self.assertEqual(list(RevokedTokens.objects.values_list("key", flat=True)), ["user:2"])
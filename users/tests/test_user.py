@@ -2,19 +2,23 @@
 Users test module
 """
 
+import time
 from decimal import Decimal
 from unittest.mock import ANY
 
 from ddf import G, N
-from django.test import TestCase
+from django.core.cache import cache
 from django.urls import reverse
 
+from orderNow.testing import QueryBudgetTestCase
 from restaurants.models import Restaurants
-from users.models import Users
+from users.authentication import USER_CACHE_KEY
+from users.models import RevokedTokens, Users
+from users.revocation import revocation_registry
 from users.tests.test_data import get_random_user
 
 
-class UsersRegistrationTests(TestCase):
+class UsersRegistrationTests(QueryBudgetTestCase):
     """
     Class to test user registration view
     """
@@ -100,7 +104,7 @@ class UsersRegistrationTests(TestCase):
         )
 
 
-class UsersLoginTests(TestCase):
+class UsersLoginTests(QueryBudgetTestCase):
     """
     Class to test user login view
     """
@@ -144,7 +148,7 @@ class UsersLoginTests(TestCase):
         )
 
 
-class UsersRetrieveTests(TestCase):
+class UsersRetrieveTests(QueryBudgetTestCase):
     """
     Class to test get user view
     """
@@ -239,8 +243,41 @@ class UsersRetrieveTests(TestCase):
             },
         )
 
+    def test_user_get_details_for_restaurant_owner_query_budget(self):
+        """
+        Testcase for testing user get details for restaurant owner within query budget.
+        """
+
+        G(Restaurants, owner=self.user, n=5)
+        self.user.is_restaurant_owner = True
+        self.user.save()
+
+        with self.assertQueryBudget(4):
+            response = self.client.get(
+                reverse("users:users-detail", kwargs={"pk": self.user.id}), HTTP_AUTHORIZATION=f"Bearer {self.token}"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]["restaurants"]), 5)
+
+    def test_user_get_details_query_budget_with_refresh_due(self):
+        """
+        Testcase for testing the query budget holds when a refresh of revocations fell due in a previous test.
+        """
+
+        self.assertGreater(revocation_registry.next_refresh, time.monotonic())
+        revocation_registry.next_refresh = 0.0
+        revocation_registry.reset()
+
+        with self.assertQueryBudget(4):
+            response = self.client.get(
+                reverse("users:users-detail", kwargs={"pk": self.user.id}), HTTP_AUTHORIZATION=f"Bearer {self.token}"
+            )
+
+        self.assertEqual(response.status_code, 200)
 
-class UsersDeleteTests(TestCase):
+
+class UsersDeleteTests(QueryBudgetTestCase):
     """
     Class to test delete user view
     """
@@ -252,6 +289,7 @@ class UsersDeleteTests(TestCase):
         self.user.save()
         response = self.client.post(reverse("users:login"), data={"email": self.user.email, "password": password})
         self.token = response.data["access"]
+        self.refresh = response.data["refresh"]
 
     def test_user_delete_success(self):
         """
@@ -265,6 +303,71 @@ class UsersDeleteTests(TestCase):
         self.assertEqual(response.status_code, 204)
         self.assertEqual(Users.objects.get(pk=self.user.id).is_active, False)
 
+    def test_user_delete_rejects_cached_user(self):
+        """
+        Testcase for testing requests are rejected after user delete even when user was cached.
+        """
+
+        response = self.client.get(reverse("users:users-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.delete(
+            reverse("users:users-detail", kwargs={"pk": self.user.id}), HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertEqual(response.status_code, 204)
+
+        response = self.client.get(reverse("users:users-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"data": None, "status": "error", "message": "Token is revoked"})
+
+    def test_user_delete_revokes_tokens(self):
+        """
+        Testcase for testing tokens issued before user delete are revoked.
+        """
+
+        response = self.client.delete(
+            reverse("users:users-detail", kwargs={"pk": self.user.id}), HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertEqual(response.status_code, 204)
+
+        response = self.client.post(reverse("users:token_refresh"), data={"refresh": self.refresh})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"data": None, "status": "error", "message": "Token is revoked"})
+
+        response = self.client.get(reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["message"], "Token is revoked")
+
+    def test_user_deactivation_revokes_tokens(self):
+        """
+        Testcase for testing tokens of users deactivated without being deleted are rejected by stateless reads.
+        """
+
+        user = Users.objects.get(pk=self.user.id)
+        user.is_active = False
+        user.save()
+
+        response = self.client.get(reverse("restaurants:restaurants-list"), HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["message"], "Token is revoked")
+
+        user.save()
+        self.assertEqual(RevokedTokens.objects.count(), 1)
+
+    def test_cached_user_invalidated_on_commit(self):
+        """
+        Testcase for testing a user cached by a concurrent request before the update committed is invalidated.
+        """
+
+        key = USER_CACHE_KEY.format(user_id=self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.balance = 10
+            self.user.save()
+            cache.set(key, Users.objects.get(pk=self.user.id))
+
+        self.assertIsNone(cache.get(key))
+
     def test_user_delete_without_auth(self):
         """
         Testcase for testing user delete failure when auth credentials are not provided.
@@ -295,7 +398,7 @@ class UsersDeleteTests(TestCase):
         )
 
 
-class UsersUpdateTests(TestCase):
+class UsersUpdateTests(QueryBudgetTestCase):
     """
     Class to test update user view
     """
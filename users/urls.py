@@ -6,6 +6,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt import views as jwt_views
 
+from users.serializers import RevocableTokenRefreshSerializer
 from users.views import UserViewSet
 
 app_name = "users"
@@ -14,6 +15,10 @@ router.register(r"users", UserViewSet, basename="users")
 
 urlpatterns = [
     path("login/", jwt_views.TokenObtainPairView.as_view(), name="login"),
-    path("token/refresh/", jwt_views.TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "token/refresh/",
+        jwt_views.TokenRefreshView.as_view(serializer_class=RevocableTokenRefreshSerializer),
+        name="token_refresh",
+    ),
     path("", include(router.urls)),
 ]